@@ -0,0 +1,50 @@
+"""Faixas de orçamento por tenant e índice (tenant_id, category, price)
+
+Revision ID: 002_budget_bands
+Revises: 001_initial
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002_budget_bands'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Faixas de orçamento customizadas por tenant (vazio = faixas padrão)
+    op.add_column(
+        'tenants',
+        sa.Column(
+            'budget_bands',
+            postgresql.JSON(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::json"),
+        ),
+    )
+
+    # Índice composto para filtro de preço dentro de tenant/categoria
+    # CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_product_tenant_category_price',
+            'products',
+            ['tenant_id', 'category', 'price'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_product_tenant_category_price',
+            table_name='products',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('tenants', 'budget_bands')
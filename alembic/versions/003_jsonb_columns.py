@@ -0,0 +1,134 @@
+"""Converter colunas JSON para JSONB, índices GIN e colunas geradas em products
+
+Revision ID: 003_jsonb_columns
+Revises: 002_budget_bands
+Create Date: 2026-10-19 00:00:00.000000
+
+Conversão sem downtime (expand/backfill/swap) para cada coluna:
+1. Cria coluna <col>_jsonb + trigger que a mantém sincronizada com escritas novas
+2. Backfill em lotes, cada lote em sua própria transação (sem lock longo)
+3. CHECK NOT NULL NOT VALID + VALIDATE (não bloqueia escritas)
+4. Swap em transação curta: drop da coluna antiga e rename da nova
+
+As colunas geradas de products (protein_g, serving_size_g, price_per_protein)
+reescrevem a tabela, mas products é pequena (catálogo por tenant).
+Índices são criados com CONCURRENTLY.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_jsonb_columns'
+down_revision = '002_budget_bands'
+branch_labels = None
+depends_on = None
+
+
+JSONB_COLUMNS = [
+    ('tenants', 'budget_bands'),
+    ('products', 'nutritional_info'),
+    ('scientific_data', 'effects'),
+    ('scientific_data', 'dosage'),
+    ('scientific_data', 'interactions'),
+    ('interaction_logs', 'ranking_data'),
+]
+
+# Server defaults recriados na coluna nova (o DROP da antiga os descarta)
+COLUMN_DEFAULTS = {
+    ('tenants', 'budget_bands'): "'{}'",
+}
+
+BACKFILL_BATCH_SIZE = 5000
+
+PROTEIN_G_EXPR = "(nutritional_info->>'protein_g')::double precision"
+SERVING_SIZE_G_EXPR = "(nutritional_info->>'serving_size_g')::double precision"
+PRICE_PER_PROTEIN_EXPR = f"price / NULLIF({PROTEIN_G_EXPR}, 0)"
+
+
+def _convert_column(table: str, column: str, target_type: str) -> None:
+    """Converte table.column para target_type (jsonb ou json) via expand/backfill/swap"""
+    new_column = f"{column}_{target_type}"
+    sync_function = f"sync_{table}_{new_column}"
+    constraint = f"ck_{table}_{new_column}_not_null"
+
+    # 1. Expand: coluna nova + trigger para escritas concorrentes
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {new_column} {target_type}")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {sync_function}() RETURNS trigger AS $$
+        BEGIN
+            NEW.{new_column} := NEW.{column}::{target_type};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE TRIGGER {sync_function}
+        BEFORE INSERT OR UPDATE OF {column} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {sync_function}()
+    """)
+
+    # 2. Backfill por faixa de id, cada lote commitado separadamente
+    #    (usa a PK, sem varrer a tabela a cada lote)
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar()
+        for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+            connection.execute(sa.text(f"""
+                UPDATE {table} SET {new_column} = {column}::{target_type}
+                WHERE id > :start AND id <= :end AND {new_column} IS NULL
+            """), {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+        # 3. NOT NULL validado sem bloquear escritas
+        connection.execute(sa.text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint} "
+            f"CHECK ({new_column} IS NOT NULL) NOT VALID"
+        ))
+        connection.execute(sa.text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}"))
+
+    # 4. Swap (transação curta - SET NOT NULL usa o CHECK validado, sem scan)
+    op.execute(f"DROP TRIGGER {sync_function} ON {table}")
+    op.execute(f"DROP FUNCTION {sync_function}()")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {new_column} SET NOT NULL")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+    default = COLUMN_DEFAULTS.get((table, column))
+    if default is not None:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {new_column} SET DEFAULT {default}::{target_type}")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    op.execute(f"ALTER TABLE {table} RENAME COLUMN {new_column} TO {column}")
+
+
+def upgrade() -> None:
+    for table, column in JSONB_COLUMNS:
+        _convert_column(table, column, 'jsonb')
+
+    # Colunas geradas tipadas para as chaves quentes de nutritional_info
+    op.add_column('products', sa.Column(
+        'protein_g', sa.Float(), sa.Computed(PROTEIN_G_EXPR, persisted=True), nullable=True,
+    ))
+    op.add_column('products', sa.Column(
+        'serving_size_g', sa.Float(), sa.Computed(SERVING_SIZE_G_EXPR, persisted=True), nullable=True,
+    ))
+    op.add_column('products', sa.Column(
+        'price_per_protein', sa.Float(), sa.Computed(PRICE_PER_PROTEIN_EXPR, persisted=True), nullable=True,
+    ))
+
+    with op.get_context().autocommit_block():
+        # GIN para consultas de contenção (@>) em JSONB
+        op.create_index(
+            'idx_product_nutritional_info', 'products', ['nutritional_info'],
+            postgresql_using='gin',
+            postgresql_ops={'nutritional_info': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_product_nutritional_info', table_name='products', postgresql_concurrently=True)
+
+    op.drop_column('products', 'price_per_protein')
+    op.drop_column('products', 'serving_size_g')
+    op.drop_column('products', 'protein_g')
+
+    for table, column in JSONB_COLUMNS:
+        _convert_column(table, column, 'json')
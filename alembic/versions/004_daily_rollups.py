@@ -0,0 +1,55 @@
+"""Rollup diário de analytics (daily_product_stats, daily_tenant_stats) e watermark
+
+Revision ID: 004_daily_rollups
+Revises: 003_jsonb_columns
+Create Date: 2026-10-19 00:00:00.000000
+
+As tabelas nascem vazias: o job de rollup parte do watermark 0 e agrega o
+histórico de interaction_logs em lotes (ROLLUP_BATCH_SIZE) nas primeiras execuções.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_daily_rollups'
+down_revision = '003_jsonb_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_product_stats',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('recommendation_count', sa.Integer(), nullable=False),
+        sa.Column('selection_count', sa.Integer(), nullable=False),
+        sa.Column('satisfaction_sum', sa.Integer(), nullable=False),
+        sa.Column('satisfaction_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('tenant_id', 'day', 'product_id'),
+    )
+
+    op.create_table(
+        'daily_tenant_stats',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('interaction_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('tenant_id', 'day'),
+    )
+
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('last_log_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_table('daily_tenant_stats')
+    op.drop_table('daily_product_stats')
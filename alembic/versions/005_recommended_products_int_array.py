@@ -0,0 +1,99 @@
+"""Converter interaction_logs.recommended_products para integer[] com índice GIN
+
+Revision ID: 005_recommended_int_array
+Revises: 004_daily_rollups
+Create Date: 2026-10-19 00:00:00.000000
+
+Mesma estratégia expand/backfill/swap da 003_jsonb_columns:
+1. Coluna recommended_products_int + trigger para escritas concorrentes
+2. Backfill em lotes por faixa de id, cada lote em sua própria transação
+3. NOT NULL via CHECK NOT VALID + VALIDATE
+4. Swap em transação curta
+Valores não numéricos (legado em texto) são descartados na conversão.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_recommended_int_array'
+down_revision = '004_daily_rollups'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+TO_INT_ARRAY = (
+    "ARRAY(SELECT ref::integer FROM unnest({column}) AS ref "
+    "WHERE ref ~ '^[0-9]+$')::integer[]"
+)
+TO_TEXT_ARRAY = "{column}::varchar[]"
+
+
+def _convert(new_column: str, new_type: str, expression: str) -> None:
+    """Converte interaction_logs.recommended_products via expand/backfill/swap"""
+    table = 'interaction_logs'
+    column = 'recommended_products'
+    sync_function = f"sync_{table}_{new_column}"
+    constraint = f"ck_{table}_{new_column}_not_null"
+
+    # 1. Expand
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {new_column} {new_type}")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {sync_function}() RETURNS trigger AS $$
+        BEGIN
+            NEW.{new_column} := {expression.format(column=f'NEW.{column}')};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE TRIGGER {sync_function}
+        BEFORE INSERT OR UPDATE OF {column} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {sync_function}()
+    """)
+
+    # 2. Backfill por faixa de id (usa a PK, sem varrer a tabela a cada lote)
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar()
+        for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+            connection.execute(sa.text(f"""
+                UPDATE {table} SET {new_column} = {expression.format(column=column)}
+                WHERE id > :start AND id <= :end AND {new_column} IS NULL
+            """), {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+        # 3. NOT NULL validado sem bloquear escritas
+        connection.execute(sa.text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint} "
+            f"CHECK ({new_column} IS NOT NULL) NOT VALID"
+        ))
+        connection.execute(sa.text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}"))
+
+    # 4. Swap
+    op.execute(f"DROP TRIGGER {sync_function} ON {table}")
+    op.execute(f"DROP FUNCTION {sync_function}()")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {new_column} SET NOT NULL")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    op.execute(f"ALTER TABLE {table} RENAME COLUMN {new_column} TO {column}")
+
+
+def upgrade() -> None:
+    _convert('recommended_products_int', 'integer[]', TO_INT_ARRAY)
+
+    # GIN para "quais interações recomendaram o produto X" (@>)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_log_recommended_products', 'interaction_logs', ['recommended_products'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_log_recommended_products', table_name='interaction_logs', postgresql_concurrently=True,
+        )
+    _convert('recommended_products_text', 'varchar[]', TO_TEXT_ARRAY)
@@ -0,0 +1,137 @@
+"""Particionar interaction_logs por mês (RANGE created_at)
+
+Revision ID: 006_partition_interaction_logs
+Revises: 005_recommended_int_array
+Create Date: 2026-10-19 00:00:00.000000
+
+Uma tabela existente não pode virar particionada no lugar, então:
+1. Cria interaction_logs_new particionada (PK (id, created_at), mesma sequence de id)
+2. Cria partições mensais do log mais antigo até PARTITIONS_AHEAD meses à frente
+   (depois disso a manutenção periódica da aplicação segue criando)
+3. Copia em lotes por id, cada lote em sua própria transação
+4. Cria os índices na tabela nova (ainda fora de uso, sem bloquear a aplicação)
+5. Swap em transação curta: bloqueia escritas, copia o restante (id > último copiado),
+   troca os nomes e remove a tabela antiga
+
+Nesta revisão interaction_logs é append-only (nenhum código faz UPDATE),
+então a cópia incremental por id é suficiente.
+Índices só em tenant_id e só em created_at não são recriados: são cobertos por
+(tenant_id, created_at) e por partition pruning.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_partition_interaction_logs'
+down_revision = '005_recommended_int_array'
+branch_labels = None
+depends_on = None
+
+
+COPY_BATCH_SIZE = 50000
+PARTITIONS_AHEAD = 3
+
+# (nome, definição) - criados com sufixo _new e renomeados após o swap
+INDEXES = [
+    ('idx_log_tenant_created', '(tenant_id, created_at)'),
+    ('idx_log_selected', '(selected_product_id)'),
+    ('idx_log_session', '(session_id)'),
+    ('ix_interaction_logs_user_profile_id', '(user_profile_id)'),
+    ('idx_log_recommended_products', 'USING gin (recommended_products)'),
+]
+
+FOREIGN_KEYS = [
+    ('tenant_id', 'tenants'),
+    ('user_profile_id', 'user_profiles'),
+    ('selected_product_id', 'products'),
+]
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first: date, last: date) -> None:
+    month = first
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS interaction_logs_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+
+def _copy_in_batches(source: str, target: str) -> int:
+    """Copia source -> target por faixa de id; retorna o último id copiado"""
+    connection = op.get_bind()
+    last_id = 0
+    with op.get_context().autocommit_block():
+        max_id = connection.execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {source}")).scalar()
+        while last_id < max_id:
+            end = last_id + COPY_BATCH_SIZE
+            connection.execute(sa.text(
+                f"INSERT INTO {target} SELECT * FROM {source} WHERE id > :start AND id <= :end"
+            ), {"start": last_id, "end": end})
+            last_id = end
+    return max_id
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    # 1. Tabela particionada (mesmas colunas e defaults, inclusive nextval da sequence)
+    op.execute("""
+        CREATE TABLE interaction_logs_new (LIKE interaction_logs INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER TABLE interaction_logs_new ADD CONSTRAINT interaction_logs_new_pkey PRIMARY KEY (id, created_at)")
+    for column, referenced in FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE interaction_logs_new ADD CONSTRAINT interaction_logs_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {referenced} (id)"
+        )
+
+    # 2. Partições mensais
+    oldest = connection.execute(sa.text("SELECT min(created_at) FROM interaction_logs")).scalar()
+    current = date.today().replace(day=1)
+    first = oldest.date().replace(day=1) if oldest else current
+    _create_partitions('interaction_logs_new', first, _add_months(current, PARTITIONS_AHEAD))
+
+    # 3. Cópia em lotes (autocommit_block confirma o DDL acima antes da cópia longa)
+    last_copied = _copy_in_batches('interaction_logs', 'interaction_logs_new')
+
+    # 4. Índices na tabela nova (propagados para cada partição)
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX {name}_new ON interaction_logs_new {definition}")
+
+    # 5. Swap: escritas bloqueadas apenas durante a cópia do restante
+    op.execute("LOCK TABLE interaction_logs IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(f"INSERT INTO interaction_logs_new SELECT * FROM interaction_logs WHERE id > {last_copied}")
+    op.execute("ALTER SEQUENCE interaction_logs_id_seq OWNED BY interaction_logs_new.id")
+    op.execute("DROP TABLE interaction_logs")
+    op.execute("ALTER TABLE interaction_logs_new RENAME TO interaction_logs")
+    op.execute("ALTER TABLE interaction_logs RENAME CONSTRAINT interaction_logs_new_pkey TO interaction_logs_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def downgrade() -> None:
+    # Volta para tabela comum (cópia única - downgrade não é caminho quente)
+    op.execute("CREATE TABLE interaction_logs_old (LIKE interaction_logs INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO interaction_logs_old SELECT * FROM interaction_logs")
+    op.execute("ALTER TABLE interaction_logs_old ADD CONSTRAINT interaction_logs_old_pkey PRIMARY KEY (id)")
+    op.execute("ALTER SEQUENCE interaction_logs_id_seq OWNED BY interaction_logs_old.id")
+    op.execute("DROP TABLE interaction_logs")
+    op.execute("ALTER TABLE interaction_logs_old RENAME TO interaction_logs")
+    op.execute("ALTER TABLE interaction_logs RENAME CONSTRAINT interaction_logs_old_pkey TO interaction_logs_pkey")
+    for column, referenced in FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE interaction_logs ADD CONSTRAINT interaction_logs_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {referenced} (id)"
+        )
+    for name, definition in INDEXES + [('idx_log_tenant', '(tenant_id)'), ('idx_log_created', '(created_at)')]:
+        op.execute(f"CREATE INDEX {name} ON interaction_logs {definition}")
@@ -0,0 +1,34 @@
+"""Sketches HyperLogLog diários (daily_distinct_sketches)
+
+Revision ID: 007_daily_distinct_sketches
+Revises: 006_partition_interaction_logs
+Create Date: 2026-10-19 00:00:00.000000
+
+A tabela nasce vazia e passa a ser atualizada no insert de cada log.
+Dias anteriores ao deploy: `poetry run backfill-sketches` (recalcula a partir de interaction_logs).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_daily_distinct_sketches'
+down_revision = '006_partition_interaction_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_distinct_sketches',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('sessions', sa.LargeBinary(), nullable=False),
+        sa.Column('profiles', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('tenant_id', 'day', 'product_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_distinct_sketches')
@@ -0,0 +1,35 @@
+"""Eventos de feedback aplicados (feedback_events)
+
+Revision ID: 008_feedback_events
+Revises: 007_daily_distinct_sketches
+Create Date: 2026-10-19 00:00:00.000000
+
+PK (tenant_id, event_id) garante idempotência de POST /analytics/feedback/batch.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_feedback_events'
+down_revision = '007_daily_distinct_sketches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'feedback_events',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.String(length=100), nullable=False),
+        sa.Column('log_id', sa.Integer(), nullable=False),
+        sa.Column('log_created_at', sa.DateTime(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('satisfaction_score', sa.Integer(), nullable=True),
+        sa.Column('applied_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('tenant_id', 'event_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('feedback_events')
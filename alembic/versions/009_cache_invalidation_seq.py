@@ -0,0 +1,24 @@
+"""Sequência do barramento de invalidação de cache (cache_invalidation_seq)
+
+Revision ID: 009_cache_invalidation_seq
+Revises: 008_feedback_events
+Create Date: 2026-10-19 00:00:00.000000
+
+Numera os eventos publicados via NOTIFY; os listeners comparam o último número
+recebido com a sequência para detectar eventos perdidos (ver src/core/invalidation.py).
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_cache_invalidation_seq'
+down_revision = '008_feedback_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS cache_invalidation_seq")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE IF EXISTS cache_invalidation_seq")
@@ -0,0 +1,48 @@
+"""Estado dos snapshots Parquet: meses a reexportar e jobs da API
+
+Revision ID: 010_snapshot_state
+Revises: 009_cache_invalidation_seq
+Create Date: 2026-10-19 00:00:00.000000
+
+snapshot_dirty_months: meses fechados alterados por feedback tardio depois do snapshot.
+snapshot_jobs: status dos jobs de POST /analytics/snapshots visível a todos os workers.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '010_snapshot_state'
+down_revision = '009_cache_invalidation_seq'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'snapshot_dirty_months',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('marked_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('tenant_id', 'month'),
+    )
+    op.create_table(
+        'snapshot_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('files', postgresql.ARRAY(sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_snapshot_jobs_tenant_id', 'snapshot_jobs', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_snapshot_jobs_tenant_id', table_name='snapshot_jobs')
+    op.drop_table('snapshot_jobs')
+    op.drop_table('snapshot_dirty_months')
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Brand Performance
+Compara memória (pico via tracemalloc) e tempo da agregação em SQL
+com a agregação antiga em Python (todas as linhas carregadas no processo)
+à medida que o volume de interaction_logs cresce
+
+Requer banco configurado no .env. Cria um tenant temporário e remove ao final.
+Uso: python benchmarks/bench_brand_performance.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.application.analytics import fetch_brand_performance
+from src.core.database import get_async_engine
+from src.domain.enums import SupplementCategory
+from src.domain.models import InteractionLog, Product, Tenant
+
+INSERT_BATCH_SIZE = 10_000
+
+
+async def legacy_brand_performance(session, tenant_id, period_start, period_end) -> int:
+    """Agregação antiga: carrega todas as interações do período no processo"""
+    stmt = (
+        select(InteractionLog)
+        .where(InteractionLog.tenant_id == tenant_id)
+        .where(InteractionLog.created_at >= period_start)
+        .where(InteractionLog.created_at <= period_end)
+    )
+    interactions = (await session.exec(stmt)).all()
+    product_stats: dict[int, list[int]] = {}
+    for interaction in interactions:
+        for product_id in interaction.recommended_products:
+            stats = product_stats.setdefault(product_id, [0, 0])
+            stats[0] += 1
+            if interaction.selected_product_id == product_id:
+                stats[1] += 1
+    return len(product_stats)
+
+
+async def measure(func, *args) -> tuple[float, float]:
+    """Retorna (pico de memória em KB, tempo em ms)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    await func(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024, elapsed
+
+
+async def insert_logs(session, tenant_id: int, product_ids: list[int], count: int) -> None:
+    """Insere logs sintéticos em lotes"""
+    rng = random.Random(count)
+    now = datetime.utcnow()
+    for offset in range(0, count, INSERT_BATCH_SIZE):
+        rows = []
+        for _ in range(min(INSERT_BATCH_SIZE, count - offset)):
+            recommended = rng.sample(product_ids, 3)
+            rows.append({
+                "tenant_id": tenant_id,
+                "session_id": f"bench-{rng.random()}",
+                "recommended_products": recommended,
+                "ranking_data": {},
+                "selected_product_id": rng.choice([None, recommended[0]]),
+                "satisfaction_score": rng.choice([None, 3, 4, 5]),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 300)),
+            })
+        await session.execute(insert(InteractionLog), rows)
+        await session.commit()
+
+
+async def main(sizes: list[int], legacy_limit: int) -> None:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        tenant = Tenant(name="Benchmark Brand Performance")
+        session.add(tenant)
+        await session.commit()
+
+        products = [
+            Product(
+                tenant_id=tenant.id,
+                brand_name=f"Brand {i}",
+                product_name=f"Product {i}",
+                category=SupplementCategory.PROTEIN,
+                price=50.0 + i,
+                stock_quantity=10,
+            )
+            for i in range(30)
+        ]
+        session.add_all(products)
+        await session.commit()
+        product_ids = [p.id for p in products]
+
+        period_end = datetime.utcnow() + timedelta(minutes=1)
+        period_start = period_end - timedelta(days=365)
+        inserted = 0
+        try:
+            print(f"{'logs':>10} {'sql peak KB':>12} {'sql ms':>10} {'legacy peak KB':>15} {'legacy ms':>10}")
+            for size in sorted(sizes):
+                await insert_logs(session, tenant.id, product_ids, size - inserted)
+                inserted = size
+
+                sql_peak, sql_ms = await measure(
+                    fetch_brand_performance, session, tenant.id, period_start, period_end
+                )
+                legacy = "-", "-"
+                if size <= legacy_limit:
+                    peak, ms = await measure(
+                        legacy_brand_performance, session, tenant.id, period_start, period_end
+                    )
+                    legacy = f"{peak:.0f}", f"{ms:.0f}"
+                    session.expunge_all()
+                print(f"{size:>10} {sql_peak:>12.0f} {sql_ms:>10.0f} {legacy[0]:>15} {legacy[1]:>10}")
+        finally:
+            await session.execute(delete(InteractionLog).where(InteractionLog.tenant_id == tenant.id))
+            await session.execute(delete(Product).where(Product.tenant_id == tenant.id))
+            await session.execute(delete(Tenant).where(Tenant.id == tenant.id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=100_000,
+        help="Maior volume em que a agregação antiga é executada",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.legacy_limit))
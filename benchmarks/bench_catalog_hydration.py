@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Catalog Hydration
+Compara o custo por linha da carga do catálogo com projeção de colunas
+(load_active_products, tuplas nomeadas) com a carga antiga hidratando
+instâncias completas de Product, incluindo a construção do CatalogSnapshot
+
+Requer banco configurado no .env. Cria um tenant temporário e remove ao final.
+Uso: python benchmarks/bench_catalog_hydration.py [--sizes 100 1000 10000 100000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.database import get_async_engine
+from src.domain.enums import SupplementCategory
+from src.domain.models import Product, Tenant
+from src.infrastructure.cache.catalog import CatalogSnapshot, load_active_products
+
+INSERT_BATCH_SIZE = 10_000
+CATEGORY = SupplementCategory.PROTEIN.value
+
+
+async def legacy_load(session: AsyncSession, tenant_id: int) -> CatalogSnapshot:
+    """Carga antiga: select(Product) hidratando o modelo inteiro"""
+    stmt = (
+        select(Product)
+        .where(Product.tenant_id == tenant_id)
+        .where(Product.category == SupplementCategory.PROTEIN)
+        .where(Product.is_active == True)  # noqa: E712
+        .where(Product.stock_quantity > 0)
+        .order_by(Product.price, Product.id)
+    )
+    rows = (await session.exec(stmt)).all()
+    return CatalogSnapshot.from_rows(tenant_id, CATEGORY, 0, rows)
+
+
+async def projected_load(session: AsyncSession, tenant_id: int) -> CatalogSnapshot:
+    """Carga atual: apenas as colunas usadas pelo snapshot"""
+    rows = await load_active_products(session, tenant_id, CATEGORY)
+    return CatalogSnapshot.from_rows(tenant_id, CATEGORY, 0, rows)
+
+
+async def measure(session: AsyncSession, func, tenant_id: int, repeat: int) -> tuple[float, float]:
+    """Retorna (melhor tempo em ms, pico de memória em KB) de repeat execuções"""
+    best = float("inf")
+    for _ in range(repeat):
+        session.expunge_all()  # sem reaproveitar o identity map entre execuções
+        start = time.perf_counter()
+        await func(session, tenant_id)
+        best = min(best, (time.perf_counter() - start) * 1000)
+
+    session.expunge_all()
+    tracemalloc.start()
+    await func(session, tenant_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024
+
+
+async def insert_products(session: AsyncSession, tenant_id: int, start: int, count: int) -> None:
+    """Insere produtos sintéticos em lotes"""
+    rng = random.Random(start)
+    for offset in range(start, start + count, INSERT_BATCH_SIZE):
+        rows = [
+            {
+                "tenant_id": tenant_id,
+                "brand_name": f"Brand {i % 50}",
+                "product_name": f"Whey {i}",
+                "category": SupplementCategory.PROTEIN,
+                "price": round(rng.uniform(40, 400), 2),
+                "stock_quantity": rng.randint(1, 100),
+                "is_active": True,
+                "nutritional_info": {
+                    "protein_g": rng.randint(18, 30),
+                    "serving_size_g": 30,
+                    "no_lactose": rng.random() < 0.3,
+                    "vegan": rng.random() < 0.1,
+                },
+                "certifications": rng.sample(["ISO", "GMP", "Informed Sport"], rng.randint(0, 2)),
+            }
+            for i in range(offset, min(offset + INSERT_BATCH_SIZE, start + count))
+        ]
+        await session.execute(insert(Product), rows)
+        await session.commit()
+
+
+async def main(sizes: list[int], repeat: int) -> None:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        tenant = Tenant(name="Benchmark Catalog Hydration")
+        session.add(tenant)
+        await session.commit()
+
+        inserted = 0
+        try:
+            print(
+                f"{'products':>10} {'orm ms':>9} {'orm us/row':>11} {'orm KB':>9} "
+                f"{'cols ms':>9} {'cols us/row':>12} {'cols KB':>9} {'speedup':>8}"
+            )
+            for size in sorted(sizes):
+                await insert_products(session, tenant.id, inserted, size - inserted)
+                inserted = size
+
+                orm_ms, orm_kb = await measure(session, legacy_load, tenant.id, repeat)
+                cols_ms, cols_kb = await measure(session, projected_load, tenant.id, repeat)
+                print(
+                    f"{size:>10} {orm_ms:>9.1f} {orm_ms * 1000 / size:>11.2f} {orm_kb:>9.0f} "
+                    f"{cols_ms:>9.1f} {cols_ms * 1000 / size:>12.2f} {cols_kb:>9.0f} "
+                    f"{orm_ms / cols_ms:>7.1f}x"
+                )
+        finally:
+            await session.execute(delete(Product).where(Product.tenant_id == tenant.id))
+            await session.execute(delete(Tenant).where(Tenant.id == tenant.id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por medição (melhor tempo)")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark - JSON Codec
+Custo de decodificação (e codificação) das colunas JSONB de linhas realistas do catálogo
+(nutritional_info de products, ranking_data de interaction_logs) no formato em que o
+asyncpg entrega os valores (jsonb binário: prefixo \\x01 + texto)
+
+Compara o decoder padrão do dialeto (bytes -> str -> json.loads) com o codec de
+src/core/json_codec.py (orjson direto dos bytes, se instalado). Não requer banco.
+Uso: python benchmarks/bench_json_codec.py [--sizes 1000 10000 100000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.json_codec import JSON_BACKEND, json_dumps
+
+if JSON_BACKEND == "orjson":
+    from src.core.json_codec import _decode_jsonb
+else:
+    _decode_jsonb = None
+
+INGREDIENTS = ["Whey Protein Concentrate", "Cacau em Pó", "Aromatizante Artificial", "Sucralose", "Xanthan Gum"]
+REASONS = ["Alta proteína por dose", "Sem lactose", "Melhor custo por grama de proteína", "Certificação GMP"]
+
+
+def nutritional_info(rng: random.Random) -> dict:
+    """nutritional_info no formato do seed de produtos"""
+    return {
+        "protein_g": round(rng.uniform(18, 30), 1),
+        "carbs_g": round(rng.uniform(1, 6), 1),
+        "fat_g": round(rng.uniform(0.5, 3), 1),
+        "calories": rng.randint(100, 140),
+        "serving_size_g": 30,
+        "ingredients": rng.sample(INGREDIENTS, rng.randint(2, len(INGREDIENTS))),
+        "allergens": ["Leite"],
+        "no_gluten": rng.random() < 0.5,
+        "no_lactose": rng.random() < 0.3,
+        "vegan": rng.random() < 0.1,
+        "maltodextrin": rng.random() < 0.2,
+        "artificial_sweeteners": rng.random() < 0.6,
+        "added_sugars_g": 0.0,
+        "sodium_mg": round(rng.uniform(20, 120), 1),
+    }
+
+
+def ranking_data(rng: random.Random) -> dict:
+    """ranking_data de um log (top 3 do ranking)"""
+    data = {}
+    for _ in range(3):
+        score = round(rng.uniform(40, 100), 2)
+        data[str(rng.randint(1, 100_000))] = {
+            "score": score,
+            "reasons": rng.sample(REASONS, 2),
+            "match_score": score / 100,
+        }
+    return data
+
+
+def as_jsonb(value: dict) -> bytes:
+    """Valor como o asyncpg recebe do servidor (jsonb binário)"""
+    return b"\x01" + json.dumps(value).encode()
+
+
+def dialect_decode(data: bytes):
+    """Decoder padrão do dialeto asyncpg do SQLAlchemy"""
+    return json.loads(data[1:].decode())
+
+
+def best_of(repeat: int, func, values) -> float:
+    """Melhor tempo (ms) de repeat passadas sobre values"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main(sizes: list[int], repeat: int) -> None:
+    print(f"Backend do codec: {JSON_BACKEND}")
+    rng = random.Random(46)
+    columns = {"nutritional_info": nutritional_info, "ranking_data": ranking_data}
+
+    print(f"{'column':>17} {'rows':>8} {'op':>7} {'json ms':>9} {'codec ms':>9} {'us/row':>8} {'speedup':>8}")
+    for name, factory in columns.items():
+        for size in sorted(sizes):
+            values = [factory(rng) for _ in range(size)]
+            encoded = [as_jsonb(value) for value in values]
+
+            decode_json = best_of(repeat, dialect_decode, encoded)
+            decode_codec = best_of(repeat, _decode_jsonb or dialect_decode, encoded)
+            encode_json = best_of(repeat, json.dumps, values)
+            encode_codec = best_of(repeat, json_dumps, values)
+            for op, baseline, codec in (("decode", decode_json, decode_codec), ("encode", encode_json, encode_codec)):
+                print(
+                    f"{name:>17} {size:>8} {op:>7} {baseline:>9.1f} {codec:>9.1f} "
+                    f"{codec * 1000 / size:>8.2f} {baseline / codec:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Passadas por medição (melhor tempo)")
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Stack Optimizer
+Mede o tempo do branch-and-bound para catálogos de milhares de SKUs
+e valida o resultado contra força bruta em instâncias pequenas
+
+Uso: python benchmarks/bench_stack_optimizer.py
+"""
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.application.stack_optimizer import StackCandidate, solve_stack
+
+CATEGORIES = ["protein", "creatine", "caffeine"]
+
+
+def make_catalog(n_skus: int, seed: int) -> dict[str, list[StackCandidate]]:
+    """Catálogo sintético: preço e score correlacionados com ruído"""
+    rng = random.Random(seed)
+    catalog: dict[str, list[StackCandidate]] = {category: [] for category in CATEGORIES}
+    for product_id in range(n_skus):
+        category = CATEGORIES[product_id % len(CATEGORIES)]
+        price = round(rng.uniform(20, 400), 2)
+        score = max(0.0, min(100.0, price / 5 + rng.gauss(30, 15)))
+        catalog[category].append(StackCandidate(product_id, category, price, score))
+    return catalog
+
+
+def brute_force(catalog: dict[str, list[StackCandidate]], budget: float) -> float:
+    """Melhor score total por enumeração (apenas instâncias pequenas)"""
+    options = [[None, *candidates] for candidates in catalog.values()]
+    best = 0.0
+    for combo in itertools.product(*options):
+        items = [item for item in combo if item is not None]
+        if sum(item.price for item in items) <= budget + 1e-9:
+            best = max(best, sum(item.score for item in items))
+    return best
+
+
+def main() -> None:
+    print("Validação contra força bruta (30 SKUs)")
+    for seed in range(20):
+        catalog = make_catalog(30, seed)
+        budget = random.Random(seed).uniform(50, 500)
+        solution = solve_stack(catalog, budget)
+        expected = brute_force(catalog, budget)
+        assert abs(solution.total_score - expected) < 1e-6, (seed, solution, expected)
+    print("  ok")
+
+    print(f"{'SKUs':>8} {'budget':>8} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for n_skus in (1_000, 5_000, 10_000):
+        for budget in (150.0, 300.0, 600.0):
+            timings = []
+            for seed in range(50):
+                catalog = make_catalog(n_skus, seed)
+                start = time.perf_counter()
+                solve_stack(catalog, budget)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[int(len(timings) * 0.99) - 1]
+            print(f"{n_skus:>8} {budget:>8.0f} {p50:>10.2f} {p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
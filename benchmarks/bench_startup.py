@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Startup
+Perfil de import (python -X importtime) de src.main, o custo de cold start de cada
+worker do uvicorn e de cada réplica nova no autoscaling
+
+Roda o import em subprocessos novos, usa a mediana e compara o total e os módulos
+mais caros com o baseline em benchmarks/startup_baseline.json. Não requer banco.
+Uso: python benchmarks/bench_startup.py [--repeat 5] [--top 15] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+BASELINE_PATH = Path(__file__).parent / "startup_baseline.json"
+MODULE = "src.main"
+
+# Módulos que não devem entrar no import da API (criados/importados sob demanda)
+LAZY_MODULES = ["langchain_google_vertexai", "langchain_google_genai", "psycopg2"]
+
+# Settings obrigatórios só para o import funcionar sem .env
+IMPORT_ENV = {"POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench", "SECRET_KEY": "bench"}
+
+
+def profile_import() -> dict[str, int]:
+    """Tempo cumulativo (us) por módulo importado em um interpretador novo"""
+    env = {**IMPORT_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumul, name = line.split("|")
+        cumulative[name.strip()] = int(cumul)
+    return cumulative
+
+
+def median_profile(repeat: int) -> dict[str, int]:
+    """Mediana do tempo cumulativo por módulo em repeat execuções"""
+    runs = [profile_import() for _ in range(repeat)]
+    modules = set().union(*runs)
+    return {name: int(statistics.median(run.get(name, 0) for run in runs)) for name in modules}
+
+
+def main(repeat: int, top: int, save_baseline: bool) -> None:
+    profile = median_profile(repeat)
+    total_ms = profile[MODULE] / 1000
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else None
+
+    print(f"{MODULE}: {total_ms:.0f} ms (mediana de {repeat} imports)")
+    if baseline:
+        base_ms = baseline["total_ms"]
+        print(f"baseline: {base_ms:.0f} ms ({(total_ms - base_ms) / base_ms:+.0%})")
+
+    loaded = [name for name in LAZY_MODULES if name in profile]
+    print(f"módulos sob demanda carregados no import: {', '.join(loaded) or 'nenhum'}")
+
+    # Só pacotes de topo e módulos do projeto, para não repetir a mesma subárvore
+    heaviest = sorted(
+        ((name, us) for name, us in profile.items() if name != MODULE and ("." not in name or name.startswith("src."))),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    base_modules = baseline["modules"] if baseline else {}
+    print(f"\n{'module':>40} {'ms':>9} {'baseline ms':>12}")
+    for name, us in heaviest:
+        base = base_modules.get(name)
+        print(f"{name:>40} {us / 1000:>9.1f} {base if base is not None else '-':>12}")
+
+    if save_baseline:
+        BASELINE_PATH.write_text(json.dumps({
+            "python": sys.version.split()[0],
+            "total_ms": round(total_ms),
+            "modules": {name: round(us / 1000, 1) for name, us in heaviest},
+        }, indent=2) + "\n")
+        print(f"\nBaseline salvo em {BASELINE_PATH}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Imports por medição (mediana)")
+    parser.add_argument("--top", type=int, default=15, help="Módulos mais caros listados")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava o perfil atual como baseline")
+    args = parser.parse_args()
+    main(args.repeat, args.top, args.save_baseline)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Backfill Distinct Sketches
+Recalcula os sketches HyperLogLog diários (daily_distinct_sketches) a partir de
+interaction_logs, para dias anteriores ao deploy ou corrigidos manualmente
+
+Uso: poetry run backfill-sketches --tenant 1 [--since 2026-01-01] [--until 2026-10-18]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Adiciona src ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from src.application.sketches import rebuild_distinct_sketches
+from src.core.database import AsyncSessionLocal
+from src.domain.models import InteractionLog, Tenant
+
+
+def parse_day(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+async def backfill(tenant_ids: list[int], since: date | None, until: date | None) -> None:
+    # Padrão até ontem: o dia corrente já é mantido pelo insert dos logs
+    until = until or datetime.utcnow().date() - timedelta(days=1)
+    async with AsyncSessionLocal() as session:
+        if not tenant_ids:
+            tenant_ids = list((await session.exec(select(Tenant.id).order_by(Tenant.id))).all())
+
+        for tenant_id in tenant_ids:
+            first = since
+            if first is None:
+                oldest = (await session.exec(
+                    select(func.min(InteractionLog.created_at)).where(InteractionLog.tenant_id == tenant_id)
+                )).one()
+                if oldest is None:
+                    continue
+                first = oldest.date()
+
+            days = written = 0
+            day = first
+            while day <= until:
+                written += await rebuild_distinct_sketches(session, tenant_id, day)
+                days += 1
+                day += timedelta(days=1)
+            print(f"✅ Tenant {tenant_id}: {written} sketch(es) em {days} dia(s)")
+
+
+def main() -> None:
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Recalcula sketches HyperLogLog diários")
+    parser.add_argument("--tenant", type=int, action="append", default=[], help="Tenant (repetível; padrão: todos)")
+    parser.add_argument("--since", type=parse_day, help="Primeiro dia (AAAA-MM-DD; padrão: primeiro log)")
+    parser.add_argument("--until", type=parse_day, help="Último dia (AAAA-MM-DD; padrão: ontem)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(backfill(args.tenant, args.since, args.until))
+    except Exception as e:
+        print(f"❌ Erro durante backfill: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
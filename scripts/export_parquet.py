@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Export Parquet Snapshots
+Exporta interactions, rankings (ranking_data achatado) e products em Parquet
+particionado por tenant e mês (requer o extra "analytics": pyarrow)
+
+Uso: poetry run export-parquet --tenant 1 [--since 2026-01] [--until 2026-06] [--output data/snapshots]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Adiciona src ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import select
+
+from src.application.snapshots import export_tenant_snapshot
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.domain.models import Tenant
+
+
+def parse_month(value: str) -> date:
+    """AAAA-MM -> primeiro dia do mês"""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+async def export(tenant_ids: list[int], output: Path, since: date | None, until: date | None, overwrite: bool) -> None:
+    if not tenant_ids:
+        async with AsyncSessionLocal() as session:
+            tenant_ids = list((await session.exec(select(Tenant.id).order_by(Tenant.id))).all())
+
+    for tenant_id in tenant_ids:
+        paths = await export_tenant_snapshot(tenant_id, output, since=since, until=until, overwrite=overwrite)
+        print(f"✅ Tenant {tenant_id}: {len(paths)} arquivo(s) Parquet em {output}")
+
+
+def main() -> None:
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Exporta snapshots Parquet de analytics")
+    parser.add_argument("--tenant", type=int, action="append", default=[], help="Tenant (repetível; padrão: todos)")
+    parser.add_argument("--since", type=parse_month, help="Primeiro mês (AAAA-MM)")
+    parser.add_argument("--until", type=parse_month, help="Último mês (AAAA-MM)")
+    parser.add_argument("--output", type=Path, default=Path(settings.ANALYTICS_SNAPSHOT_DIR))
+    parser.add_argument("--overwrite", action="store_true", help="Regrava meses fechados já exportados")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(export(args.tenant, args.output, args.since, args.until, args.overwrite))
+    except Exception as e:
+        print(f"❌ Erro durante exportação: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
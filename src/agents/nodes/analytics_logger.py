@@ -9,6 +9,9 @@ from uuid import uuid4
 
 from src.agents.state import AgentState
 from src.agents.utils import get_session_from_config
+from src.application.live_analytics import get_live_counters
+from src.application.sketches import get_sketch_buffer
+from src.core.config import settings
 from src.domain.models import InteractionLog
 
 
@@ -37,19 +40,26 @@ async def analytics_logger(state: AgentState, config: dict[str, Any] | None = No
         return state
 
     try:
+        created_at = datetime.utcnow()
         log_entry = InteractionLog(
             tenant_id=tenant_id,
             user_profile_id=user_profile_id,
             session_id=session_id,
             query_text=query_text,
-            recommended_products=[str(pid) for pid in recommended_product_ids],
+            recommended_products=list(recommended_product_ids),
             ranking_data=ranking_data,
-            created_at=datetime.utcnow(),
+            created_at=created_at,
         )
 
         session.add(log_entry)
         await session.commit()
 
+        # Sketches de contagem distinta: buffer em memória, gravado pela tarefa periódica
+        get_sketch_buffer().add(tenant_id, created_at.date(), session_id, user_profile_id, recommended_product_ids)
+
+        if settings.LIVE_COUNTERS_ENABLED:
+            get_live_counters().record_interaction(tenant_id, created_at, recommended_product_ids)
+
         state["step"] = "analytics_logged"
         return state
 
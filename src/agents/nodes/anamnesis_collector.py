@@ -11,6 +11,15 @@ from src.agents.utils import get_session_from_config
 from src.domain.models import UserProfile
 from src.domain.enums import UserGoal, BudgetRange, DietaryRestriction, MedicalCondition
 
+# Campos do perfil copiados para o estado (projeção sem hidratar UserProfile)
+PROFILE_COLUMNS = (
+    UserProfile.biometrics,
+    UserProfile.goal,
+    UserProfile.dietary_restrictions,
+    UserProfile.medical_conditions,
+    UserProfile.budget_range,
+)
+
 
 async def anamnesis_collector(state: AgentState, config: dict[str, Any] | None = None) -> AgentState:
     """
@@ -18,18 +27,19 @@ async def anamnesis_collector(state: AgentState, config: dict[str, Any] | None =
     Garante que todos os dados de anamnese estão coletados
     """
     errors = state.get("errors", [])
-    session = get_session_from_config(config)
+    session = get_session_from_config(config, read_only=True)
 
     # Se já existe user_profile_id, buscar perfil existente
     if state.get("user_profile_id") and session:
-        stmt = select(UserProfile).where(UserProfile.id == state["user_profile_id"])
+        stmt = select(*PROFILE_COLUMNS).where(UserProfile.id == state["user_profile_id"])
         profile = (await session.exec(stmt)).first()
 
         if profile:
+            # Listas vêm de ARRAY(String): normalizadas pelos enums
             state["biometrics"] = profile.biometrics
             state["goal"] = profile.goal.value
-            state["dietary_restrictions"] = [dr.value for dr in profile.dietary_restrictions]
-            state["medical_conditions"] = [mc.value for mc in profile.medical_conditions]
+            state["dietary_restrictions"] = [DietaryRestriction(dr).value for dr in profile.dietary_restrictions or []]
+            state["medical_conditions"] = [MedicalCondition(mc).value for mc in profile.medical_conditions or []]
             state["budget_range"] = profile.budget_range.value
             state["step"] = "anamnesis_collected_from_profile"
             return state
@@ -4,12 +4,24 @@ Cruza UserProfile com Product.nutritional_info e ranqueia marcas
 """
 from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
 from src.agents.state import AgentState
 from src.agents.utils import get_session_from_config
-from src.domain.models import Product
-from src.domain.enums import SupplementCategory, DietaryRestriction, MedicalCondition
+from src.application.ranking import (
+    RankedArchetype,
+    ScoredCatalog,
+    get_ranking_index,
+    nutritional_filters,
+    rank_archetype,
+    restriction_mask,
+)
+from src.application.stack_optimizer import StackCandidate, solve_stack
+from src.core.config import settings
+from src.infrastructure.cache.catalog import (
+    CatalogSnapshot,
+    get_catalog_cache,
+    load_catalog_snapshot,
+)
 
 
 async def comparative_analysis(state: AgentState, config: dict[str, Any] | None = None) -> AgentState:
@@ -19,14 +31,16 @@ async def comparative_analysis(state: AgentState, config: dict[str, Any] | None
     - Condições médicas (ex: diabetes = sem maltodextrina)
     - Restrições alimentares (ex: vegan, sem lactose)
     - Custo-benefício (preço por grama de proteína)
+    - Faixa de orçamento (teto da faixa + penalidade suave)
     - Disponibilidade em estoque
+    Monta também o stack multi-categoria que cabe no orçamento
     """
     tenant_id = state.get("tenant_id")
     category = state.get("recommended_category")
     dietary_restrictions = state.get("dietary_restrictions", [])
     medical_conditions = state.get("medical_conditions", [])
     budget_range = state.get("budget_range")
-    session = get_session_from_config(config)
+    session = get_session_from_config(config, read_only=True)
 
     if not tenant_id or not category:
         state["errors"] = state.get("errors", []) + ["Tenant ou categoria não definidos"]
@@ -38,127 +52,76 @@ async def comparative_analysis(state: AgentState, config: dict[str, Any] | None
         state["step"] = "comparative_analysis_failed"
         return state
 
-    # Buscar produtos disponíveis do tenant
-    stmt = (
-        select(Product)
-        .where(Product.tenant_id == tenant_id)
-        .where(Product.category == SupplementCategory(category))
-        .where(Product.is_active == True)
-        .where(Product.stock_quantity > 0)
+    mask = restriction_mask(dietary_restrictions, medical_conditions)
+    snapshot, ranked, available_products = await _rank_category(
+        session, tenant_id, category, mask, budget_range
     )
-    products = (await session.exec(stmt)).all()
 
-    # Filtrar produtos baseado em restrições e condições
-    filtered_products = []
-    for product in products:
-        nutritional_info = product.nutritional_info or {}
-
-        # Verificar contraindicações médicas
-        is_valid = True
-        reasons = []
-
-        # Diabetes: evitar maltodextrina
-        if MedicalCondition.DIABETES.value in medical_conditions:
-            if nutritional_info.get("maltodextrin", False):
-                is_valid = False
-                reasons.append("Contém maltodextrina (contraindicado para diabetes)")
-
-        # Intolerância à lactose
-        if DietaryRestriction.LACTOSE_FREE.value in dietary_restrictions:
-            if not nutritional_info.get("no_lactose", False):
-                is_valid = False
-                reasons.append("Contém lactose")
-
-        # Vegan
-        if DietaryRestriction.VEGAN.value in dietary_restrictions:
-            if not nutritional_info.get("vegan", False):
-                is_valid = False
-                reasons.append("Não é vegano")
-
-        # Sem glúten
-        if DietaryRestriction.GLUTEN_FREE.value in dietary_restrictions:
-            if not nutritional_info.get("no_gluten", False):
-                is_valid = False
-                reasons.append("Contém glúten")
-
-        # Evitar adoçantes artificiais
-        if DietaryRestriction.NO_ARTIFICIAL_SWEETENERS.value in dietary_restrictions:
-            if nutritional_info.get("artificial_sweeteners", False):
-                is_valid = False
-                reasons.append("Contém adoçantes artificiais")
-
-        if is_valid:
-            filtered_products.append(product)
-
-    # Ranquear produtos por score
-    ranked_products = []
-    ranking_data: dict[str, dict[str, Any]] = {}
-
-    for product in filtered_products:
-        nutritional_info = product.nutritional_info or {}
-        protein_g = nutritional_info.get("protein_g", 0.0)
-
-        # Calcular score (0-100)
-        score = 0.0
-        reasons_positives = []
-
-        # Score de proteína (peso: 40%)
-        if protein_g > 0:
-            protein_score = min(100, (protein_g / 30.0) * 100)
-            score += protein_score * 0.4
-            reasons_positives.append(f"Alto teor de proteína ({protein_g}g)")
-
-        # Score de custo-benefício (peso: 30%)
-        if protein_g > 0:
-            price_per_protein = product.price / protein_g
-            cost_benefit_score = max(0, 100 - (price_per_protein * 2))  # Menor preço = maior score
-            score += cost_benefit_score * 0.3
-            reasons_positives.append(f"Bom custo-benefício (R$ {price_per_protein:.2f}/g proteína)")
-
-        # Score de certificações (peso: 20%)
-        certifications = product.certifications or []
-        cert_score = len(certifications) * 20  # Max 100 para 5+ certificações
-        score += min(100, cert_score) * 0.2
-        if certifications:
-            reasons_positives.append(f"Certificações: {', '.join(certifications)}")
-
-        # Score de pureza/ingredientes (peso: 10%)
-        # Produtos sem aditivos desnecessários ganham pontos
-        if not nutritional_info.get("artificial_sweeteners", False):
-            score += 10
-            reasons_positives.append("Sem adoçantes artificiais")
-
-        if not nutritional_info.get("maltodextrin", False):
-            score += 10
-            reasons_positives.append("Sem maltodextrina")
-
-        # Normalizar score (0-100)
-        score = min(100, max(0, score))
-
-        ranked_products.append({
-            "id": product.id,
-            "brand_name": product.brand_name,
-            "product_name": product.product_name,
-            "price": product.price,
-            "score": score,
-            "reasons": reasons_positives,
-        })
-
-        ranking_data[str(product.id)] = {
-            "score": score,
-            "reasons": reasons_positives,
-            "match_score": score / 100.0,
-        }
-
-    # Ordenar por score (maior primeiro)
-    ranked_products.sort(key=lambda x: x["score"], reverse=True)
-
-    state["available_products"] = [{"id": p.id, "brand_name": p.brand_name, "product_name": p.product_name} for p in products]
-    state["filtered_products"] = [{"id": p.id, "brand_name": p.brand_name, "product_name": p.product_name} for p in filtered_products]
-    state["ranked_products"] = ranked_products
-    state["ranking_data"] = ranking_data
-    state["recommended_product_ids"] = [p["id"] for p in ranked_products[:3]]  # Top 3
+    # Stack multi-categoria (ex: proteína + creatina) sob o teto do orçamento
+    ranked_by_category = {category: ranked}
+    for extra_category in state.get("recommended_categories") or []:
+        if extra_category not in ranked_by_category:
+            _, ranked_by_category[extra_category], _ = await _rank_category(
+                session, tenant_id, extra_category, mask, budget_range
+            )
+
+    band = snapshot.budget_bands.get(budget_range) if budget_range else None
+    stack = solve_stack(
+        {
+            stack_category: [
+                StackCandidate(p["id"], stack_category, p["price"], p["score"])
+                for p in category_ranked.stack_products
+            ]
+            for stack_category, category_ranked in ranked_by_category.items()
+        },
+        budget=band.max_price if band else None,
+    )
+    products_by_id = {
+        p["id"]: p
+        for category_ranked in ranked_by_category.values()
+        for p in category_ranked.stack_products
+    }
+
+    state["available_products"] = list(available_products)
+    state["filtered_products"] = list(ranked.filtered_products)
+    state["ranked_products"] = list(ranked.ranked_products)
+    state["ranking_data"] = dict(ranked.ranking_data)
+    state["recommended_product_ids"] = ranked.recommended_product_ids  # Top 3
+    state["recommended_stack"] = [
+        {**products_by_id[item.product_id], "category": item.category}
+        for item in stack.items
+    ]
     state["step"] = "comparative_analysis_complete"
 
     return state
 
+
+async def _rank_category(
+    session: AsyncSession,
+    tenant_id: int,
+    category: str,
+    mask: int,
+    budget_range: str | None,
+) -> tuple[CatalogSnapshot, RankedArchetype, list[dict[str, Any]]]:
+    """Ranking de uma categoria (via cache ou direto do banco)"""
+    if settings.CATALOG_CACHE_ENABLED:
+        # Snapshot do catálogo ativo do tenant (cache versionado em memória)
+        # e ranking materializado do arquétipo (categoria × restrições × orçamento)
+        snapshot = await get_catalog_cache().get(session, tenant_id, category)
+        ranking_index = get_ranking_index()
+        ranked = ranking_index.lookup(snapshot, mask, budget_range)
+        return snapshot, ranked, ranking_index.available_products(snapshot)
+
+    # Sem cache: orçamento e restrições aplicados direto na query
+    required_flags, forbidden_flags = nutritional_filters(mask)
+    snapshot = await load_catalog_snapshot(
+        session,
+        tenant_id,
+        category,
+        budget_range,
+        required_flags=required_flags,
+        forbidden_flags=forbidden_flags,
+    )
+    scored = ScoredCatalog.from_snapshot(snapshot)
+    ranked = rank_archetype(scored, snapshot, mask, budget_range, settings.RANKING_TOP_N)
+    return snapshot, ranked, scored.available_products
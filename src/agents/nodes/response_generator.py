@@ -8,7 +8,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 from src.agents.state import AgentState
-from src.infrastructure.llm.gemini import get_llm
+from src.infrastructure.llm.gemini import get_llm, llm_status
 
 
 async def response_generator(state: AgentState) -> AgentState:
@@ -18,6 +18,7 @@ async def response_generator(state: AgentState) -> AgentState:
     """
     ranked_products = state.get("ranked_products", [])
     ranking_data = state.get("ranking_data", {})
+    recommended_stack = state.get("recommended_stack") or []
     scientific_data = state.get("scientific_data", [])
     medical_conditions = state.get("medical_conditions", [])
     dietary_restrictions = state.get("dietary_restrictions", [])
@@ -38,6 +39,12 @@ async def response_generator(state: AgentState) -> AgentState:
         for i, p in enumerate(top_3_products)
     ])
 
+    if len(recommended_stack) > 1:
+        product_details += "\n\n**Stack Sugerido (dentro do orçamento):**\n" + "\n".join([
+            f"- {p['category']}: {p['brand_name']} - {p['product_name']} (R$ {p['price']:.2f})"
+            for p in recommended_stack
+        ])
+
     scientific_context = ""
     if scientific_data:
         for data in scientific_data[:2]:  # Top 2 evidências
@@ -82,7 +89,7 @@ Seja específico e justifique cada recomendação."""),
 
 Gere uma resposta que:
 1. Recomende o melhor produto (top 1) e explique por quê
-2. Compare com os outros produtos se relevante
+2. Compare com os outros produtos se relevante (e comente o stack sugerido, se houver)
 3. Justifique considerando condições médicas, restrições e evidência científica
 4. Seja claro, objetivo e profissional
 
@@ -98,12 +105,14 @@ Resposta:"""),
             "scientific_context": scientific_context,
             "user_context": user_context,
         })
+        llm_status.record()
 
         state["response"] = response
         state["explanation"] = response
         state["step"] = "response_generated"
 
     except Exception as e:
+        llm_status.record(e)
         # Fallback para resposta simples sem LLM
         top_product = ranked_products[0]
         state["response"] = (
@@ -22,6 +22,35 @@ GOAL_TO_CATEGORY: dict[str, SupplementCategory] = {
     UserGoal.GENERAL_HEALTH.value: SupplementCategory.MULTIVITAMIN,
 }
 
+# Categorias complementares por objetivo (stack) - a primeira é a categoria principal
+GOAL_TO_CATEGORIES: dict[str, list[SupplementCategory]] = {
+    UserGoal.MUSCLE_GAIN.value: [SupplementCategory.PROTEIN, SupplementCategory.CREATINE],
+    UserGoal.WEIGHT_LOSS.value: [SupplementCategory.PROTEIN, SupplementCategory.CAFFEINE],
+    UserGoal.ENDURANCE.value: [SupplementCategory.CAFFEINE, SupplementCategory.BETA_ALANINE],
+    UserGoal.SPORTS_PERFORMANCE.value: [
+        SupplementCategory.CREATINE,
+        SupplementCategory.CAFFEINE,
+        SupplementCategory.BETA_ALANINE,
+    ],
+    UserGoal.RECOVERY.value: [SupplementCategory.PROTEIN, SupplementCategory.OMEGA3],
+    UserGoal.GENERAL_HEALTH.value: [
+        SupplementCategory.MULTIVITAMIN,
+        SupplementCategory.VITAMIN_D,
+        SupplementCategory.OMEGA3,
+    ],
+}
+
+# Colunas copiadas para o estado (projeção sem hidratar ScientificData)
+SCIENCE_COLUMNS = (
+    ScientificData.id,
+    ScientificData.supplement_name,
+    ScientificData.source,
+    ScientificData.effects,
+    ScientificData.dosage,
+    ScientificData.contraindications,
+    ScientificData.interactions,
+)
+
 
 async def science_retriever(state: AgentState, config: dict[str, Any] | None = None) -> AgentState:
     """
@@ -29,7 +58,7 @@ async def science_retriever(state: AgentState, config: dict[str, Any] | None = N
     Consulta base científica (AIS/Examine) baseado no objetivo
     """
     goal = state.get("goal")
-    session = get_session_from_config(config)
+    session = get_session_from_config(config, read_only=True)
 
     if not goal:
         state["errors"] = state.get("errors", []) + ["Goal não definido"]
@@ -44,10 +73,11 @@ async def science_retriever(state: AgentState, config: dict[str, Any] | None = N
     # Determinar categoria de suplemento baseado no objetivo
     category = GOAL_TO_CATEGORY.get(goal, SupplementCategory.PROTEIN)
     state["recommended_category"] = category.value
+    state["recommended_categories"] = [c.value for c in GOAL_TO_CATEGORIES.get(goal, [category])]
 
-    # Buscar dados científicos (apenas STRONG evidence)
+    # Buscar dados científicos (apenas STRONG evidence); categoria e evidência são as do filtro
     stmt = (
-        select(ScientificData)
+        select(*SCIENCE_COLUMNS)
         .where(ScientificData.category == category)
         .where(ScientificData.evidence_level == EvidenceLevel.STRONG)
     )
@@ -55,17 +85,11 @@ async def science_retriever(state: AgentState, config: dict[str, Any] | None = N
 
     scientific_data = [
         {
-            "id": data.id,
-            "supplement_name": data.supplement_name,
-            "category": data.category.value,
-            "evidence_level": data.evidence_level.value,
-            "source": data.source,
-            "effects": data.effects,
-            "dosage": data.dosage,
-            "contraindications": data.contraindications,
-            "interactions": data.interactions,
+            **row._asdict(),
+            "category": category.value,
+            "evidence_level": EvidenceLevel.STRONG.value,
         }
-        for data in results
+        for row in results
     ]
 
     state["scientific_data"] = scientific_data
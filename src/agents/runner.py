@@ -16,6 +16,7 @@ async def run_agent(
     user_profile_id: int | None,
     session: AsyncSession,
     session_id: str | None = None,
+    read_session: AsyncSession | None = None,
 ) -> dict[str, Any]:
     """
     Executa o agente LangGraph completo
@@ -24,8 +25,9 @@ async def run_agent(
         user_input: Input do usuário (pergunta/requisição)
         tenant_id: ID do tenant (multitenancy)
         user_profile_id: ID do perfil do usuário (opcional)
-        session: Sessão assíncrona do banco
+        session: Sessão assíncrona do banco (escrita, no primário)
         session_id: ID da sessão (opcional, gera UUID se não fornecido)
+        read_session: Sessão de leitura para os nodes de consulta (opcional, usa session)
     
     Returns:
         Estado final do agente com resposta e dados
@@ -47,10 +49,12 @@ async def run_agent(
         "budget_range": None,
         "scientific_data": None,
         "recommended_category": None,
+        "recommended_categories": None,
         "available_products": None,
         "filtered_products": None,
         "ranked_products": None,
         "ranking_data": None,
+        "recommended_stack": None,
         "response": None,
         "explanation": None,
         "recommended_product_ids": None,
@@ -62,7 +66,8 @@ async def run_agent(
 
     # Executar grafo com contexto de sessão
     # LangGraph suporta passar contexto adicional via config
-    config = {"configurable": {"session": session}}
+    # Nodes de consulta usam read_session; analytics_logger grava com session
+    config = {"configurable": {"session": session, "read_session": read_session}}
 
     try:
         final_state = await graph.ainvoke(initial_state, config=config)
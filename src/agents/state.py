@@ -28,12 +28,14 @@ class AgentState(TypedDict):
     # Dados científicos recuperados
     scientific_data: Optional[list[dict[str, Any]]]
     recommended_category: Optional[str]
+    recommended_categories: Optional[list[str]]
 
     # Produtos e análise comparativa
     available_products: Optional[list[dict[str, Any]]]
     filtered_products: Optional[list[dict[str, Any]]]
     ranked_products: Optional[list[dict[str, Any]]]
     ranking_data: Optional[dict[str, dict[str, Any]]]
+    recommended_stack: Optional[list[dict[str, Any]]]
 
     # Resposta gerada
     response: Optional[str]
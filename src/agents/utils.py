@@ -6,11 +6,16 @@ from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-def get_session_from_config(config: dict[str, Any] | None) -> AsyncSession | None:
-    """Extrai sessão do config do LangGraph"""
+def get_session_from_config(config: dict[str, Any] | None, read_only: bool = False) -> AsyncSession | None:
+    """
+    Extrai sessão do config do LangGraph
+    read_only=True: sessão de leitura (réplica), se o runner recebeu uma; senão a de escrita
+    """
     if not config:
         return None
     configurable = config.get("configurable", {})
+    if read_only and configurable.get("read_session") is not None:
+        return configurable["read_session"]
     return configurable.get("session")
 
 
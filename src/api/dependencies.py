@@ -6,20 +6,38 @@ from typing import Optional
 from fastapi import Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import get_session, TenantScope
+from src.core.database import get_autocommit_read_session, get_read_session, get_session, TenantScope
 from src.core.config import settings
 
 
 async def get_db_session() -> AsyncSession:
-    """Dependency para sessão de banco assíncrona"""
+    """Dependency para sessão de banco assíncrona (escrita, no primário)"""
     async for session in get_session():
         yield session
 
 
-def get_tenant_id_from_header(x_tenant_id: Optional[int] = Header(None)) -> int:
+async def get_read_db_session() -> AsyncSession:
+    """
+    Dependency para sessão somente leitura (réplica, ou primário logo após escrita do tenant)
+    Transação READ ONLY sem commit ao final
+    Declarar depois de get_tenant_id_from_header: a escolha usa o tenant ativo
+    """
+    async for session in get_read_session():
+        yield session
+
+
+async def get_autocommit_read_db_session() -> AsyncSession:
+    """Dependency para endpoints de leitura com um único statement (sem transação)"""
+    async for session in get_autocommit_read_session():
+        yield session
+
+
+async def get_tenant_id_from_header(x_tenant_id: Optional[int] = Header(None)) -> int:
     """
     Dependency para extrair tenant_id do header X-Tenant-ID
     Para desenvolvimento/teste (em produção usar JWT)
+    Assíncrona de propósito: roda na task da requisição, então o escopo (ContextVar)
+    definido aqui vale para o endpoint (dependências síncronas rodam em threadpool)
     """
     if not x_tenant_id:
         if settings.DEBUG:
@@ -33,7 +51,7 @@ def get_tenant_id_from_header(x_tenant_id: Optional[int] = Header(None)) -> int:
     else:
         tenant_id = x_tenant_id
 
-    # Define escopo de tenant
+    # Define escopo de tenant (filtro automático nas queries do ORM)
     TenantScope.set_tenant(tenant_id)
     return tenant_id
 
@@ -1,16 +1,40 @@
 """
 Analytics Routes
 GET /analytics/brand-performance - Analytics de marcas
+GET /analytics/products/{product_id}/funnel - Funil de um produto
+GET /analytics/live - Contadores ao vivo (janela deslizante em memória)
+POST /analytics/feedback/batch - Feedback/conversões em lote (idempotente por event_id)
+GET /analytics/export - Exportação crua de interações (NDJSON/CSV em streaming)
+POST /analytics/snapshots - Job de snapshot Parquet por tenant/mês
+GET /analytics/snapshots/{job_id} - Status do job de snapshot
 """
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, func
 
-from src.api.schemas import AnalyticsResponse, BrandPerformanceResponse
-from src.api.dependencies import get_db_session, get_tenant_id_from_header
-from src.domain.models import InteractionLog, Product
+from src.api.schemas import (
+    AnalyticsResponse,
+    BrandPerformanceResponse,
+    FeedbackBatchRequest,
+    FeedbackBatchResponse,
+    LiveAnalyticsResponse,
+    LiveProductResponse,
+    ProductFunnelResponse,
+    SnapshotJobRequest,
+    SnapshotJobResponse,
+)
+from src.api.dependencies import get_db_session, get_read_db_session, get_tenant_id_from_header
+from src.application.export import MEDIA_TYPES, ExportRange, stream_export
+from src.application.feedback import FeedbackInput, apply_feedback_batch
+from src.application.live_analytics import get_live_counters
+from src.application.olap import query_brand_performance, query_interaction_count, query_product_funnel
+from src.application.sketches import fetch_distinct_counts
+from src.application.snapshots import SnapshotJob, get_snapshot_jobs
+from src.core.config import settings
+from src.domain.enums import ExportFormat
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -19,7 +43,7 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 async def get_brand_performance(
     days: int = Query(30, ge=1, le=365, description="Período em dias"),
     tenant_id: int = Depends(get_tenant_id_from_header),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
 ) -> AnalyticsResponse:
     """
     Analytics de performance de marcas
@@ -32,81 +56,224 @@ async def get_brand_performance(
     period_end = datetime.utcnow()
     period_start = period_end - timedelta(days=days)
 
-    # Buscar interações do período
-    stmt = (
-        select(InteractionLog)
-        .where(InteractionLog.tenant_id == tenant_id)
-        .where(InteractionLog.created_at >= period_start)
-        .where(InteractionLog.created_at <= period_end)
-    )
-    interactions = (await session.exec(stmt)).all()
-
-    # Agregar dados por produto
-    product_stats: dict[int, dict] = {}
-
-    for interaction in interactions:
-        recommended_product_ids = [
-            int(pid) for pid in interaction.recommended_products if pid.isdigit()
-        ]
-
-        for product_id in recommended_product_ids:
-            if product_id not in product_stats:
-                product_stats[product_id] = {
-                    "recommendation_count": 0,
-                    "selection_count": 0,
-                    "total_satisfaction": 0.0,
-                    "satisfaction_count": 0,
-                }
-
-            product_stats[product_id]["recommendation_count"] += 1
-
-            if interaction.selected_product_id == product_id:
-                product_stats[product_id]["selection_count"] += 1
-
-            if interaction.satisfaction_score:
-                product_stats[product_id]["total_satisfaction"] += interaction.satisfaction_score
-                product_stats[product_id]["satisfaction_count"] += 1
-
-    # Buscar informações dos produtos
-    if product_stats:
-        product_ids = list(product_stats.keys())
-        stmt = select(Product).where(Product.id.in_(product_ids))  # type: ignore
-        products = (await session.exec(stmt)).all()
-        product_dict = {p.id: p for p in products}
-
-        brand_performance = []
-        for product_id, stats in product_stats.items():
-            if product_id in product_dict:
-                product = product_dict[product_id]
-                avg_satisfaction = None
-                if stats["satisfaction_count"] > 0:
-                    avg_satisfaction = stats["total_satisfaction"] / stats["satisfaction_count"]
-
-                conversion_rate = 0.0
-                if stats["recommendation_count"] > 0:
-                    conversion_rate = stats["selection_count"] / stats["recommendation_count"]
-
-                brand_performance.append(
-                    BrandPerformanceResponse(
-                        brand_name=product.brand_name,
-                        product_name=product.product_name,
-                        recommendation_count=stats["recommendation_count"],
-                        avg_satisfaction=avg_satisfaction,
-                        total_selections=stats["selection_count"],
-                        conversion_rate=round(conversion_rate, 4),
-                    )
-                )
-
-        # Ordenar por recommendation_count (maior primeiro)
-        brand_performance.sort(key=lambda x: x.recommendation_count, reverse=True)
-    else:
-        brand_performance = []
+    # Meses com snapshot Parquet via DuckDB (se habilitado); no Postgres,
+    # rollup para dias inteiros e logs crus para o dia parcial do início e hoje
+    performance = await query_brand_performance(session, tenant_id, period_start, period_end)
+    total_interactions = await query_interaction_count(session, tenant_id, period_start, period_end)
+    # Distintos aproximados: união dos sketches diários do período
+    distinct = await fetch_distinct_counts(session, tenant_id, period_start.date(), period_end.date())
+
+    brand_performance = [
+        BrandPerformanceResponse(
+            brand_name=stats.brand_name,
+            product_name=stats.product_name,
+            recommendation_count=stats.recommendation_count,
+            avg_satisfaction=stats.avg_satisfaction,
+            total_selections=stats.selection_count,
+            conversion_rate=round(stats.conversion_rate, 4),
+        )
+        for stats in performance
+    ]
 
     return AnalyticsResponse(
         tenant_id=tenant_id,
         period_start=period_start,
         period_end=period_end,
-        total_interactions=len(interactions),
+        total_interactions=total_interactions,
+        unique_sessions=distinct.sessions,
+        unique_profiles=distinct.profiles,
+        distinct_count_error=round(distinct.relative_error, 4),
         brand_performance=brand_performance,
     )
 
+
+@router.get("/products/{product_id}/funnel", response_model=ProductFunnelResponse)
+async def get_product_funnel(
+    product_id: int,
+    days: int = Query(30, ge=1, le=365, description="Período em dias"),
+    tenant_id: int = Depends(get_tenant_id_from_header),
+    session: AsyncSession = Depends(get_read_db_session),
+) -> ProductFunnelResponse:
+    """
+    Funil de um produto: recomendações, sessões, seleções e satisfação
+    Busca pelo índice GIN de recommended_products
+    """
+    period_end = datetime.utcnow()
+    period_start = period_end - timedelta(days=days)
+
+    funnel = await query_product_funnel(session, tenant_id, product_id, period_start, period_end)
+    # Sketches são diários: contagens distintas cobrem os dias inteiros do período
+    distinct = await fetch_distinct_counts(
+        session, tenant_id, period_start.date(), period_end.date(), product_id=product_id
+    )
+
+    return ProductFunnelResponse(
+        tenant_id=tenant_id,
+        product_id=product_id,
+        period_start=period_start,
+        period_end=period_end,
+        recommendation_count=funnel.recommendation_count,
+        session_count=distinct.sessions,
+        total_selections=funnel.selection_count,
+        rated_count=funnel.rated_count,
+        avg_satisfaction=funnel.avg_satisfaction,
+        conversion_rate=round(funnel.conversion_rate, 4),
+        unique_profiles=distinct.profiles,
+        distinct_count_error=round(distinct.relative_error, 4),
+    )
+
+
+@router.get("/live", response_model=LiveAnalyticsResponse)
+async def get_live_analytics(
+    tenant_id: int = Depends(get_tenant_id_from_header),
+) -> LiveAnalyticsResponse:
+    """
+    Contadores da última janela (LIVE_COUNTERS_WINDOW_SECONDS) mantidos em memória
+    Não consulta o banco: feito para widgets que fazem polling
+    """
+    snapshot = get_live_counters().snapshot(tenant_id)
+
+    return LiveAnalyticsResponse(
+        tenant_id=tenant_id,
+        window_start=snapshot.window_start,
+        window_end=snapshot.window_end,
+        total_interactions=snapshot.total_interactions,
+        products=[
+            LiveProductResponse(
+                product_id=stats.product_id,
+                recommendation_count=stats.recommendation_count,
+                total_selections=stats.selection_count,
+                avg_satisfaction=stats.avg_satisfaction,
+                conversion_rate=round(stats.conversion_rate, 4),
+            )
+            for stats in snapshot.products
+        ],
+        reconciled_at=snapshot.reconciled_at,
+    )
+
+
+@router.post("/feedback/batch", response_model=FeedbackBatchResponse)
+async def post_feedback_batch(
+    request: FeedbackBatchRequest,
+    tenant_id: int = Depends(get_tenant_id_from_header),
+    session: AsyncSession = Depends(get_db_session),
+) -> FeedbackBatchResponse:
+    """
+    Aplica eventos (session_id, product_id, score) na interação mais recente da sessão
+    que recomendou o produto, em um único UPDATE set-based
+    Reenviar um event_id já aplicado não altera nada (retornado em duplicates)
+    """
+    if len(request.events) > settings.FEEDBACK_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.FEEDBACK_BATCH_MAX_EVENTS} eventos por lote",
+        )
+
+    result = await apply_feedback_batch(
+        session,
+        tenant_id,
+        [
+            FeedbackInput(
+                event_id=event.event_id,
+                session_id=event.session_id,
+                product_id=event.product_id,
+                satisfaction_score=event.score,
+                user_feedback=event.feedback,
+            )
+            for event in request.events
+        ],
+    )
+
+    return FeedbackBatchResponse(
+        received=len(request.events),
+        applied=result.applied,
+        duplicates=result.duplicates,
+        unmatched=result.unmatched,
+    )
+
+
+@router.get("/export")
+async def export_interactions(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson ou csv"),
+    gzip: bool = Query(False, description="Comprimir com gzip"),
+    since: Optional[datetime] = Query(None, description="created_at inicial (inclusivo)"),
+    until: Optional[datetime] = Query(None, description="created_at final (exclusivo)"),
+    after_created_at: Optional[datetime] = Query(None, description="Retomar após esta linha (created_at)"),
+    after_id: Optional[int] = Query(None, description="Retomar após esta linha (id)"),
+    tenant_id: int = Depends(get_tenant_id_from_header),
+) -> StreamingResponse:
+    """
+    Exportação crua de interaction_logs do tenant em streaming
+
+    Linhas ordenadas por (created_at, id). Para retomar uma exportação
+    interrompida, passe created_at e id da última linha recebida em
+    after_created_at e after_id.
+    """
+    if after_id is not None and after_created_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="after_id exige after_created_at",
+        )
+
+    export_range = ExportRange(
+        tenant_id=tenant_id,
+        since=since,
+        until=until,
+        after_created_at=after_created_at,
+        after_id=after_id,
+    )
+    filename = f"interactions_{tenant_id}.{format.value}" + (".gz" if gzip else "")
+
+    # Sessões abertas pelo próprio stream (uma por janela), não pela dependency
+    return StreamingResponse(
+        stream_export(export_range, format, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _snapshot_job_response(job: SnapshotJob) -> SnapshotJobResponse:
+    return SnapshotJobResponse(
+        job_id=job.id,
+        tenant_id=job.tenant_id,
+        status=job.status,
+        files=job.files,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post("/snapshots", response_model=SnapshotJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_snapshot_job(
+    request: SnapshotJobRequest,
+    tenant_id: int = Depends(get_tenant_id_from_header),
+) -> SnapshotJobResponse:
+    """
+    Dispara a exportação Parquet do tenant (interactions, rankings, products)
+    em ANALYTICS_SNAPSHOT_DIR, particionada por mês
+    """
+    job = await get_snapshot_jobs().submit(
+        tenant_id,
+        Path(settings.ANALYTICS_SNAPSHOT_DIR),
+        since=request.since,
+        until=request.until,
+        overwrite=request.overwrite,
+    )
+    return _snapshot_job_response(job)
+
+
+@router.get("/snapshots/{job_id}", response_model=SnapshotJobResponse)
+async def get_snapshot_job(
+    job_id: str,
+    tenant_id: int = Depends(get_tenant_id_from_header),
+    session: AsyncSession = Depends(get_db_session),
+) -> SnapshotJobResponse:
+    """Status de um job de snapshot do tenant (lido do primário: o job pode ter acabado de ser criado)"""
+    job = await get_snapshot_jobs().get(session, job_id)
+    if job is None or job.tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job de snapshot não encontrado",
+        )
+    return _snapshot_job_response(job)
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.schemas import ChatRequest, ChatResponse
-from src.api.dependencies import get_db_session, get_tenant_id_from_header
+from src.api.dependencies import get_db_session, get_read_db_session, get_tenant_id_from_header
 from src.agents.runner import run_agent
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -17,6 +17,7 @@ async def chat(
     request: ChatRequest,
     tenant_id: int = Depends(get_tenant_id_from_header),
     session: AsyncSession = Depends(get_db_session),
+    read_session: AsyncSession = Depends(get_read_db_session),
 ) -> ChatResponse:
     """
     Endpoint principal para consultas e recomendações
@@ -36,6 +37,7 @@ async def chat(
             user_profile_id=request.user_profile_id,
             session=session,
             session_id=request.session_id,
+            read_session=read_session,
         )
 
         return ChatResponse(
@@ -43,6 +45,7 @@ async def chat(
             explanation=result.get("explanation"),
             recommended_product_ids=result.get("recommended_product_ids", []),
             ranking_data=result.get("ranking_data"),
+            recommended_stack=result.get("recommended_stack") or [],
             session_id=result.get("session_id", ""),
             step=result.get("step", "unknown"),
         )
@@ -12,7 +12,7 @@ from src.api.schemas import (
     UserProfileUpdate,
     UserProfileResponse,
 )
-from src.api.dependencies import get_db_session, get_tenant_id_from_header
+from src.api.dependencies import get_autocommit_read_db_session, get_db_session, get_tenant_id_from_header
 from src.domain.models import UserProfile
 from src.domain.enums import UserGoal, BudgetRange
 
@@ -61,7 +61,7 @@ async def create_user_profile(
 async def get_user_profile(
     profile_id: int,
     tenant_id: int = Depends(get_tenant_id_from_header),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_autocommit_read_db_session),
 ) -> UserProfileResponse:
     """
     Buscar perfil de usuário por ID
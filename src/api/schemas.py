@@ -3,7 +3,7 @@ API Schemas - Pydantic Models para validação de requests e responses
 """
 from typing import Any, Optional
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 from src.domain.enums import (
     UserGoal,
@@ -30,6 +30,10 @@ class ChatResponse(BaseModel):
     explanation: Optional[str] = Field(None, description="Explicação detalhada")
     recommended_product_ids: list[int] = Field(default_factory=list, description="IDs dos produtos recomendados")
     ranking_data: Optional[dict[str, Any]] = Field(None, description="Dados de ranqueamento")
+    recommended_stack: list[dict[str, Any]] = Field(
+        default_factory=list,
+        description="Stack multi-categoria recomendado dentro do orçamento"
+    )
     session_id: str = Field(..., description="ID da sessão")
     step: str = Field(..., description="Último step executado")
 
@@ -106,11 +110,89 @@ class BrandPerformanceResponse(BaseModel):
     conversion_rate: float  # selections / recommendations
 
 
+class ProductFunnelResponse(BaseModel):
+    """Response do endpoint GET /analytics/products/{product_id}/funnel"""
+    tenant_id: int
+    product_id: int
+    period_start: datetime
+    period_end: datetime
+    recommendation_count: int
+    session_count: int  # aproximado (HyperLogLog), erro em distinct_count_error
+    total_selections: int
+    rated_count: int
+    avg_satisfaction: Optional[float]
+    conversion_rate: float  # selections / recommendations
+    unique_profiles: int  # aproximado: perfis que receberam o produto como recomendação
+    distinct_count_error: float  # erro padrão relativo das contagens distintas
+
+
+class LiveProductResponse(BaseModel):
+    """Contadores de um produto em GET /analytics/live"""
+    product_id: int
+    recommendation_count: int
+    total_selections: int
+    avg_satisfaction: Optional[float]
+    conversion_rate: float  # selections / recommendations
+
+
+class LiveAnalyticsResponse(BaseModel):
+    """Response do endpoint GET /analytics/live (janela deslizante em memória)"""
+    tenant_id: int
+    window_start: datetime
+    window_end: datetime
+    total_interactions: int
+    products: list[LiveProductResponse]
+    reconciled_at: Optional[datetime]
+
+
+class FeedbackEventRequest(BaseModel):
+    """Evento de conversão/feedback de uma sessão"""
+    event_id: str = Field(..., min_length=1, max_length=100, description="ID único do evento (idempotência)")
+    session_id: str = Field(..., max_length=255)
+    product_id: int = Field(..., description="Produto selecionado (deve ter sido recomendado na sessão)")
+    score: Optional[int] = Field(None, ge=1, le=5, description="Score de satisfação 1-5")
+    feedback: Optional[str] = Field(None, description="Feedback textual")
+
+
+class FeedbackBatchRequest(BaseModel):
+    """Request do endpoint POST /analytics/feedback/batch"""
+    events: list[FeedbackEventRequest] = Field(..., min_length=1)
+
+
+class FeedbackBatchResponse(BaseModel):
+    """Resultado por evento: aplicado, já recebido antes ou sem interação correspondente"""
+    received: int
+    applied: list[str]
+    duplicates: list[str]
+    unmatched: list[str]
+
+
+class SnapshotJobRequest(BaseModel):
+    """Request do endpoint POST /analytics/snapshots"""
+    since: Optional[date] = Field(None, description="Primeiro mês (qualquer dia do mês)")
+    until: Optional[date] = Field(None, description="Último mês (qualquer dia do mês)")
+    overwrite: bool = Field(False, description="Regrava meses fechados já exportados")
+
+
+class SnapshotJobResponse(BaseModel):
+    """Status de um job de snapshot Parquet"""
+    job_id: str
+    tenant_id: int
+    status: str
+    files: list[str]
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+
 class AnalyticsResponse(BaseModel):
     """Response geral de analytics"""
     tenant_id: int
     period_start: datetime
     period_end: datetime
     total_interactions: int
+    unique_sessions: int  # aproximado (HyperLogLog)
+    unique_profiles: int  # aproximado (HyperLogLog)
+    distinct_count_error: float  # erro padrão relativo das contagens distintas
     brand_performance: list[BrandPerformanceResponse]
 
@@ -0,0 +1,455 @@
+"""
+Analytics Queries
+Agregações de BI executadas no banco (apenas linhas agregadas trafegam)
+
+Dias fechados são lidos do rollup diário (daily_product_stats / daily_tenant_stats),
+mantido incrementalmente a partir de um watermark sobre interaction_logs.id.
+Logs crus só são lidos para o dia corrente e para o que o job ainda não agregou.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, cast, desc, func, or_, true, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import Subquery
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.domain.models import (
+    DailyProductStats,
+    DailyTenantStats,
+    InteractionLog,
+    Product,
+    RollupWatermark,
+)
+
+# Nome do watermark do rollup diário em rollup_watermarks
+DAILY_ROLLUP = "daily_stats"
+
+PRODUCT_COUNTERS = ("recommendation_count", "selection_count", "satisfaction_sum", "satisfaction_count")
+# Posições em listas de contadores (mesma ordem de PRODUCT_COUNTERS)
+RECOMMENDATIONS, SELECTIONS, SATISFACTION_SUM, SATISFACTION_COUNT = range(len(PRODUCT_COUNTERS))
+
+
+@dataclass(frozen=True, slots=True)
+class ProductPerformance:
+    """Estatísticas agregadas de um produto no período"""
+    product_id: int
+    brand_name: str
+    product_name: str
+    recommendation_count: int
+    selection_count: int
+    satisfaction_sum: int
+    satisfaction_count: int
+
+    @property
+    def avg_satisfaction(self) -> Optional[float]:
+        """Score médio de satisfação (None sem avaliações)"""
+        if self.satisfaction_count == 0:
+            return None
+        return self.satisfaction_sum / self.satisfaction_count
+
+    @property
+    def conversion_rate(self) -> float:
+        """Seleções / recomendações"""
+        if self.recommendation_count == 0:
+            return 0.0
+        return self.selection_count / self.recommendation_count
+
+
+@dataclass(frozen=True, slots=True)
+class ProductFunnel:
+    """Funil de um produto no período: recomendado -> selecionado -> avaliado"""
+    product_id: int
+    recommendation_count: int
+    selection_count: int
+    rated_count: int
+    satisfaction_sum: int
+
+    @property
+    def avg_satisfaction(self) -> Optional[float]:
+        """Score médio das seleções avaliadas (None sem avaliações)"""
+        if self.rated_count == 0:
+            return None
+        return self.satisfaction_sum / self.rated_count
+
+    @property
+    def conversion_rate(self) -> float:
+        """Seleções / recomendações"""
+        if self.recommendation_count == 0:
+            return 0.0
+        return self.selection_count / self.recommendation_count
+
+
+def merge_performance(*parts: list[ProductPerformance]) -> list[ProductPerformance]:
+    """Soma estatísticas por produto de períodos disjuntos (ex: OLAP + Postgres)"""
+    merged: dict[int, ProductPerformance] = {}
+    for part in parts:
+        for stats in part:
+            current = merged.get(stats.product_id)
+            if current is not None:
+                stats = ProductPerformance(
+                    product_id=stats.product_id,
+                    brand_name=stats.brand_name,
+                    product_name=stats.product_name,
+                    recommendation_count=current.recommendation_count + stats.recommendation_count,
+                    selection_count=current.selection_count + stats.selection_count,
+                    satisfaction_sum=current.satisfaction_sum + stats.satisfaction_sum,
+                    satisfaction_count=current.satisfaction_count + stats.satisfaction_count,
+                )
+            merged[stats.product_id] = stats
+    return sorted(merged.values(), key=lambda stats: (-stats.recommendation_count, stats.product_id))
+
+
+def merge_funnels(first: ProductFunnel, second: ProductFunnel) -> ProductFunnel:
+    """Soma funis de períodos disjuntos"""
+    return ProductFunnel(
+        product_id=first.product_id,
+        recommendation_count=first.recommendation_count + second.recommendation_count,
+        selection_count=first.selection_count + second.selection_count,
+        rated_count=first.rated_count + second.rated_count,
+        satisfaction_sum=first.satisfaction_sum + second.satisfaction_sum,
+    )
+
+
+def feedback_counter_deltas(
+    recommended_products: Iterable[int],
+    previous_selected_product_id: Optional[int],
+    previous_satisfaction_score: Optional[int],
+    selected_product_id: Optional[int],
+    satisfaction_score: Optional[int],
+) -> dict[int, list[int]]:
+    """
+    Variação dos contadores (ordem de PRODUCT_COUNTERS) por produto recomendado
+    quando o feedback de uma interação muda (mesma semântica de product_counters)
+    """
+    deltas: dict[int, list[int]] = {}
+    for product_id in recommended_products:
+        counters = deltas.setdefault(product_id, [0] * len(PRODUCT_COUNTERS))
+        for selected, score, sign in (
+            (previous_selected_product_id, previous_satisfaction_score, -1),
+            (selected_product_id, satisfaction_score, 1),
+        ):
+            if selected == product_id:
+                counters[SELECTIONS] += sign
+            if score is not None and score > 0:
+                counters[SATISFACTION_SUM] += sign * score
+                counters[SATISFACTION_COUNT] += sign
+    return deltas
+
+
+# ============================================================================
+# BASE
+# ============================================================================
+
+def recommended_product_refs(*criteria) -> Subquery:
+    """
+    Uma linha por (interação, produto recomendado) dos logs que atendem criteria
+    Colunas: tenant_id, created_at, selected_product_id, satisfaction_score, product_id
+    """
+    return (
+        select(
+            InteractionLog.tenant_id.label("tenant_id"),
+            InteractionLog.created_at.label("created_at"),
+            InteractionLog.selected_product_id.label("selected_product_id"),
+            InteractionLog.satisfaction_score.label("satisfaction_score"),
+            func.unnest(InteractionLog.recommended_products).label("product_id"),
+        )
+        .where(*criteria)
+        .subquery("recommended_products")
+    )
+
+
+def product_counters(refs: Subquery) -> list:
+    """Contadores por produto sobre recommended_product_refs (mesma ordem de PRODUCT_COUNTERS)"""
+    rated = refs.c.satisfaction_score > 0
+    return [
+        func.count().label("recommendation_count"),
+        func.count().filter(refs.c.selected_product_id == refs.c.product_id).label("selection_count"),
+        func.coalesce(func.sum(refs.c.satisfaction_score).filter(rated), 0).label("satisfaction_sum"),
+        func.count().filter(rated).label("satisfaction_count"),
+    ]
+
+
+# ============================================================================
+# ROLLUP DIÁRIO (job incremental)
+# ============================================================================
+
+async def get_rollup_watermark(session: AsyncSession, name: str = DAILY_ROLLUP) -> int:
+    """Último interaction_logs.id já agregado (0 se o job nunca rodou)"""
+    stmt = select(RollupWatermark.last_log_id).where(RollupWatermark.name == name)
+    return (await session.exec(stmt)).first() or 0
+
+
+async def refresh_daily_rollups(
+    session: AsyncSession,
+    safety_lag: timedelta = timedelta(minutes=2),
+    batch_size: int = 50_000,
+) -> int:
+    """
+    Agrega em daily_product_stats / daily_tenant_stats os logs com id acima do watermark
+    Cada lote (upsert + avanço do watermark) é uma transação: re-executar não duplica contagens
+    Logs mais novos que safety_lag ficam para a próxima execução (transações em andamento)
+    Retorna o watermark final
+    """
+    while True:
+        await session.execute(
+            pg_insert(RollupWatermark)
+            .values(name=DAILY_ROLLUP, last_log_id=0)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        watermark = (await session.exec(
+            select(RollupWatermark)
+            .where(RollupWatermark.name == DAILY_ROLLUP)
+            .with_for_update(skip_locked=True)
+        )).first()
+        if watermark is None:
+            # Outro worker está processando
+            await session.rollback()
+            return await get_rollup_watermark(session)
+
+        low = watermark.last_log_id
+        high = await _next_batch_upper_bound(session, low, datetime.utcnow() - safety_lag, batch_size)
+        if high is None:
+            await session.commit()
+            return low
+
+        await _upsert_product_stats(session, low, high)
+        await _upsert_tenant_stats(session, low, high)
+
+        watermark.last_log_id = high
+        watermark.updated_at = datetime.utcnow()
+        session.add(watermark)
+        await session.commit()
+
+
+async def run_daily_rollup() -> int:
+    """Execução do job com sessão própria (tarefa periódica da aplicação)"""
+    async with AsyncSessionLocal() as session:
+        return await refresh_daily_rollups(
+            session,
+            safety_lag=timedelta(seconds=settings.ROLLUP_SAFETY_LAG_SECONDS),
+            batch_size=settings.ROLLUP_BATCH_SIZE,
+        )
+
+
+async def _next_batch_upper_bound(
+    session: AsyncSession,
+    low: int,
+    cutoff: datetime,
+    batch_size: int,
+) -> Optional[int]:
+    """Maior id do próximo lote, parando antes do primeiro log mais novo que cutoff"""
+    recent_floor = (await session.exec(
+        select(func.min(InteractionLog.id))
+        .where(InteractionLog.id > low)
+        .where(InteractionLog.created_at >= cutoff)
+    )).one()
+
+    batch = select(InteractionLog.id).where(InteractionLog.id > low)
+    if recent_floor is not None:
+        batch = batch.where(InteractionLog.id < recent_floor)
+    batch = batch.order_by(InteractionLog.id).limit(batch_size).subquery()
+    return (await session.exec(select(func.max(batch.c.id)))).one()
+
+
+async def _upsert_product_stats(session: AsyncSession, low: int, high: int) -> None:
+    refs = recommended_product_refs(InteractionLog.id > low, InteractionLog.id <= high)
+    day = cast(refs.c.created_at, Date)
+    rows = (
+        select(refs.c.tenant_id, day.label("day"), refs.c.product_id, *product_counters(refs))
+        .group_by(refs.c.tenant_id, day, refs.c.product_id)
+    )
+    stmt = pg_insert(DailyProductStats).from_select(
+        ["tenant_id", "day", "product_id", *PRODUCT_COUNTERS], rows
+    )
+    table = DailyProductStats.__table__
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "day", "product_id"],
+        set_={name: table.c[name] + stmt.excluded[name] for name in PRODUCT_COUNTERS},
+    ))
+
+
+async def _upsert_tenant_stats(session: AsyncSession, low: int, high: int) -> None:
+    day = cast(InteractionLog.created_at, Date)
+    rows = (
+        select(InteractionLog.tenant_id, day.label("day"), func.count().label("interaction_count"))
+        .where(InteractionLog.id > low)
+        .where(InteractionLog.id <= high)
+        .group_by(InteractionLog.tenant_id, day)
+    )
+    stmt = pg_insert(DailyTenantStats).from_select(["tenant_id", "day", "interaction_count"], rows)
+    table = DailyTenantStats.__table__
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "day"],
+        set_={"interaction_count": table.c.interaction_count + stmt.excluded.interaction_count},
+    ))
+
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+
+@dataclass(frozen=True, slots=True)
+class _RollupWindow:
+    """Divisão do período entre rollup (dias inteiros já agregados) e logs crus"""
+    first_day: date
+    end_day: date  # exclusivo
+    watermark: int
+
+    @property
+    def uses_rollup(self) -> bool:
+        return self.first_day < self.end_day
+
+    def raw_criteria(self):
+        """Logs fora dos dias do rollup ou ainda não agregados pelo job"""
+        if not self.uses_rollup:
+            return true()
+        return or_(
+            InteractionLog.created_at < datetime.combine(self.first_day, time.min),
+            InteractionLog.created_at >= datetime.combine(self.end_day, time.min),
+            InteractionLog.id > self.watermark,
+        )
+
+
+async def _rollup_window(session: AsyncSession, period_start: datetime, period_end: datetime) -> _RollupWindow:
+    """Dias inteiros dentro do período, anteriores a hoje (UTC)"""
+    first_day = period_start.date()
+    if datetime.combine(first_day, time.min) < period_start:
+        first_day += timedelta(days=1)
+    end_day = min(period_end.date(), datetime.utcnow().date())
+    watermark = await get_rollup_watermark(session) if first_day < end_day else 0
+    return _RollupWindow(first_day, end_day, watermark)
+
+
+async def fetch_brand_performance(
+    session: AsyncSession,
+    tenant_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> list[ProductPerformance]:
+    """
+    Performance por produto em uma única query:
+    rollup diário (dias fechados) UNION ALL logs crus (hoje/não agregados),
+    com join em products
+    Ordenado por quantidade de recomendações (maior primeiro)
+    """
+    window = await _rollup_window(session, period_start, period_end)
+
+    refs = recommended_product_refs(
+        InteractionLog.tenant_id == tenant_id,
+        InteractionLog.created_at >= period_start,
+        InteractionLog.created_at <= period_end,
+        window.raw_criteria(),
+    )
+    parts = [select(refs.c.product_id, *product_counters(refs)).group_by(refs.c.product_id)]
+    if window.uses_rollup:
+        parts.append(
+            select(
+                DailyProductStats.product_id,
+                *[func.sum(getattr(DailyProductStats, name)).label(name) for name in PRODUCT_COUNTERS],
+            )
+            .where(DailyProductStats.tenant_id == tenant_id)
+            .where(DailyProductStats.day >= window.first_day)
+            .where(DailyProductStats.day < window.end_day)
+            .group_by(DailyProductStats.product_id)
+        )
+    combined = union_all(*parts).subquery("combined")
+
+    stmt = (
+        select(
+            Product.id,
+            Product.brand_name,
+            Product.product_name,
+            *[func.sum(combined.c[name]).label(name) for name in PRODUCT_COUNTERS],
+        )
+        .select_from(combined)
+        .join(Product, (Product.id == combined.c.product_id) & (Product.tenant_id == tenant_id))
+        .group_by(Product.id, Product.brand_name, Product.product_name)
+        .order_by(desc("recommendation_count"), Product.id)
+    )
+    rows = (await session.exec(stmt)).all()
+
+    return [
+        ProductPerformance(
+            product_id=row.id,
+            brand_name=row.brand_name,
+            product_name=row.product_name,
+            recommendation_count=int(row.recommendation_count),
+            selection_count=int(row.selection_count),
+            satisfaction_sum=int(row.satisfaction_sum),
+            satisfaction_count=int(row.satisfaction_count),
+        )
+        for row in rows
+    ]
+
+
+async def count_interactions(
+    session: AsyncSession,
+    tenant_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> int:
+    """Total de interações do tenant no período (daily_tenant_stats + idx_log_tenant_created)"""
+    window = await _rollup_window(session, period_start, period_end)
+
+    raw = (await session.exec(
+        select(func.count())
+        .select_from(InteractionLog)
+        .where(InteractionLog.tenant_id == tenant_id)
+        .where(InteractionLog.created_at >= period_start)
+        .where(InteractionLog.created_at <= period_end)
+        .where(window.raw_criteria())
+    )).one()
+    if not window.uses_rollup:
+        return raw
+
+    rolled_up = (await session.exec(
+        select(func.coalesce(func.sum(DailyTenantStats.interaction_count), 0))
+        .where(DailyTenantStats.tenant_id == tenant_id)
+        .where(DailyTenantStats.day >= window.first_day)
+        .where(DailyTenantStats.day < window.end_day)
+    )).one()
+    return raw + int(rolled_up)
+
+
+async def fetch_product_funnel(
+    session: AsyncSession,
+    tenant_id: int,
+    product_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> ProductFunnel:
+    """
+    Funil de um produto: interações que o recomendaram (recommended_products @> [id],
+    via GIN idx_log_recommended_products), seleções e avaliações
+    Sessões distintas vêm dos sketches HLL (src/application/sketches.py)
+    """
+    rated = InteractionLog.satisfaction_score > 0
+    selected = InteractionLog.selected_product_id == product_id
+    stmt = (
+        select(
+            func.count().label("recommendation_count"),
+            func.count().filter(selected).label("selection_count"),
+            func.count().filter(selected & rated).label("rated_count"),
+            func.coalesce(
+                func.sum(InteractionLog.satisfaction_score).filter(selected & rated), 0
+            ).label("satisfaction_sum"),
+        )
+        .where(InteractionLog.tenant_id == tenant_id)
+        .where(InteractionLog.recommended_products.contains([product_id]))
+        .where(InteractionLog.created_at >= period_start)
+        .where(InteractionLog.created_at <= period_end)
+    )
+    row = (await session.exec(stmt)).one()
+
+    return ProductFunnel(
+        product_id=product_id,
+        recommendation_count=row.recommendation_count,
+        selection_count=row.selection_count,
+        rated_count=row.rated_count,
+        satisfaction_sum=int(row.satisfaction_sum),
+    )
@@ -0,0 +1,166 @@
+"""
+Interaction Log Export
+Exportação crua de interaction_logs em streaming (NDJSON ou CSV, gzip opcional)
+
+- Keyset por (created_at, id): cada janela é uma transação curta, retomável
+  a partir da última linha recebida (after_created_at + after_id)
+- Dentro da janela as linhas vêm de um cursor server-side (asyncpg) em lotes
+  fixos, então a memória fica limitada ao lote independentemente do volume
+"""
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import tuple_
+from sqlmodel import select
+
+from src.core.config import settings
+from src.core.database import open_read_session
+from src.domain.enums import ExportFormat
+from src.domain.models import InteractionLog
+
+# Colunas exportadas (ip_address e user_agent ficam de fora: dados pessoais)
+EXPORT_COLUMNS = (
+    InteractionLog.id,
+    InteractionLog.created_at,
+    InteractionLog.session_id,
+    InteractionLog.user_profile_id,
+    InteractionLog.query_text,
+    InteractionLog.recommended_products,
+    InteractionLog.selected_product_id,
+    InteractionLog.satisfaction_score,
+    InteractionLog.user_feedback,
+    InteractionLog.ranking_data,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ExportRange:
+    """Intervalo exportado: (after_created_at, after_id) exclusivo até until exclusivo"""
+    tenant_id: int
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    after_created_at: Optional[datetime] = None
+    after_id: Optional[int] = None
+
+    def criteria(self) -> list:
+        criteria = [InteractionLog.tenant_id == self.tenant_id]
+        if self.since is not None:
+            criteria.append(InteractionLog.created_at >= self.since)
+        if self.until is not None:
+            criteria.append(InteractionLog.created_at < self.until)
+        if self.after_created_at is not None:
+            # created_at >= ... isolado permite pruning de partições e uso do índice
+            criteria.append(InteractionLog.created_at >= self.after_created_at)
+            if self.after_id is not None:
+                criteria.append(
+                    tuple_(InteractionLog.created_at, InteractionLog.id)
+                    > tuple_(self.after_created_at, self.after_id)
+                )
+            else:
+                criteria.append(InteractionLog.created_at > self.after_created_at)
+        return criteria
+
+    def resume_after(self, created_at: datetime, log_id: int) -> "ExportRange":
+        """Mesmo intervalo, a partir da linha (created_at, id)"""
+        return ExportRange(self.tenant_id, self.since, self.until, created_at, log_id)
+
+
+async def iter_export_rows(
+    export_range: ExportRange,
+    window_size: int = 50_000,
+    chunk_size: int = 1_000,
+) -> AsyncIterator[list[Any]]:
+    """
+    Lotes de linhas ordenadas por (created_at, id)
+    Cada janela de window_size linhas usa uma sessão/transação própria
+    """
+    current = export_range
+    while True:
+        stmt = (
+            select(*EXPORT_COLUMNS)
+            .where(*current.criteria())
+            .order_by(InteractionLog.created_at, InteractionLog.id)
+            .limit(window_size)
+            .execution_options(yield_per=chunk_size)
+        )
+        fetched = 0
+        last = None
+        async with open_read_session() as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                fetched += len(rows)
+                last = rows[-1]
+                yield rows
+
+        if fetched < window_size or last is None:
+            return
+        current = current.resume_after(last.created_at, last.id)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def encode_ndjson(rows: list[Any]) -> bytes:
+    """Uma linha JSON por registro"""
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+
+def encode_csv(rows: list[Any], header: bool = False) -> bytes:
+    """CSV com listas/JSONB serializados como JSON"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict))
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in row
+        ])
+    return buffer.getvalue().encode()
+
+
+async def stream_export(
+    export_range: ExportRange,
+    export_format: ExportFormat,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """Corpo da resposta de exportação (bytes por lote, gzip incremental opcional)"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if export_format == ExportFormat.CSV:
+        yield emit(encode_csv([], header=True))
+
+    async for rows in iter_export_rows(
+        export_range,
+        window_size=settings.EXPORT_WINDOW_ROWS,
+        chunk_size=settings.EXPORT_CHUNK_ROWS,
+    ):
+        data = encode_csv(rows) if export_format == ExportFormat.CSV else encode_ndjson(rows)
+        chunk = emit(data)
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
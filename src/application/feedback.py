@@ -0,0 +1,228 @@
+"""
+Feedback Ingestion
+Aplica eventos de conversão (session_id, product_id, score) em lote sobre interaction_logs
+
+- Um único statement set-based: eventos chegam como arrays (unnest), casam com a
+  interação mais recente da sessão que recomendou o produto, são registrados em
+  feedback_events (ON CONFLICT DO NOTHING = idempotência por event_id) e só os novos
+  atualizam selected_product_id / satisfaction_score / user_feedback
+- Vários eventos para a mesma interação no lote: vale o último
+- Interações já agregadas pelo rollup diário recebem a variação dos contadores
+  na mesma transação; as demais são lidas com os valores novos pelo próximo lote do job
+- Meses fechados alterados são marcados para reexportação dos snapshots Parquet
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.application.analytics import DAILY_ROLLUP, PRODUCT_COUNTERS, feedback_counter_deltas
+from src.application.live_analytics import get_live_counters
+from src.application.snapshots import mark_dirty_months
+from src.core.config import settings
+from src.domain.models import DailyProductStats, RollupWatermark
+
+
+@dataclass(frozen=True, slots=True)
+class FeedbackInput:
+    """Evento de feedback recebido pela API"""
+    event_id: str
+    session_id: str
+    product_id: int
+    satisfaction_score: Optional[int] = None
+    user_feedback: Optional[str] = None
+
+
+@dataclass
+class FeedbackBatchResult:
+    """Classificação dos eventos do lote"""
+    applied: list[str] = field(default_factory=list)
+    duplicates: list[str] = field(default_factory=list)
+    unmatched: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class _UpdatedLog:
+    log_id: int
+    created_at: datetime
+    recommended_products: list[int]
+    previous_selected_product_id: Optional[int]
+    previous_satisfaction_score: Optional[int]
+    selected_product_id: Optional[int]
+    satisfaction_score: Optional[int]
+
+
+_APPLY_FEEDBACK = text("""
+    WITH incoming AS (
+        SELECT *
+        FROM unnest(
+            CAST(:event_ids AS varchar[]),
+            CAST(:session_ids AS varchar[]),
+            CAST(:product_ids AS integer[]),
+            CAST(:scores AS integer[]),
+            CAST(:feedbacks AS text[])
+        ) WITH ORDINALITY AS e(event_id, session_id, product_id, score, feedback, position)
+    ),
+    matched AS (
+        SELECT DISTINCT ON (e.event_id) e.*, l.id AS log_id, l.created_at AS log_created_at
+        FROM incoming e
+        JOIN interaction_logs l
+          ON l.tenant_id = :tenant_id
+         AND l.session_id = e.session_id
+         AND l.recommended_products @> ARRAY[e.product_id]
+        ORDER BY e.event_id, l.created_at DESC, l.id DESC
+    ),
+    recorded AS (
+        INSERT INTO feedback_events
+            (tenant_id, event_id, log_id, log_created_at, product_id, satisfaction_score, applied_at)
+        SELECT :tenant_id, event_id, log_id, log_created_at, product_id, score, :applied_at
+        FROM matched
+        ON CONFLICT (tenant_id, event_id) DO NOTHING
+        RETURNING event_id
+    ),
+    latest AS (
+        SELECT DISTINCT ON (m.log_id) m.*
+        FROM matched m
+        JOIN recorded r ON r.event_id = m.event_id
+        ORDER BY m.log_id, m.position DESC
+    ),
+    previous AS (
+        SELECT l.id, l.created_at, l.selected_product_id, l.satisfaction_score
+        FROM interaction_logs l
+        JOIN latest t ON t.log_id = l.id AND t.log_created_at = l.created_at
+        FOR UPDATE OF l
+    ),
+    updated AS (
+        UPDATE interaction_logs l
+        SET selected_product_id = t.product_id,
+            satisfaction_score = coalesce(t.score, l.satisfaction_score),
+            user_feedback = coalesce(t.feedback, l.user_feedback)
+        FROM latest t
+        JOIN previous p ON p.id = t.log_id AND p.created_at = t.log_created_at
+        WHERE l.id = t.log_id AND l.created_at = t.log_created_at
+        RETURNING l.id, l.created_at, l.recommended_products,
+                  p.selected_product_id AS previous_selected_product_id,
+                  p.satisfaction_score AS previous_satisfaction_score,
+                  l.selected_product_id, l.satisfaction_score
+    )
+    SELECT 'matched' AS kind, event_id, NULL::integer AS log_id, NULL::timestamp AS created_at,
+           NULL::integer[] AS recommended_products,
+           NULL::integer AS previous_selected_product_id, NULL::integer AS previous_satisfaction_score,
+           NULL::integer AS selected_product_id, NULL::integer AS satisfaction_score
+    FROM matched
+    UNION ALL
+    SELECT 'recorded', event_id, NULL, NULL, NULL, NULL, NULL, NULL, NULL
+    FROM recorded
+    UNION ALL
+    SELECT 'updated', NULL, id, created_at, recommended_products,
+           previous_selected_product_id, previous_satisfaction_score,
+           selected_product_id, satisfaction_score
+    FROM updated
+""")
+
+
+async def apply_feedback_batch(
+    session: AsyncSession,
+    tenant_id: int,
+    events: list[FeedbackInput],
+) -> FeedbackBatchResult:
+    """Aplica o lote em uma transação; reenviar os mesmos event_ids não altera nada"""
+    # event_id repetido no próprio lote: vale a última ocorrência
+    unique = list({event.event_id: event for event in events}.values())
+
+    # FOR SHARE no watermark: o rollup não avança (SKIP LOCKED) enquanto o lote é aplicado,
+    # então "id <= watermark" decide com segurança quem já está agregado
+    watermark = (await session.exec(
+        select(RollupWatermark.last_log_id)
+        .where(RollupWatermark.name == DAILY_ROLLUP)
+        .with_for_update(read=True)
+    )).first() or 0
+
+    rows = (await session.execute(_APPLY_FEEDBACK, {
+        "tenant_id": tenant_id,
+        "applied_at": datetime.utcnow(),
+        "event_ids": [event.event_id for event in unique],
+        "session_ids": [event.session_id for event in unique],
+        "product_ids": [event.product_id for event in unique],
+        "scores": [event.satisfaction_score for event in unique],
+        "feedbacks": [event.user_feedback for event in unique],
+    })).all()
+
+    matched = {row.event_id for row in rows if row.kind == "matched"}
+    recorded = {row.event_id for row in rows if row.kind == "recorded"}
+    updated = [
+        _UpdatedLog(
+            log_id=row.log_id,
+            created_at=row.created_at,
+            recommended_products=list(row.recommended_products or []),
+            previous_selected_product_id=row.previous_selected_product_id,
+            previous_satisfaction_score=row.previous_satisfaction_score,
+            selected_product_id=row.selected_product_id,
+            satisfaction_score=row.satisfaction_score,
+        )
+        for row in rows if row.kind == "updated"
+    ]
+
+    await _apply_rollup_deltas(session, tenant_id, [log for log in updated if log.log_id <= watermark])
+    await mark_dirty_months(session, tenant_id, [log.created_at for log in updated])
+    await session.commit()
+
+    if settings.LIVE_COUNTERS_ENABLED:
+        counters = get_live_counters()
+        for log in updated:
+            counters.record_feedback(
+                tenant_id,
+                log.created_at,
+                log.recommended_products,
+                log.selected_product_id,
+                log.satisfaction_score,
+                previous_selected_product_id=log.previous_selected_product_id,
+                previous_satisfaction_score=log.previous_satisfaction_score,
+            )
+
+    result = FeedbackBatchResult()
+    for event in unique:
+        if event.event_id in recorded:
+            result.applied.append(event.event_id)
+        elif event.event_id in matched:
+            result.duplicates.append(event.event_id)
+        else:
+            result.unmatched.append(event.event_id)
+    return result
+
+
+async def _apply_rollup_deltas(session: AsyncSession, tenant_id: int, logs: list[_UpdatedLog]) -> None:
+    """Soma em daily_product_stats a variação das interações já agregadas"""
+    totals: dict[tuple[date, int], list[int]] = defaultdict(lambda: [0] * len(PRODUCT_COUNTERS))
+    for log in logs:
+        deltas = feedback_counter_deltas(
+            log.recommended_products,
+            log.previous_selected_product_id,
+            log.previous_satisfaction_score,
+            log.selected_product_id,
+            log.satisfaction_score,
+        )
+        for product_id, counters in deltas.items():
+            day_totals = totals[(log.created_at.date(), product_id)]
+            for position, delta in enumerate(counters):
+                day_totals[position] += delta
+
+    rows = [
+        {"tenant_id": tenant_id, "day": day, "product_id": product_id, **dict(zip(PRODUCT_COUNTERS, counters))}
+        for (day, product_id), counters in sorted(totals.items())
+        if any(counters)
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(DailyProductStats).values(rows)
+    table = DailyProductStats.__table__
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "day", "product_id"],
+        set_={name: table.c[name] + stmt.excluded[name] for name in PRODUCT_COUNTERS},
+    ))
@@ -0,0 +1,194 @@
+"""
+Health Checks
+Sondagens de dependências para /health (liveness) e /ready (readiness)
+
+- Banco: SELECT 1 no primário (latência) e réplicas fora da rotação (estado do replica_health)
+- Pools: saturação lida do próprio pool, sem I/O
+- LLM: resultado da última chamada real ou, com HEALTH_LLM_PROBE_ENABLED, ping ativo
+- Background: jobs de snapshot em andamento, tarefas periódicas paradas e listener de invalidação
+
+Resultados ficam em cache por HEALTH_PROBE_TTL_SECONDS: vários balanceadores consultando
+não multiplicam a carga no banco. Com resultado expirado, a sondagem é refeita em
+background e o anterior é devolvido; só a primeira chamada espera (até o timeout)
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+
+from src.application.snapshots import get_snapshot_jobs
+from src.application.warmup import get_warmup_state
+from src.core.background import periodic_task_status
+from src.core.config import settings
+from src.core.database import get_async_engine, get_replica_pool
+from src.core.invalidation import get_invalidation_bus
+from src.core.pool import pool_saturation
+from src.infrastructure.llm.gemini import get_llm, llm_status
+
+Probe = Callable[[], Awaitable[dict[str, Any]]]
+
+
+@dataclass(slots=True)
+class ProbeResult:
+    """Resultado de uma sondagem"""
+    ok: bool
+    latency_ms: float
+    checked_at: float  # time.monotonic()
+    detail: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        result = {
+            "ok": self.ok,
+            "latency_ms": round(self.latency_ms, 1),
+            "age_seconds": round(time.monotonic() - self.checked_at, 1),
+            **self.detail,
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class CachedProbe:
+    """
+    Sondagem com cache (ttl) e uma única execução em andamento por vez
+    Exceção ou timeout viram ProbeResult(ok=False); nunca propagam para o endpoint
+    """
+
+    def __init__(self, name: str, probe: Probe, ttl: float, timeout: float):
+        self.name = name
+        self.probe = probe
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: ProbeResult | None = None
+        self._refresh: asyncio.Task | None = None
+
+    async def get(self) -> ProbeResult:
+        result = self._result
+        if result is not None and time.monotonic() - result.checked_at < self.ttl:
+            return result
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._run(), name=f"probe:{self.name}")
+        if result is not None:
+            return result
+        return await asyncio.shield(self._refresh)
+
+    async def _run(self) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(self.probe(), self.timeout)
+            result = ProbeResult(True, (time.perf_counter() - start) * 1000, time.monotonic(), detail)
+        except asyncio.TimeoutError:
+            result = ProbeResult(
+                False, (time.perf_counter() - start) * 1000, time.monotonic(), error=f"timeout ({self.timeout}s)"
+            )
+        except Exception as e:
+            result = ProbeResult(
+                False, (time.perf_counter() - start) * 1000, time.monotonic(), error=f"{type(e).__name__}: {e}"
+            )
+        self._result = result
+        return result
+
+
+# ============================================================================
+# Sondagens
+# ============================================================================
+
+async def probe_database() -> dict[str, Any]:
+    """SELECT 1 no primário; réplicas pelo último replica_health (sem nova consulta)"""
+    async with get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    healthy = get_replica_pool().healthy
+    return {"replicas": len(healthy), "replicas_healthy": sum(healthy)}
+
+
+async def probe_llm() -> dict[str, Any]:
+    """Ping mínimo ao LLM (HEALTH_LLM_PROBE_ENABLED; consome quota)"""
+    await get_llm().ainvoke("ping")
+    return {"mode": "active"}
+
+
+def llm_passive_status() -> dict[str, Any]:
+    """LLM pela última chamada real (sem chamada = ainda desconhecido)"""
+    return {
+        "ok": llm_status.ok,
+        "mode": "passive",
+        "last_call_at": llm_status.at.isoformat() if llm_status.at else None,
+        "error": llm_status.error,
+    }
+
+
+def background_status() -> dict[str, Any]:
+    """Fila de jobs de snapshot, tarefas periódicas paradas e listener de invalidação"""
+    tasks = periodic_task_status()
+    return {
+        "invalidation_bus_connected": get_invalidation_bus().connected,
+        "snapshot_jobs_in_flight": get_snapshot_jobs().in_flight,
+        "periodic_tasks": len(tasks),
+        "periodic_tasks_stopped": sorted(name for name, running in tasks.items() if not running),
+    }
+
+
+# Singleton das sondagens do processo
+_probes: dict[str, CachedProbe] | None = None
+
+
+def get_probes() -> dict[str, CachedProbe]:
+    """Retorna as sondagens com cache (singleton)"""
+    global _probes
+    if _probes is None:
+        _probes = {
+            "database": CachedProbe(
+                "database", probe_database, settings.HEALTH_PROBE_TTL_SECONDS, settings.HEALTH_PROBE_TIMEOUT_SECONDS
+            ),
+            "llm": CachedProbe(
+                "llm", probe_llm, settings.HEALTH_LLM_PROBE_TTL_SECONDS, settings.HEALTH_PROBE_TIMEOUT_SECONDS
+            ),
+        }
+    return _probes
+
+
+# ============================================================================
+# Relatórios
+# ============================================================================
+
+def liveness_report() -> dict[str, Any]:
+    """Processo e event loop respondendo (sem consultar dependências)"""
+    return {"status": "alive", "warmup": get_warmup_state().as_dict()}
+
+
+async def readiness_report() -> tuple[bool, dict[str, Any]]:
+    """
+    Pronto para tráfego: warm-up concluído, banco respondendo e pool primário abaixo de
+    HEALTH_POOL_SATURATION_MAX. LLM e background só degradam (a resposta tem fallback sem LLM)
+    """
+    probes = get_probes()
+    warmup = get_warmup_state()
+    database = await probes["database"].get()
+    pools = pool_saturation()
+    primary = pools.get("primary")
+    pool_ok = primary is None or primary["saturation"] < settings.HEALTH_POOL_SATURATION_MAX
+
+    if settings.HEALTH_LLM_PROBE_ENABLED:
+        llm = (await probes["llm"].get()).as_dict()
+    else:
+        llm = llm_passive_status()
+
+    ready = warmup.ready and database.ok and pool_ok
+    if not ready:
+        status = "not_ready"
+    elif llm["ok"] is False:
+        status = "degraded"
+    else:
+        status = "ready"
+
+    return ready, {
+        "status": status,
+        "warmup": warmup.as_dict(),
+        "database": database.as_dict(),
+        "pools": pools,
+        "llm": llm,
+        "background": background_status(),
+    }
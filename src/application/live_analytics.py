@@ -0,0 +1,297 @@
+"""
+Live Analytics
+Contadores em memória por (tenant, produto) numa janela deslizante
+(LIVE_COUNTERS_WINDOW_SECONDS em buckets de LIVE_COUNTERS_BUCKET_SECONDS)
+
+- analytics_logger e o caminho de feedback incrementam após o commit: O(produtos do evento)
+- Leitura devolve os totais já mantidos (sem query): custo independente do volume de logs
+- Reconciliação periódica reconstrói os buckets fechados a partir de interaction_logs,
+  corrigindo o que outros processos gravaram e eventos perdidos; o bucket corrente
+  segue apenas com os incrementos locais até fechar
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.application.analytics import (
+    PRODUCT_COUNTERS,
+    RECOMMENDATIONS,
+    feedback_counter_deltas,
+    product_counters,
+    recommended_product_refs,
+)
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.domain.models import InteractionLog, Tenant
+
+
+@dataclass(frozen=True, slots=True)
+class LiveProductStats:
+    """Totais de um produto na janela"""
+    product_id: int
+    recommendation_count: int
+    selection_count: int
+    satisfaction_sum: int
+    satisfaction_count: int
+
+    @property
+    def avg_satisfaction(self) -> Optional[float]:
+        if self.satisfaction_count == 0:
+            return None
+        return self.satisfaction_sum / self.satisfaction_count
+
+    @property
+    def conversion_rate(self) -> float:
+        if self.recommendation_count == 0:
+            return 0.0
+        return self.selection_count / self.recommendation_count
+
+
+@dataclass(frozen=True, slots=True)
+class LiveSnapshot:
+    """Leitura dos contadores de um tenant"""
+    tenant_id: int
+    window_start: datetime
+    window_end: datetime
+    total_interactions: int
+    products: list[LiveProductStats]
+    reconciled_at: Optional[datetime]
+
+
+class _Bucket:
+    __slots__ = ("interactions", "products")
+
+    def __init__(self):
+        self.interactions = 0
+        self.products: dict[int, list[int]] = {}
+
+
+class _TenantWindow:
+    """Buckets de um tenant + totais correntes (somas dos buckets vivos)"""
+    __slots__ = ("buckets", "order", "interactions", "totals")
+
+    def __init__(self):
+        self.buckets: dict[int, _Bucket] = {}
+        self.order: list[int] = []  # heap de índices de bucket
+        self.interactions = 0
+        self.totals: dict[int, list[int]] = {}
+
+    def bucket(self, index: int) -> _Bucket:
+        bucket = self.buckets.get(index)
+        if bucket is None:
+            bucket = self.buckets[index] = _Bucket()
+            heapq.heappush(self.order, index)
+        return bucket
+
+    def add(self, index: int, interactions: int, product_deltas: dict[int, Iterable[int]]) -> None:
+        bucket = self.bucket(index)
+        bucket.interactions += interactions
+        self.interactions += interactions
+        for product_id, deltas in product_deltas.items():
+            counters = bucket.products.setdefault(product_id, [0] * len(PRODUCT_COUNTERS))
+            totals = self.totals.setdefault(product_id, [0] * len(PRODUCT_COUNTERS))
+            for position, delta in enumerate(deltas):
+                counters[position] += delta
+                totals[position] += delta
+
+    def drop(self, index: int) -> None:
+        """Remove o bucket e desconta dos totais (o índice sai do heap em expire)"""
+        bucket = self.buckets.pop(index, None)
+        if bucket is None:
+            return
+        self.interactions -= bucket.interactions
+        for product_id, counters in bucket.products.items():
+            totals = self.totals[product_id]
+            for position, value in enumerate(counters):
+                totals[position] -= value
+            if not any(totals):
+                del self.totals[product_id]
+
+    def expire(self, first_live: int) -> None:
+        while self.order and self.order[0] < first_live:
+            self.drop(heapq.heappop(self.order))
+
+
+class LiveCounters:
+    """Janela deslizante por tenant, atualizada em memória pelo processo"""
+
+    def __init__(self, window_seconds: int, bucket_seconds: int):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(window_seconds // bucket_seconds, 1)
+        self.reconciled_at: Optional[datetime] = None
+        self._tenants: dict[int, _TenantWindow] = {}
+
+    def bucket_index(self, at: datetime) -> int:
+        """Índice do bucket (epoch UTC / bucket_seconds, igual à reconciliação no banco)"""
+        return int(at.replace(tzinfo=timezone.utc).timestamp()) // self.bucket_seconds
+
+    def bucket_start(self, index: int) -> datetime:
+        return datetime.fromtimestamp(index * self.bucket_seconds, timezone.utc).replace(tzinfo=None)
+
+    def first_live_bucket(self, now: datetime) -> int:
+        return self.bucket_index(now) - self.bucket_count + 1
+
+    def _window(self, tenant_id: int, now: datetime) -> _TenantWindow:
+        window = self._tenants.get(tenant_id)
+        if window is None:
+            window = self._tenants[tenant_id] = _TenantWindow()
+        window.expire(self.first_live_bucket(now))
+        return window
+
+    def _add(
+        self,
+        tenant_id: int,
+        created_at: datetime,
+        interactions: int,
+        product_deltas: dict[int, Iterable[int]],
+    ) -> None:
+        now = datetime.utcnow()
+        index = self.bucket_index(created_at)
+        if index < self.first_live_bucket(now):
+            return  # evento fora da janela
+        self._window(tenant_id, now).add(index, interactions, product_deltas)
+
+    def record_interaction(self, tenant_id: int, created_at: datetime, recommended_products: Iterable[int]) -> None:
+        """Nova interação com seus produtos recomendados"""
+        self._add(tenant_id, created_at, 1, {product_id: (1, 0, 0, 0) for product_id in recommended_products})
+
+    def record_feedback(
+        self,
+        tenant_id: int,
+        created_at: datetime,
+        recommended_products: Iterable[int],
+        selected_product_id: Optional[int],
+        satisfaction_score: Optional[int],
+        previous_selected_product_id: Optional[int] = None,
+        previous_satisfaction_score: Optional[int] = None,
+    ) -> None:
+        """
+        Feedback aplicado a uma interação existente (created_at da interação)
+        Valores anteriores são descontados
+        """
+        deltas = feedback_counter_deltas(
+            recommended_products,
+            previous_selected_product_id,
+            previous_satisfaction_score,
+            selected_product_id,
+            satisfaction_score,
+        )
+        self._add(tenant_id, created_at, 0, deltas)
+
+    def snapshot(self, tenant_id: int, now: Optional[datetime] = None) -> LiveSnapshot:
+        """Totais da janela do tenant, ordenados por recomendações"""
+        now = now or datetime.utcnow()
+        first_live = self.first_live_bucket(now)
+        window = self._window(tenant_id, now)
+        products = sorted(
+            (
+                LiveProductStats(product_id, *counters)
+                for product_id, counters in window.totals.items()
+                if counters[RECOMMENDATIONS] > 0
+            ),
+            key=lambda stats: (-stats.recommendation_count, stats.product_id),
+        )
+        return LiveSnapshot(
+            tenant_id=tenant_id,
+            window_start=self.bucket_start(first_live),
+            window_end=now,
+            total_interactions=window.interactions,
+            products=products,
+            reconciled_at=self.reconciled_at,
+        )
+
+    def replace(
+        self,
+        first_bucket: int,
+        end_bucket: int,
+        interaction_rows: Iterable[tuple[int, int, int]],
+        product_rows: Iterable[tuple],
+        reconciled_at: datetime,
+    ) -> None:
+        """
+        Substitui os buckets [first_bucket, end_bucket) de todos os tenants pelos valores do banco
+        interaction_rows: (tenant_id, bucket, interactions)
+        product_rows: (tenant_id, bucket, product_id, *PRODUCT_COUNTERS)
+        """
+        for window in self._tenants.values():
+            for index in [index for index in window.buckets if first_bucket <= index < end_bucket]:
+                window.drop(index)
+            window.order = [index for index in window.order if index in window.buckets]
+            heapq.heapify(window.order)
+
+        for tenant_id, index, interactions in interaction_rows:
+            self._tenants.setdefault(tenant_id, _TenantWindow()).add(int(index), interactions, {})
+        for tenant_id, index, product_id, *counters in product_rows:
+            self._tenants.setdefault(tenant_id, _TenantWindow()).add(
+                int(index), 0, {product_id: [int(value) for value in counters]}
+            )
+        self.reconciled_at = reconciled_at
+
+
+# Singleton dos contadores ao vivo
+_live_counters: LiveCounters | None = None
+
+
+def get_live_counters() -> LiveCounters:
+    """Retorna instância singleton dos contadores ao vivo"""
+    global _live_counters
+    if _live_counters is None:
+        _live_counters = LiveCounters(
+            settings.LIVE_COUNTERS_WINDOW_SECONDS,
+            settings.LIVE_COUNTERS_BUCKET_SECONDS,
+        )
+    return _live_counters
+
+
+# ============================================================================
+# RECONCILIAÇÃO
+# ============================================================================
+
+async def reconcile_live_counters(session: AsyncSession, counters: LiveCounters) -> None:
+    """
+    Recalcula os buckets fechados da janela a partir de interaction_logs; o bucket
+    corrente fica com os incrementos locais, evitando perder eventos gravados durante a query
+
+    Filtra pelos tenants (tenant_id IN (...)) além da faixa de created_at: sem o
+    tenant_id, idx_log_tenant_created (tenant_id, created_at) não serve a faixa e
+    cada partição seria varrida por inteiro
+    """
+    now = datetime.utcnow()
+    first_bucket = counters.first_live_bucket(now)
+    end_bucket = counters.bucket_index(now)
+    since = counters.bucket_start(first_bucket)
+    until = counters.bucket_start(end_bucket)
+
+    tenant_ids = (await session.exec(select(Tenant.id))).all()
+    window = (
+        InteractionLog.tenant_id.in_(tenant_ids),
+        InteractionLog.created_at >= since,
+        InteractionLog.created_at < until,
+    )
+
+    log_bucket = func.floor(func.extract("epoch", InteractionLog.created_at) / counters.bucket_seconds)
+    interaction_rows = (await session.exec(
+        select(InteractionLog.tenant_id, log_bucket, func.count())
+        .where(*window)
+        .group_by(InteractionLog.tenant_id, log_bucket)
+    )).all()
+
+    refs = recommended_product_refs(*window)
+    ref_bucket = func.floor(func.extract("epoch", refs.c.created_at) / counters.bucket_seconds)
+    product_rows = (await session.exec(
+        select(refs.c.tenant_id, ref_bucket, refs.c.product_id, *product_counters(refs))
+        .group_by(refs.c.tenant_id, ref_bucket, refs.c.product_id)
+    )).all()
+
+    counters.replace(first_bucket, end_bucket, interaction_rows, product_rows, reconciled_at=now)
+
+
+async def run_live_reconciliation() -> None:
+    """Reconciliação com sessão própria (tarefa periódica da aplicação)"""
+    async with AsyncSessionLocal() as session:
+        await reconcile_live_counters(session, get_live_counters())
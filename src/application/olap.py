@@ -0,0 +1,276 @@
+"""
+Analytics OLAP (DuckDB sobre snapshots Parquet)
+Consultas de período longo leem os meses já exportados em ANALYTICS_SNAPSHOT_DIR
+com um motor colunar embarcado, sem tocar o Postgres transacional
+
+Roteamento por período: [period_start, fronteira) vem dos snapshots mensais completos
+e [fronteira, period_end] (mês corrente ou meses ainda não exportados) do Postgres,
+com os resultados somados. Meses marcados em snapshot_dirty_months (feedback tardio
+ainda não reexportado) encerram a cobertura. Sem o extra "analytics", com o modo desligado ou em
+períodos curtos tudo vai para o Postgres.
+"""
+import asyncio
+import importlib.util
+import logging
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Collection, Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.application.analytics import (
+    ProductFunnel,
+    ProductPerformance,
+    count_interactions,
+    fetch_brand_performance,
+    fetch_product_funnel,
+    merge_funnels,
+    merge_performance,
+)
+from src.application.snapshots import (
+    INTERACTIONS,
+    PRODUCTS,
+    load_dirty_months,
+    snapshot_complete,
+    snapshot_path,
+)
+from src.core.config import settings
+from src.infrastructure.partitioning import add_months, month_floor
+
+logger = logging.getLogger(__name__)
+
+
+class OlapBackend:
+    """Consultas DuckDB sobre os arquivos Parquet de um diretório de snapshots"""
+
+    def __init__(self, root: Path):
+        import duckdb
+
+        self.root = Path(root)
+        # Banco em memória; cada consulta usa um cursor próprio (seguro entre threads)
+        self._connection = duckdb.connect()
+
+    def covered_until(
+        self,
+        tenant_id: int,
+        period_start: datetime,
+        limit: date,
+        dirty: Collection[date] = (),
+    ) -> Optional[date]:
+        """
+        Fronteira (primeiro dia de mês, no máximo o mês de limit) até onde o período
+        está coberto por snapshots completos; None se o primeiro mês não estiver
+        Meses em dirty (alterados após o snapshot) não contam como cobertos
+        """
+        first = month_floor(period_start.date())
+        month = first
+        while (
+            month < month_floor(limit)
+            and month not in dirty
+            and snapshot_complete(self._interactions_path(tenant_id, month), month)
+        ):
+            month = add_months(month, 1)
+        return month if month > first else None
+
+    def has_products(self, tenant_id: int) -> bool:
+        return snapshot_path(self.root, PRODUCTS, tenant_id).exists()
+
+    def _interactions_path(self, tenant_id: int, month: date) -> Path:
+        return snapshot_path(self.root, INTERACTIONS, tenant_id, month)
+
+    def _interaction_files(self, tenant_id: int, period_start: datetime, period_end: datetime) -> list[str]:
+        """Arquivos mensais que intersectam [period_start, period_end)"""
+        files = []
+        month = month_floor(period_start.date())
+        while datetime.combine(month, time.min) < period_end:
+            files.append(str(self._interactions_path(tenant_id, month)))
+            month = add_months(month, 1)
+        return files
+
+    def _query(self, sql: str, params: list | dict) -> list[tuple]:
+        cursor = self._connection.cursor()
+        try:
+            return cursor.execute(sql, params).fetchall()
+        finally:
+            cursor.close()
+
+    def brand_performance(
+        self,
+        tenant_id: int,
+        period_start: datetime,
+        period_end: datetime,
+    ) -> list[ProductPerformance]:
+        """Mesma agregação de fetch_brand_performance; period_end exclusivo"""
+        rows = self._query(
+            """
+            WITH refs AS (
+                SELECT unnest(recommended_products) AS product_id, selected_product_id, satisfaction_score
+                FROM read_parquet(?)
+                WHERE created_at >= ? AND created_at < ?
+            )
+            SELECT p.id, p.brand_name, p.product_name,
+                   count(*) AS recommendation_count,
+                   count(*) FILTER (WHERE refs.selected_product_id = refs.product_id) AS selection_count,
+                   coalesce(sum(refs.satisfaction_score) FILTER (WHERE refs.satisfaction_score > 0), 0)
+                       AS satisfaction_sum,
+                   count(*) FILTER (WHERE refs.satisfaction_score > 0) AS satisfaction_count
+            FROM refs
+            JOIN read_parquet(?) AS p ON p.id = refs.product_id
+            GROUP BY p.id, p.brand_name, p.product_name
+            ORDER BY recommendation_count DESC, p.id
+            """,
+            [
+                self._interaction_files(tenant_id, period_start, period_end),
+                period_start,
+                period_end,
+                str(snapshot_path(self.root, PRODUCTS, tenant_id)),
+            ],
+        )
+        return [
+            ProductPerformance(
+                product_id=product_id,
+                brand_name=brand_name,
+                product_name=product_name,
+                recommendation_count=int(recommendation_count),
+                selection_count=int(selection_count),
+                satisfaction_sum=int(satisfaction_sum),
+                satisfaction_count=int(satisfaction_count),
+            )
+            for (
+                product_id, brand_name, product_name,
+                recommendation_count, selection_count, satisfaction_sum, satisfaction_count,
+            ) in rows
+        ]
+
+    def count_interactions(self, tenant_id: int, period_start: datetime, period_end: datetime) -> int:
+        """Total de interações em [period_start, period_end)"""
+        [(count,)] = self._query(
+            "SELECT count(*) FROM read_parquet(?) WHERE created_at >= ? AND created_at < ?",
+            [self._interaction_files(tenant_id, period_start, period_end), period_start, period_end],
+        )
+        return int(count)
+
+    def product_funnel(
+        self,
+        tenant_id: int,
+        product_id: int,
+        period_start: datetime,
+        period_end: datetime,
+    ) -> ProductFunnel:
+        """Mesmo funil de fetch_product_funnel; period_end exclusivo"""
+        [row] = self._query(
+            """
+            SELECT count(*),
+                   count(*) FILTER (WHERE selected_product_id = $product_id),
+                   count(*) FILTER (WHERE selected_product_id = $product_id AND satisfaction_score > 0),
+                   coalesce(sum(satisfaction_score)
+                       FILTER (WHERE selected_product_id = $product_id AND satisfaction_score > 0), 0)
+            FROM read_parquet($files)
+            WHERE created_at >= $start AND created_at < $end
+              AND list_contains(recommended_products, $product_id)
+            """,
+            {
+                "files": self._interaction_files(tenant_id, period_start, period_end),
+                "product_id": product_id,
+                "start": period_start,
+                "end": period_end,
+            },
+        )
+        recommendation_count, selection_count, rated_count, satisfaction_sum = row
+        return ProductFunnel(
+            product_id=product_id,
+            recommendation_count=int(recommendation_count),
+            selection_count=int(selection_count),
+            rated_count=int(rated_count),
+            satisfaction_sum=int(satisfaction_sum),
+        )
+
+
+# Singleton do backend OLAP
+_olap_backend: OlapBackend | None = None
+
+
+def get_olap_backend() -> Optional[OlapBackend]:
+    """Retorna o backend OLAP (None se desligado ou sem duckdb instalado)"""
+    global _olap_backend
+    if not settings.ANALYTICS_OLAP_ENABLED:
+        return None
+    if _olap_backend is None:
+        if importlib.util.find_spec("duckdb") is None:
+            logger.warning("ANALYTICS_OLAP_ENABLED sem duckdb: instale com `poetry install -E analytics`")
+            return None
+        _olap_backend = OlapBackend(Path(settings.ANALYTICS_SNAPSHOT_DIR))
+    return _olap_backend
+
+
+# ============================================================================
+# ROTEAMENTO
+# ============================================================================
+
+async def _olap_boundary(
+    session: AsyncSession,
+    backend: Optional[OlapBackend],
+    tenant_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> Optional[datetime]:
+    """Início da parte servida pelo Postgres, ou None se o período todo vai para o Postgres"""
+    if backend is None or period_end - period_start < timedelta(days=settings.ANALYTICS_OLAP_MIN_DAYS):
+        return None
+    limit = min(period_end.date(), datetime.utcnow().date())
+    dirty = await load_dirty_months(session, tenant_id)
+    covered = backend.covered_until(tenant_id, period_start, limit, dirty)
+    if covered is None:
+        return None
+    return datetime.combine(covered, time.min)
+
+
+async def query_brand_performance(
+    session: AsyncSession,
+    tenant_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> list[ProductPerformance]:
+    """fetch_brand_performance roteado entre snapshots (DuckDB) e Postgres"""
+    backend = get_olap_backend()
+    boundary = await _olap_boundary(session, backend, tenant_id, period_start, period_end)
+    if boundary is None or not backend.has_products(tenant_id):
+        return await fetch_brand_performance(session, tenant_id, period_start, period_end)
+
+    archived = await asyncio.to_thread(backend.brand_performance, tenant_id, period_start, boundary)
+    recent = await fetch_brand_performance(session, tenant_id, boundary, period_end)
+    return merge_performance(archived, recent)
+
+
+async def query_interaction_count(
+    session: AsyncSession,
+    tenant_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> int:
+    """count_interactions roteado entre snapshots (DuckDB) e Postgres"""
+    backend = get_olap_backend()
+    boundary = await _olap_boundary(session, backend, tenant_id, period_start, period_end)
+    if boundary is None:
+        return await count_interactions(session, tenant_id, period_start, period_end)
+
+    archived = await asyncio.to_thread(backend.count_interactions, tenant_id, period_start, boundary)
+    return archived + await count_interactions(session, tenant_id, boundary, period_end)
+
+
+async def query_product_funnel(
+    session: AsyncSession,
+    tenant_id: int,
+    product_id: int,
+    period_start: datetime,
+    period_end: datetime,
+) -> ProductFunnel:
+    """fetch_product_funnel roteado entre snapshots (DuckDB) e Postgres"""
+    backend = get_olap_backend()
+    boundary = await _olap_boundary(session, backend, tenant_id, period_start, period_end)
+    if boundary is None:
+        return await fetch_product_funnel(session, tenant_id, product_id, period_start, period_end)
+
+    archived = await asyncio.to_thread(backend.product_funnel, tenant_id, product_id, period_start, boundary)
+    recent = await fetch_product_funnel(session, tenant_id, product_id, boundary, period_end)
+    return merge_funnels(archived, recent)
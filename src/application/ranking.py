@@ -0,0 +1,320 @@
+"""
+Ranking Index
+Ranking materializado por arquétipo (tenant, categoria, máscara de restrições, orçamento)
+
+O conjunto de entradas distintas do matchmaking é pequeno (enums do domínio),
+então o ranking de cada arquétipo é calculado uma vez por versão do catálogo
+e reutilizado como lookup por chave.
+"""
+import heapq
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from src.application.stack_optimizer import StackCandidate, pareto_front
+from src.core.config import settings
+from src.domain.enums import DietaryRestriction, MedicalCondition
+from src.infrastructure.cache.catalog import (
+    FLAG_ARTIFICIAL_SWEETENERS,
+    FLAG_MALTODEXTRIN,
+    FLAG_NO_GLUTEN,
+    FLAG_NO_LACTOSE,
+    FLAG_VEGAN,
+    NUTRITIONAL_FLAGS,
+    CatalogSnapshot,
+    get_catalog_cache,
+)
+
+
+# ============================================================================
+# Máscara de restrições
+# ============================================================================
+
+# Apenas restrições/condições que afetam a elegibilidade entram na máscara.
+# Cada bit: (flag nutricional, exige flag ligada?)
+RESTRICTION_RULES: dict[str, tuple[int, int, bool]] = {
+    MedicalCondition.DIABETES.value: (1 << 0, FLAG_MALTODEXTRIN, False),
+    DietaryRestriction.LACTOSE_FREE.value: (1 << 1, FLAG_NO_LACTOSE, True),
+    DietaryRestriction.VEGAN.value: (1 << 2, FLAG_VEGAN, True),
+    DietaryRestriction.GLUTEN_FREE.value: (1 << 3, FLAG_NO_GLUTEN, True),
+    DietaryRestriction.NO_ARTIFICIAL_SWEETENERS.value: (1 << 4, FLAG_ARTIFICIAL_SWEETENERS, False),
+}
+
+
+def restriction_mask(
+    dietary_restrictions: Iterable[str] | None,
+    medical_conditions: Iterable[str] | None,
+) -> int:
+    """Normaliza restrições e condições do usuário em uma máscara de bits"""
+    mask = 0
+    for value in [*(dietary_restrictions or []), *(medical_conditions or [])]:
+        rule = RESTRICTION_RULES.get(value)
+        if rule:
+            mask |= rule[0]
+    return mask
+
+
+def nutritional_filters(mask: int) -> tuple[list[str], list[str]]:
+    """
+    Converte a máscara em chaves de nutritional_info exigidas/proibidas
+    Usado para filtrar no servidor via contenção JSONB
+    """
+    keys_by_flag = {flag: key for key, flag in NUTRITIONAL_FLAGS.items()}
+    required, forbidden = [], []
+    for bit, flag, is_required in RESTRICTION_RULES.values():
+        if mask & bit:
+            (required if is_required else forbidden).append(keys_by_flag[flag])
+    return required, forbidden
+
+
+def is_eligible(flags: int, mask: int) -> bool:
+    """Verifica se um produto (flags nutricionais) atende à máscara de restrições"""
+    for bit, flag, required in RESTRICTION_RULES.values():
+        if mask & bit and bool(flags & flag) != required:
+            return False
+    return True
+
+
+# ============================================================================
+# Score
+# ============================================================================
+
+def score_product(
+    price: float,
+    protein_g: float,
+    flags: int,
+    certifications: tuple[str, ...],
+) -> tuple[float, list[str]]:
+    """Calcula score (0-100) e justificativas de um produto"""
+    score = 0.0
+    reasons = []
+
+    # Score de proteína (peso: 40%)
+    if protein_g > 0:
+        protein_score = min(100, (protein_g / 30.0) * 100)
+        score += protein_score * 0.4
+        reasons.append(f"Alto teor de proteína ({protein_g}g)")
+
+    # Score de custo-benefício (peso: 30%)
+    if protein_g > 0:
+        price_per_protein = price / protein_g
+        cost_benefit_score = max(0, 100 - (price_per_protein * 2))  # Menor preço = maior score
+        score += cost_benefit_score * 0.3
+        reasons.append(f"Bom custo-benefício (R$ {price_per_protein:.2f}/g proteína)")
+
+    # Score de certificações (peso: 20%)
+    cert_score = len(certifications) * 20  # Max 100 para 5+ certificações
+    score += min(100, cert_score) * 0.2
+    if certifications:
+        reasons.append(f"Certificações: {', '.join(certifications)}")
+
+    # Score de pureza/ingredientes (peso: 10%)
+    # Produtos sem aditivos desnecessários ganham pontos
+    if not flags & FLAG_ARTIFICIAL_SWEETENERS:
+        score += 10
+        reasons.append("Sem adoçantes artificiais")
+
+    if not flags & FLAG_MALTODEXTRIN:
+        score += 10
+        reasons.append("Sem maltodextrina")
+
+    # Normalizar score (0-100)
+    return min(100, max(0, score)), reasons
+
+
+# ============================================================================
+# Estruturas materializadas
+# ============================================================================
+
+@dataclass(slots=True)
+class ScoredCatalog:
+    """
+    Scores base (sem orçamento) de todos os produtos de um snapshot
+    Guarda só a versão: o snapshot despejado do cache de catálogo pode ser liberado
+    """
+    version: int
+    scores: tuple[float, ...]
+    reasons: tuple[list[str], ...]
+    available_products: list[dict[str, Any]]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> "ScoredCatalog":
+        scored = [
+            score_product(
+                snapshot.prices[i],
+                snapshot.protein_g[i],
+                snapshot.flags[i],
+                snapshot.certifications[i],
+            )
+            for i in range(len(snapshot))
+        ]
+        return cls(
+            version=snapshot.version,
+            scores=tuple(score for score, _ in scored),
+            reasons=tuple(reasons for _, reasons in scored),
+            available_products=[_product_ref(snapshot, i) for i in range(len(snapshot))],
+        )
+
+
+@dataclass(slots=True)
+class RankedArchetype:
+    """Ranking materializado de um arquétipo"""
+    version: int
+    filtered_products: list[dict[str, Any]]
+    ranked_products: list[dict[str, Any]]
+    ranking_data: dict[str, dict[str, Any]]
+    stack_products: list[dict[str, Any]]  # fronteira preço × score de todos os elegíveis
+
+    @property
+    def recommended_product_ids(self) -> list[int]:
+        """IDs do top 3"""
+        return [p["id"] for p in self.ranked_products[:3]]
+
+
+def _product_ref(snapshot: CatalogSnapshot, i: int) -> dict[str, Any]:
+    return {
+        "id": snapshot.ids[i],
+        "brand_name": snapshot.brand_names[i],
+        "product_name": snapshot.product_names[i],
+    }
+
+
+def rank_archetype(
+    scored: ScoredCatalog,
+    snapshot: CatalogSnapshot,
+    mask: int,
+    budget_range: str | None,
+    top_n: int,
+) -> RankedArchetype:
+    """
+    Materializa o top-N de um arquétipo a partir do catálogo pontuado
+    Orçamento: produtos acima do teto + tolerância são descartados (recorte por
+    busca binária no snapshot ordenado por preço); acima do teto, penalidade suave
+    Candidatos do stack: fronteira de Pareto (preço × score) de todos os elegíveis,
+    não só do top-N (um produto barato fora do top-N pode viabilizar o stack)
+    """
+    band = snapshot.budget_bands.get(budget_range) if budget_range else None
+    ceiling = band.ceiling(settings.BUDGET_TOLERANCE) if band else None
+    in_budget = len(snapshot) if ceiling is None else bisect_right(snapshot.prices, ceiling)
+
+    eligible = [i for i in range(in_budget) if is_eligible(snapshot.flags[i], mask)]
+    penalties = {i: band.penalty(snapshot.prices[i]) for i in eligible} if band else {}
+
+    def adjusted_score(i: int) -> float:
+        return max(0.0, scored.scores[i] - penalties.get(i, 0.0))
+
+    def ranked_product(i: int) -> dict[str, Any]:
+        reasons = scored.reasons[i]
+        if penalties.get(i):
+            reasons = [*reasons, f"Acima do orçamento {budget_range} (até R$ {band.max_price:.2f})"]
+        return {
+            **_product_ref(snapshot, i),
+            "price": snapshot.prices[i],
+            "score": adjusted_score(i),
+            "reasons": reasons,
+        }
+
+    ranked_products = [ranked_product(i) for i in heapq.nlargest(top_n, eligible, key=adjusted_score)]
+    ranking_data: dict[str, dict[str, Any]] = {
+        str(p["id"]): {
+            "score": p["score"],
+            "reasons": p["reasons"],
+            "match_score": p["score"] / 100.0,
+        }
+        for p in ranked_products
+    }
+
+    # product_id = índice no snapshot (resolvido em ranked_product abaixo)
+    front = pareto_front(
+        StackCandidate(i, snapshot.category, snapshot.prices[i], adjusted_score(i)) for i in eligible
+    )
+
+    return RankedArchetype(
+        version=snapshot.version,
+        filtered_products=[_product_ref(snapshot, i) for i in eligible],
+        ranked_products=ranked_products,
+        ranking_data=ranking_data,
+        stack_products=[ranked_product(candidate.product_id) for candidate in front],
+    )
+
+
+# ============================================================================
+# Índice
+# ============================================================================
+
+ArchetypeKey = tuple[int, str, int, str | None]
+
+
+class RankingIndex:
+    """
+    Índice em memória de rankings por arquétipo
+    Quando a versão do catálogo do tenant muda, apenas as entradas daquele
+    tenant/categoria são recalculadas (os demais tenants não são tocados)
+    Entradas de snapshots despejados/substituídos no cache de catálogo são descartadas
+    (discard), mantendo o índice limitado pelo CATALOG_CACHE_MAX_BYTES
+    """
+
+    def __init__(self, top_n: int = 20) -> None:
+        self._top_n = top_n
+        self._scored: dict[tuple[int, str], ScoredCatalog] = {}
+        self._archetypes: dict[ArchetypeKey, RankedArchetype] = {}
+
+    def lookup(
+        self,
+        snapshot: CatalogSnapshot,
+        mask: int,
+        budget_range: str | None = None,
+    ) -> RankedArchetype:
+        """Retorna ranking do arquétipo, materializando se necessário"""
+        key: ArchetypeKey = (snapshot.tenant_id, snapshot.category, mask, budget_range)
+        ranked = self._archetypes.get(key)
+        if ranked is not None and ranked.version == snapshot.version:
+            return ranked
+
+        ranked = rank_archetype(self._scored_catalog(snapshot), snapshot, mask, budget_range, self._top_n)
+        self._archetypes[key] = ranked
+        return ranked
+
+    def available_products(self, snapshot: CatalogSnapshot) -> list[dict[str, Any]]:
+        """Lista de produtos disponíveis do snapshot"""
+        return self._scored_catalog(snapshot).available_products
+
+    def invalidate(self, tenant_id: int | None = None) -> None:
+        """Remove entradas de um tenant (ou de todos)"""
+        for key in list(self._scored):
+            if tenant_id is None or key[0] == tenant_id:
+                del self._scored[key]
+        for archetype_key in list(self._archetypes):
+            if tenant_id is None or archetype_key[0] == tenant_id:
+                del self._archetypes[archetype_key]
+
+    def discard(self, tenant_id: int, category: str) -> None:
+        """Remove as entradas de um tenant/categoria (snapshot saiu do cache de catálogo)"""
+        self._scored.pop((tenant_id, category), None)
+        for archetype_key in [k for k in self._archetypes if k[:2] == (tenant_id, category)]:
+            del self._archetypes[archetype_key]
+
+    def _scored_catalog(self, snapshot: CatalogSnapshot) -> ScoredCatalog:
+        key = (snapshot.tenant_id, snapshot.category)
+        scored = self._scored.get(key)
+        if scored is not None and scored.version == snapshot.version:
+            return scored
+
+        # Catálogo mudou: descarta arquétipos obsoletos do tenant/categoria
+        self.discard(*key)
+        scored = ScoredCatalog.from_snapshot(snapshot)
+        self._scored[key] = scored
+        return scored
+
+
+# Singleton do índice de ranking
+_ranking_index: RankingIndex | None = None
+
+
+def get_ranking_index() -> RankingIndex:
+    """Retorna instância singleton do índice de ranking"""
+    global _ranking_index
+    if _ranking_index is None:
+        _ranking_index = RankingIndex(top_n=settings.RANKING_TOP_N)
+        get_catalog_cache().add_eviction_listener(_ranking_index.discard)
+    return _ranking_index
@@ -0,0 +1,295 @@
+"""
+Distinct Count Sketches (HyperLogLog)
+Contagens distintas aproximadas de sessões e perfis por (tenant, dia, produto)
+
+- Um sketch por métrica em daily_distinct_sketches (2^HLL_PRECISION registradores de 1 byte)
+- Após o insert do log, a interação entra no buffer em memória do processo (registradores
+  esparsos por (tenant, dia, produto)); a tarefa periódica grava o buffer em lote, fora da
+  transação do /chat. Buffer perdido em queda do processo: rebuild_distinct_sketches recalcula
+- Consulta: união (máximo por registrador) dos dias do período, estimativa na aplicação
+- Erro padrão relativo de HLL_STANDARD_ERROR, independente do volume
+"""
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from hashlib import blake2b
+from typing import Iterable, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.database import AsyncSessionLocal
+from src.domain.models import DailyDistinctSketch, InteractionLog
+
+# Alterar a precisão invalida os sketches gravados
+HLL_PRECISION = 11
+HLL_REGISTERS = 1 << HLL_PRECISION
+HLL_STANDARD_ERROR = 1.04 / math.sqrt(HLL_REGISTERS)
+
+# product_id dos sketches do tenant inteiro
+ALL_PRODUCTS = 0
+
+_HASH_BITS = 64
+_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(_HASH_BITS - HLL_PRECISION + 2)]
+
+
+def hll_position(value: str) -> tuple[int, int]:
+    """(registrador, rank) do valor: bits baixos do hash escolhem o registrador"""
+    hashed = int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+    remaining = hashed >> HLL_PRECISION
+    rank = (_HASH_BITS - HLL_PRECISION) - remaining.bit_length() + 1
+    return hashed & (HLL_REGISTERS - 1), rank
+
+
+class HyperLogLog:
+    """Registradores HLL em bytearray (mesmo formato do bytea no banco)"""
+    __slots__ = ("registers",)
+
+    def __init__(self, registers: Optional[bytes] = None):
+        self.registers = bytearray(registers or HLL_REGISTERS)
+
+    @classmethod
+    def union(cls, sketches: Iterable[bytes]) -> "HyperLogLog":
+        """Máximo por registrador de vários sketches"""
+        sketches = list(sketches)
+        if not sketches:
+            return cls()
+        if len(sketches) == 1:
+            return cls(sketches[0])
+        return cls(bytes(map(max, *sketches)))
+
+    def add(self, value: str) -> None:
+        index, rank = hll_position(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> float:
+        """Estimativa de cardinalidade (linear counting para cardinalidades pequenas)"""
+        total = sum(map(_INVERSE_POWERS.__getitem__, self.registers))
+        estimate = _ALPHA * HLL_REGISTERS * HLL_REGISTERS / total
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * HLL_REGISTERS and zeros:
+            return HLL_REGISTERS * math.log(HLL_REGISTERS / zeros)
+        return estimate
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+@dataclass(frozen=True, slots=True)
+class DistinctCounts:
+    """Contagens distintas aproximadas (relative_error = erro padrão relativo)"""
+    sessions: int
+    profiles: int
+    relative_error: float = HLL_STANDARD_ERROR
+
+
+# ============================================================================
+# BUFFER (insert do log) E GRAVAÇÃO EM LOTE
+# ============================================================================
+
+SketchKey = tuple[int, date, int]  # (tenant_id, dia, product_id)
+SparseRegisters = dict[int, int]  # registrador -> rank
+
+
+def _bump(registers: SparseRegisters, index: int, rank: int) -> None:
+    if rank > registers.get(index, 0):
+        registers[index] = rank
+
+
+def _merged(current: bytes, registers: SparseRegisters) -> Optional[bytes]:
+    """Sketch gravado com os registradores pendentes; None se nenhum aumenta"""
+    merged = bytearray(current)
+    changed = False
+    for index, rank in registers.items():
+        if rank > merged[index]:
+            merged[index] = rank
+            changed = True
+    return bytes(merged) if changed else None
+
+
+class SketchBuffer:
+    """Registradores HLL pendentes por (tenant, dia, produto) no processo"""
+
+    def __init__(self) -> None:
+        self._pending: dict[SketchKey, tuple[SparseRegisters, SparseRegisters]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        tenant_id: int,
+        day: date,
+        session_id: str,
+        user_profile_id: Optional[int],
+        product_ids: Iterable[int],
+    ) -> None:
+        """Adiciona a interação aos sketches do tenant e de cada produto recomendado"""
+        session_position = hll_position(session_id)
+        profile_position = hll_position(str(user_profile_id)) if user_profile_id is not None else None
+        for product_id in [ALL_PRODUCTS, *set(product_ids)]:
+            sessions, profiles = self._pending.setdefault((tenant_id, day, product_id), ({}, {}))
+            _bump(sessions, *session_position)
+            if profile_position is not None:
+                _bump(profiles, *profile_position)
+
+    def drain(self) -> dict[SketchKey, tuple[SparseRegisters, SparseRegisters]]:
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: dict[SketchKey, tuple[SparseRegisters, SparseRegisters]]) -> None:
+        """Devolve registradores não gravados (falha no flush) ao buffer"""
+        for key, (sessions, profiles) in pending.items():
+            current_sessions, current_profiles = self._pending.setdefault(key, ({}, {}))
+            for index, rank in sessions.items():
+                _bump(current_sessions, index, rank)
+            for index, rank in profiles.items():
+                _bump(current_profiles, index, rank)
+
+
+async def flush_distinct_sketches(session: AsyncSession, buffer: SketchBuffer) -> int:
+    """
+    Grava o buffer: cria as linhas ausentes, trava as existentes (ordem fixa, evita
+    deadlock entre workers), une os registradores e atualiza só as que aumentaram
+    Retorna o número de sketches atualizados
+    """
+    pending = buffer.drain()
+    if not pending:
+        return 0
+    try:
+        keys = sorted(pending)
+        empty = bytes(HLL_REGISTERS)
+        await session.execute(
+            pg_insert(DailyDistinctSketch)
+            .values([
+                {"tenant_id": tenant_id, "day": day, "product_id": product_id, "sessions": empty, "profiles": empty}
+                for tenant_id, day, product_id in keys
+            ])
+            .on_conflict_do_nothing(index_elements=["tenant_id", "day", "product_id"])
+        )
+        key_columns = (DailyDistinctSketch.tenant_id, DailyDistinctSketch.day, DailyDistinctSketch.product_id)
+        rows = (await session.exec(
+            select(*key_columns, DailyDistinctSketch.sessions, DailyDistinctSketch.profiles)
+            .where(tuple_(*key_columns).in_(keys))
+            .order_by(*key_columns)
+            .with_for_update()
+        )).all()
+
+        updates = []
+        for tenant_id, day, product_id, current_sessions, current_profiles in rows:
+            sessions, profiles = pending[(tenant_id, day, product_id)]
+            merged_sessions = _merged(current_sessions, sessions)
+            merged_profiles = _merged(current_profiles, profiles)
+            if merged_sessions is None and merged_profiles is None:
+                continue
+            updates.append({
+                "tenant_id": tenant_id,
+                "day": day,
+                "product_id": product_id,
+                "sessions": merged_sessions or current_sessions,
+                "profiles": merged_profiles or current_profiles,
+            })
+        if updates:
+            stmt = pg_insert(DailyDistinctSketch).values(updates)
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=["tenant_id", "day", "product_id"],
+                set_={"sessions": stmt.excluded.sessions, "profiles": stmt.excluded.profiles},
+            ))
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        buffer.restore(pending)
+        raise
+    return len(updates)
+
+
+# Singleton do buffer de sketches
+_sketch_buffer: SketchBuffer | None = None
+
+
+def get_sketch_buffer() -> SketchBuffer:
+    """Retorna instância singleton do buffer de sketches"""
+    global _sketch_buffer
+    if _sketch_buffer is None:
+        _sketch_buffer = SketchBuffer()
+    return _sketch_buffer
+
+
+async def run_sketch_flush() -> None:
+    """Gravação do buffer com sessão própria (tarefa periódica da aplicação e shutdown)"""
+    async with AsyncSessionLocal() as session:
+        await flush_distinct_sketches(session, get_sketch_buffer())
+
+
+async def rebuild_distinct_sketches(session: AsyncSession, tenant_id: int, day: date) -> int:
+    """
+    Recalcula os sketches de um dia a partir de interaction_logs (backfill de dias fechados)
+    Retorna o número de sketches gravados
+    """
+    start = datetime.combine(day, time.min)
+    stmt = (
+        select(InteractionLog.session_id, InteractionLog.user_profile_id, InteractionLog.recommended_products)
+        .where(InteractionLog.tenant_id == tenant_id)
+        .where(InteractionLog.created_at >= start)
+        .where(InteractionLog.created_at < start + timedelta(days=1))
+    )
+    sketches: dict[int, tuple[HyperLogLog, HyperLogLog]] = {}
+    result = await session.stream(stmt.execution_options(yield_per=5_000))
+    async for session_id, user_profile_id, recommended_products in result:
+        for product_id in [ALL_PRODUCTS, *(recommended_products or [])]:
+            sessions, profiles = sketches.setdefault(product_id, (HyperLogLog(), HyperLogLog()))
+            sessions.add(session_id)
+            if user_profile_id is not None:
+                profiles.add(str(user_profile_id))
+
+    if not sketches:
+        return 0
+    stmt = pg_insert(DailyDistinctSketch).values([
+        {
+            "tenant_id": tenant_id,
+            "day": day,
+            "product_id": product_id,
+            "sessions": sessions.to_bytes(),
+            "profiles": profiles.to_bytes(),
+        }
+        for product_id, (sessions, profiles) in sorted(sketches.items())
+    ])
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "day", "product_id"],
+        set_={"sessions": stmt.excluded.sessions, "profiles": stmt.excluded.profiles},
+    ))
+    await session.commit()
+    return len(sketches)
+
+
+# ============================================================================
+# CONSULTA
+# ============================================================================
+
+async def fetch_distinct_counts(
+    session: AsyncSession,
+    tenant_id: int,
+    first_day: date,
+    last_day: date,
+    product_id: int = ALL_PRODUCTS,
+) -> DistinctCounts:
+    """
+    Sessões e perfis distintos nos dias [first_day, last_day] (inclusivo), do tenant
+    ou dos que receberam product_id como recomendação
+    """
+    rows = (await session.exec(
+        select(DailyDistinctSketch.sessions, DailyDistinctSketch.profiles)
+        .where(DailyDistinctSketch.tenant_id == tenant_id)
+        .where(DailyDistinctSketch.product_id == product_id)
+        .where(DailyDistinctSketch.day >= first_day)
+        .where(DailyDistinctSketch.day <= last_day)
+    )).all()
+
+    return DistinctCounts(
+        sessions=round(HyperLogLog.union(row.sessions for row in rows).estimate()),
+        profiles=round(HyperLogLog.union(row.profiles for row in rows).estimate()),
+    )
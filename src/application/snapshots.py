@@ -0,0 +1,409 @@
+"""
+Analytics Snapshots (Parquet)
+Exporta interaction_logs, ranking_data achatado e products em Parquet
+particionado por tenant e mês, para modelagem offline e consultas OLAP
+
+Layout (hive): {root}/{dataset}/tenant_id={id}/month=AAAA-MM/data.parquet
+(products é um snapshot por tenant, sem mês)
+
+Leitura em bloco via COPY ... TO STDOUT (CSV) do asyncpg para arquivo temporário,
+convertido para Arrow com tipos explícitos (parser colunar em C, sem objetos por linha).
+Requer o extra "analytics" (pyarrow).
+
+Meses fechados são pulados se já exportados completos, exceto os marcados em
+snapshot_dirty_months (feedback tardio, ver mark_dirty_months). Jobs da API ficam
+em snapshot_jobs: o status é consultado em qualquer worker.
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.database import AsyncSessionLocal, get_async_engine
+from src.domain.models import InteractionLog, SnapshotDirtyMonth, SnapshotJob
+from src.infrastructure.partitioning import add_months, month_floor
+
+# Separador de itens de listas no CSV do COPY (não aparece em textos de justificativa)
+LIST_SEPARATOR = "\x1f"
+
+# Jobs finalizados há mais tempo que isso são removidos de snapshot_jobs
+JOB_RETENTION = timedelta(days=30)
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotDataset:
+    """Dataset exportado: query COPY ($1 = tenant, $2/$3 = intervalo de created_at) e tipos"""
+    name: str
+    query: str
+    column_types: dict[str, str]
+    list_columns: dict[str, str] = field(default_factory=dict)  # coluna -> tipo dos itens
+    monthly: bool = True
+
+
+INTERACTIONS = SnapshotDataset(
+    name="interactions",
+    query=f"""
+        SELECT id, tenant_id, created_at, session_id, user_profile_id,
+               selected_product_id, satisfaction_score,
+               NULLIF(array_to_string(recommended_products, '{LIST_SEPARATOR}'), '') AS recommended_products
+        FROM interaction_logs
+        WHERE tenant_id = $1 AND created_at >= $2 AND created_at < $3
+        ORDER BY created_at, id
+    """,
+    column_types={
+        "id": "int64",
+        "tenant_id": "int32",
+        "created_at": "timestamp[us]",
+        "session_id": "string",
+        "user_profile_id": "int64",
+        "selected_product_id": "int64",
+        "satisfaction_score": "int16",
+        "recommended_products": "string",
+    },
+    list_columns={"recommended_products": "int64"},
+)
+
+# ranking_data achatado: uma linha por (interação, produto ranqueado)
+RANKINGS = SnapshotDataset(
+    name="rankings",
+    query=f"""
+        SELECT l.id AS log_id, l.tenant_id, l.created_at,
+               r.key::bigint AS product_id,
+               (r.value->>'score')::double precision AS score,
+               (r.value->>'match_score')::double precision AS match_score,
+               r.value->'reasons'->>0 AS reason,
+               CASE WHEN jsonb_typeof(r.value->'reasons') = 'array' THEN (
+                   SELECT string_agg(reason, '{LIST_SEPARATOR}')
+                   FROM jsonb_array_elements_text(r.value->'reasons') AS reason
+               ) END AS reasons
+        FROM interaction_logs l
+        CROSS JOIN LATERAL jsonb_each(l.ranking_data) AS r(key, value)
+        WHERE l.tenant_id = $1 AND l.created_at >= $2 AND l.created_at < $3
+          AND r.key ~ '^[0-9]+$' AND jsonb_typeof(r.value) = 'object'
+        ORDER BY l.created_at, l.id
+    """,
+    column_types={
+        "log_id": "int64",
+        "tenant_id": "int32",
+        "created_at": "timestamp[us]",
+        "product_id": "int64",
+        "score": "double",
+        "match_score": "double",
+        "reason": "string",
+        "reasons": "string",
+    },
+    list_columns={"reasons": "string"},
+)
+
+PRODUCTS = SnapshotDataset(
+    name="products",
+    query=f"""
+        SELECT id, tenant_id, brand_name, product_name, category, price, currency,
+               protein_g, serving_size_g, price_per_protein, stock_quantity, is_active,
+               NULLIF(array_to_string(certifications, '{LIST_SEPARATOR}'), '') AS certifications
+        FROM products
+        WHERE tenant_id = $1
+        ORDER BY id
+    """,
+    column_types={
+        "id": "int64",
+        "tenant_id": "int32",
+        "brand_name": "string",
+        "product_name": "string",
+        "category": "string",
+        "price": "double",
+        "currency": "string",
+        "protein_g": "double",
+        "serving_size_g": "double",
+        "price_per_protein": "double",
+        "stock_quantity": "int32",
+        "is_active": "bool",
+        "certifications": "string",
+    },
+    list_columns={"certifications": "string"},
+    monthly=False,
+)
+
+SNAPSHOT_DATASETS = (INTERACTIONS, RANKINGS, PRODUCTS)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError(
+            "Exportação Parquet requer pyarrow: instale com `poetry install -E analytics`"
+        ) from exc
+
+
+# ============================================================================
+# CONVERSÃO (CSV do COPY -> Arrow -> Parquet)
+# ============================================================================
+
+def read_copy_csv(path: str | Path, dataset: SnapshotDataset):
+    """Lê o CSV gerado pelo COPY como pyarrow.Table tipada"""
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv
+
+    table = csv.read_csv(
+        path,
+        convert_options=csv.ConvertOptions(
+            column_types={name: pa.type_for_alias(alias) for name, alias in dataset.column_types.items()},
+            include_columns=list(dataset.column_types),
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,  # "" = texto vazio, vazio sem aspas = NULL
+            true_values=["t"],
+            false_values=["f"],
+        ),
+    )
+    for name, item_type in dataset.list_columns.items():
+        index = table.schema.get_field_index(name)
+        items = pc.split_pattern(table.column(name), LIST_SEPARATOR)
+        table = table.set_column(
+            index, name, items.cast(pa.list_(pa.type_for_alias(item_type)))
+        )
+    return table
+
+
+def write_parquet(table, path: Path) -> None:
+    """Escrita atômica (arquivo temporário + rename)"""
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def snapshot_path(root: Path, dataset: SnapshotDataset, tenant_id: int, month: Optional[date] = None) -> Path:
+    """Caminho hive-partitioned do arquivo"""
+    path = root / dataset.name / f"tenant_id={tenant_id}"
+    if dataset.monthly:
+        path = path / f"month={month:%Y-%m}"
+    return path / "data.parquet"
+
+
+def snapshot_complete(path: Path, month: date) -> bool:
+    """Arquivo mensal existe e foi gravado após o fim do mês (não é parcial)"""
+    try:
+        written_at = datetime.utcfromtimestamp(path.stat().st_mtime)
+    except FileNotFoundError:
+        return False
+    return written_at >= datetime.combine(add_months(month, 1), datetime.min.time())
+
+
+# ============================================================================
+# MESES ALTERADOS APÓS O SNAPSHOT
+# ============================================================================
+
+async def mark_dirty_months(session: AsyncSession, tenant_id: int, created_at: Iterable[datetime]) -> None:
+    """
+    Marca para reexportação os meses fechados das interações alteradas (na transação
+    de quem altera); o mês corrente é sempre regravado e não precisa de marca
+    """
+    current_month = month_floor(datetime.utcnow().date())
+    months = sorted(month for month in {month_floor(value.date()) for value in created_at} if month < current_month)
+    if not months:
+        return
+    marked_at = datetime.utcnow()
+    stmt = pg_insert(SnapshotDirtyMonth).values([
+        {"tenant_id": tenant_id, "month": month, "marked_at": marked_at} for month in months
+    ])
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "month"],
+        set_={"marked_at": stmt.excluded.marked_at},
+    ))
+
+
+async def load_dirty_months(session: AsyncSession, tenant_id: int) -> dict[date, datetime]:
+    """Meses marcados do tenant -> momento da marca"""
+    rows = await session.exec(
+        select(SnapshotDirtyMonth.month, SnapshotDirtyMonth.marked_at)
+        .where(SnapshotDirtyMonth.tenant_id == tenant_id)
+    )
+    return {month: marked_at for month, marked_at in rows.all()}
+
+
+async def clear_dirty_months(session: AsyncSession, tenant_id: int, exported: dict[date, datetime]) -> None:
+    """
+    Remove as marcas dos meses reexportados, apenas se inalteradas desde a leitura
+    (feedback que marcou o mês durante a exportação mantém a marca)
+    """
+    if not exported:
+        return
+    await session.exec(
+        delete(SnapshotDirtyMonth)
+        .where(SnapshotDirtyMonth.tenant_id == tenant_id)
+        .where(or_(*(
+            and_(SnapshotDirtyMonth.month == month, SnapshotDirtyMonth.marked_at == marked_at)
+            for month, marked_at in exported.items()
+        )))
+    )
+
+
+# ============================================================================
+# EXPORTAÇÃO
+# ============================================================================
+
+async def _copy_to_parquet(
+    raw_connection,
+    dataset: SnapshotDataset,
+    args: tuple,
+    path: Path,
+) -> int:
+    """
+    COPY da query para CSV temporário e conversão para Parquet; retorna linhas
+    Meses sem dados também geram arquivo (vazio): a existência do arquivo indica cobertura
+    """
+    fd, csv_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        await raw_connection.copy_from_query(
+            dataset.query, *args, output=csv_path, format="csv", header=True,
+        )
+        # Conversão é CPU-bound: fora do event loop
+        table = await asyncio.to_thread(read_copy_csv, csv_path, dataset)
+        await asyncio.to_thread(write_parquet, table, path)
+        return table.num_rows
+    finally:
+        os.unlink(csv_path)
+
+
+async def export_tenant_snapshot(
+    tenant_id: int,
+    root: Path,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    overwrite: bool = False,
+) -> list[Path]:
+    """
+    Exporta os datasets do tenant mês a mês (since/until: meses inclusivos;
+    padrão: do primeiro log até o mês corrente)
+    Meses já exportados completos são pulados, exceto com overwrite ou marcados
+    (mark_dirty_months); o mês corrente (ou exportado antes de fechar) é sempre regravado
+    """
+    _require_pyarrow()
+    root = Path(root)
+
+    current_month = month_floor(datetime.utcnow().date())
+    first = month_floor(since) if since else None
+    async with AsyncSessionLocal() as session:
+        dirty = await load_dirty_months(session, tenant_id)
+        if first is None:
+            oldest = (await session.exec(
+                select(func.min(InteractionLog.created_at)).where(InteractionLog.tenant_id == tenant_id)
+            )).one()
+            first = month_floor(oldest.date()) if oldest else current_month
+    last = min(month_floor(until), current_month) if until else current_month
+
+    months: list[date] = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+
+    written: list[Path] = []
+    rewritten: set[date] = set()
+    async with get_async_engine().connect() as conn:
+        raw_connection = (await conn.get_raw_connection()).driver_connection
+
+        for dataset in SNAPSHOT_DATASETS:
+            if not dataset.monthly:
+                path = snapshot_path(root, dataset, tenant_id)
+                await _copy_to_parquet(raw_connection, dataset, (tenant_id,), path)
+                written.append(path)
+                continue
+
+            for month in months:
+                path = snapshot_path(root, dataset, tenant_id, month)
+                if snapshot_complete(path, month) and month not in dirty and not overwrite:
+                    continue
+                start = datetime.combine(month, datetime.min.time())
+                end = datetime.combine(add_months(month, 1), datetime.min.time())
+                await _copy_to_parquet(raw_connection, dataset, (tenant_id, start, end), path)
+                written.append(path)
+                rewritten.add(month)
+
+    exported = {month: marked_at for month, marked_at in dirty.items() if month in rewritten}
+    if exported:
+        async with AsyncSessionLocal() as session:
+            await clear_dirty_months(session, tenant_id, exported)
+            await session.commit()
+    return written
+
+
+# ============================================================================
+# JOBS (API)
+# ============================================================================
+
+class SnapshotJobs:
+    """
+    Execução dos jobs de snapshot no processo que os recebeu
+    O estado é gravado em snapshot_jobs a cada transição (consultável em qualquer worker)
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def submit(self, tenant_id: int, root: Path, **kwargs: Any) -> SnapshotJob:
+        job = SnapshotJob(id=uuid.uuid4().hex, tenant_id=tenant_id)
+        await _save_job(job, prune=True)
+        self._tasks[job.id] = asyncio.create_task(self._run(job, root, kwargs))
+        return job
+
+    async def get(self, session: AsyncSession, job_id: str) -> Optional[SnapshotJob]:
+        return await session.get(SnapshotJob, job_id)
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs pendentes ou em execução neste processo"""
+        return len(self._tasks)
+
+    async def _run(self, job: SnapshotJob, root: Path, kwargs: dict[str, Any]) -> None:
+        try:
+            job.status = "running"
+            await _save_job(job)
+            paths = await export_tenant_snapshot(job.tenant_id, root, **kwargs)
+            job.files = [str(path) for path in paths]
+            job.status = "completed"
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._tasks.pop(job.id, None)
+        await _save_job(job)
+
+
+async def _save_job(job: SnapshotJob, prune: bool = False) -> None:
+    """Grava o estado do job (prune: remove os finalizados além de JOB_RETENTION)"""
+    async with AsyncSessionLocal() as session:
+        await session.merge(job)
+        if prune:
+            await session.exec(
+                delete(SnapshotJob).where(SnapshotJob.finished_at < datetime.utcnow() - JOB_RETENTION)
+            )
+        await session.commit()
+
+
+# Singleton do registro de jobs
+_snapshot_jobs: SnapshotJobs | None = None
+
+
+def get_snapshot_jobs() -> SnapshotJobs:
+    """Retorna instância singleton do registro de jobs de snapshot"""
+    global _snapshot_jobs
+    if _snapshot_jobs is None:
+        _snapshot_jobs = SnapshotJobs()
+    return _snapshot_jobs
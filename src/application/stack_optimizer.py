@@ -0,0 +1,113 @@
+"""
+Stack Optimizer
+Seleção do melhor "stack" de suplementos (no máximo um produto por categoria)
+sob o orçamento do usuário - knapsack de múltipla escolha
+
+Estratégia:
+1. Fronteira de Pareto por categoria: descarta produtos dominados (mais caros
+   e com score menor ou igual), reduzindo milhares de SKUs a poucas opções
+2. Branch-and-bound em profundidade sobre as categorias, com limite superior
+   = score atual + melhor score acessível de cada categoria restante
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Iterable
+
+# Tolerância para comparação de preços em float
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True, slots=True)
+class StackCandidate:
+    """Produto candidato a compor o stack"""
+    product_id: int
+    category: str
+    price: float
+    score: float
+
+
+@dataclass(frozen=True, slots=True)
+class StackSolution:
+    """Stack escolhido"""
+    items: tuple[StackCandidate, ...]
+    total_price: float
+    total_score: float
+
+
+def pareto_front(candidates: Iterable[StackCandidate]) -> list[StackCandidate]:
+    """
+    Fronteira de Pareto (preço × score) ordenada por preço crescente
+    Cada item da fronteira tem score estritamente maior que os mais baratos
+    """
+    front: list[StackCandidate] = []
+    for candidate in sorted(candidates, key=attrgetter("price")):
+        if candidate.score <= 0 or (front and candidate.score <= front[-1].score):
+            continue
+        if front and candidate.price == front[-1].price:
+            front[-1] = candidate  # mesmo preço, score maior
+        else:
+            front.append(candidate)
+    return front
+
+
+def solve_stack(
+    candidates_by_category: dict[str, list[StackCandidate]],
+    budget: float | None,
+) -> StackSolution:
+    """
+    Maximiza o score total escolhendo no máximo um produto por categoria
+    com soma de preços <= budget (None = sem teto)
+    Em empate de score, prefere o stack mais barato
+    """
+    fronts = [pareto_front(c) for c in candidates_by_category.values()]
+    fronts = [front for front in fronts if front]
+
+    # Sem teto: melhor produto de cada categoria
+    if budget is None:
+        items = tuple(front[-1] for front in fronts)
+        return _solution(items)
+
+    # Categorias com maior score potencial primeiro: incumbente bom mais cedo
+    fronts.sort(key=lambda front: front[-1].score, reverse=True)
+    prices = [[item.price for item in front] for front in fronts]
+
+    def best_affordable(k: int, remaining: float) -> float:
+        hi = bisect_right(prices[k], remaining + _EPSILON)
+        return fronts[k][hi - 1].score if hi else 0.0
+
+    best: list[tuple[float, float, tuple[StackCandidate, ...]]] = [(0.0, 0.0, ())]
+    chosen: list[StackCandidate] = []
+
+    def search(k: int, remaining: float, score: float) -> None:
+        best_score, best_price, _ = best[0]
+        spent = budget - remaining
+        if score > best_score + _EPSILON or (
+            abs(score - best_score) <= _EPSILON and spent < best_price - _EPSILON
+        ):
+            best[0] = (score, spent, tuple(chosen))
+        if k == len(fronts):
+            return
+
+        # Limite superior: nem escolhendo o melhor acessível de cada categoria restante supera
+        upper_bound = score + sum(best_affordable(j, remaining) for j in range(k, len(fronts)))
+        if upper_bound <= best[0][0] + _EPSILON:
+            return
+
+        hi = bisect_right(prices[k], remaining + _EPSILON)
+        for item in reversed(fronts[k][:hi]):  # maior score primeiro
+            chosen.append(item)
+            search(k + 1, remaining - item.price, score + item.score)
+            chosen.pop()
+        search(k + 1, remaining, score)  # não levar nada desta categoria
+
+    search(0, budget, 0.0)
+    return _solution(best[0][2])
+
+
+def _solution(items: tuple[StackCandidate, ...]) -> StackSolution:
+    return StackSolution(
+        items=items,
+        total_price=sum(item.price for item in items),
+        total_score=sum(item.score for item in items),
+    )
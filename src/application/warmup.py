@@ -0,0 +1,210 @@
+"""
+Warm-up
+Aquecimento de cada worker na startup, antes de receber tráfego
+
+- Compila o grafo do agente (get_graph) e constrói o cliente LLM
+- Abre WARMUP_POOL_CONNECTIONS conexões em cada engine (primário e réplicas)
+- Lê a base científica (evidência STRONG) e carrega no cache os catálogos dos
+  WARMUP_HOT_TENANTS tenants com mais interações recentes
+- Opcional: ping mínimo ao LLM (WARMUP_LLM_PING)
+
+Roda em background: /ready responde 503 até o fim, para o balanceador não mandar
+tráfego a um worker frio. Falha de uma etapa é logada e não impede as seguintes;
+ao fim (ou após WARMUP_TIMEOUT_SECONDS) o worker fica pronto de qualquer forma
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import func, text
+from sqlmodel import select
+
+from src.agents.graph import get_graph
+from src.agents.nodes.science_retriever import GOAL_TO_CATEGORIES, SCIENCE_COLUMNS
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, get_async_engine, get_replica_engines, open_read_session
+from src.core.pool import resolve_pool_profile
+from src.domain.enums import EvidenceLevel
+from src.domain.models import InteractionLog, ScientificData
+from src.infrastructure.cache.catalog import get_catalog_cache
+from src.infrastructure.llm.gemini import get_llm
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = Callable[[], Awaitable[object]]
+
+# Categorias consultadas pelo agente (principal + complementares de cada objetivo)
+WARMUP_CATEGORIES = list(dict.fromkeys(
+    category.value for categories in GOAL_TO_CATEGORIES.values() for category in categories
+))
+
+
+class WarmupState:
+    """Progresso do warm-up do processo (exposto em /health e /ready)"""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.steps: dict[str, str] = {}
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.finished_at = datetime.utcnow()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "steps": dict(self.steps),
+        }
+
+
+# Singleton do estado de warm-up
+_warmup_state: WarmupState | None = None
+_warmup_task: asyncio.Task | None = None
+
+
+def get_warmup_state() -> WarmupState:
+    """Retorna instância singleton do estado de warm-up"""
+    global _warmup_state
+    if _warmup_state is None:
+        _warmup_state = WarmupState()
+    return _warmup_state
+
+
+# ============================================================================
+# Etapas
+# ============================================================================
+
+async def warm_graph() -> None:
+    """Compila o grafo e constrói o cliente LLM (fora do event loop)"""
+    await asyncio.to_thread(get_graph)
+    await asyncio.to_thread(get_llm)
+
+
+async def warm_pool_connections() -> None:
+    """Abre conexões em cada engine, mantendo todas abertas até a última (sem reaproveitar)"""
+    count = min(settings.WARMUP_POOL_CONNECTIONS, resolve_pool_profile().pool_size)
+    for engine in [get_async_engine(), *get_replica_engines()]:
+        async with AsyncExitStack() as stack:
+            for _ in range(count):
+                conn = await stack.enter_async_context(engine.connect())
+                await conn.execute(text("SELECT 1"))
+
+
+async def warm_science() -> None:
+    """Lê a base científica consultada pelo science_retriever"""
+    stmt = select(*SCIENCE_COLUMNS).where(ScientificData.evidence_level == EvidenceLevel.STRONG)
+    async with open_read_session() as session:
+        (await session.exec(stmt)).all()
+
+
+async def hot_tenants(limit: int, window_hours: int) -> list[int]:
+    """Tenants com mais interações na janela (partition pruning em created_at)"""
+    since = datetime.utcnow() - timedelta(hours=window_hours)
+    stmt = (
+        select(InteractionLog.tenant_id)
+        .where(InteractionLog.created_at >= since)
+        .group_by(InteractionLog.tenant_id)
+        .order_by(func.count().desc())
+        .limit(limit)
+    )
+    async with open_read_session() as session:
+        return list((await session.exec(stmt)).all())
+
+
+async def warm_catalogs() -> None:
+    """Carrega no cache os catálogos dos tenants mais ativos"""
+    tenants = await hot_tenants(settings.WARMUP_HOT_TENANTS, settings.WARMUP_HOT_TENANTS_WINDOW_HOURS)
+    cache = get_catalog_cache()
+    # Primário: o snapshot fica em cache sob a versão atual (réplica atrasada gravaria linhas antigas)
+    async with AsyncSessionLocal() as session:
+        for tenant_id in tenants:
+            for category in WARMUP_CATEGORIES:
+                await cache.get(session, tenant_id, category)
+
+
+async def ping_llm() -> None:
+    """Chamada mínima ao LLM (credenciais, rede e quota)"""
+    await get_llm().ainvoke("ping")
+
+
+def warmup_steps() -> list[tuple[str, WarmupStep]]:
+    """Etapas habilitadas pelas configurações, em ordem"""
+    steps: list[tuple[str, WarmupStep]] = [
+        ("graph", warm_graph),
+        ("pool_connections", warm_pool_connections),
+        ("science", warm_science),
+    ]
+    if settings.CATALOG_CACHE_ENABLED and settings.WARMUP_HOT_TENANTS > 0:
+        steps.append(("catalogs", warm_catalogs))
+    if settings.WARMUP_LLM_PING:
+        steps.append(("llm_ping", ping_llm))
+    return steps
+
+
+# ============================================================================
+# Execução
+# ============================================================================
+
+async def run_warmup(
+    steps: list[tuple[str, WarmupStep]],
+    state: WarmupState,
+    timeout: float,
+) -> WarmupState:
+    """
+    Executa as etapas em sequência dentro do tempo total e marca o processo como pronto
+    state.steps registra a duração de cada etapa ou o erro
+    """
+    state.started_at = datetime.utcnow()
+    deadline = time.monotonic() + timeout
+    try:
+        for name, step in steps:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                state.steps[name] = "skipped: timeout"
+                continue
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(step(), remaining)
+                state.steps[name] = f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            except asyncio.TimeoutError:
+                state.steps[name] = "timeout"
+                logger.warning("Warm-up %s excedeu WARMUP_TIMEOUT_SECONDS", name)
+            except Exception as e:
+                state.steps[name] = f"error: {type(e).__name__}"
+                logger.exception("Falha no warm-up %s", name)
+    finally:
+        state.mark_ready()
+    return state
+
+
+def start_warmup() -> None:
+    """Inicia o warm-up em background (sem warm-up, o processo fica pronto imediatamente)"""
+    global _warmup_task
+    state = get_warmup_state()
+    if settings.TESTING or not settings.WARMUP_ENABLED:
+        state.mark_ready()
+        return
+    if _warmup_task is None or _warmup_task.done():
+        _warmup_task = asyncio.create_task(
+            run_warmup(warmup_steps(), state, settings.WARMUP_TIMEOUT_SECONDS), name="warmup"
+        )
+
+
+async def stop_warmup() -> None:
+    """Cancela o warm-up ainda em andamento (shutdown)"""
+    global _warmup_task
+    if _warmup_task is None:
+        return
+    _warmup_task.cancel()
+    try:
+        await _warmup_task
+    except asyncio.CancelledError:
+        pass
+    _warmup_task = None
@@ -0,0 +1,74 @@
+"""
+Background Tasks
+Tarefas periódicas executadas no event loop da aplicação (startup/shutdown)
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Executa func a cada interval segundos até ser parada
+    Erros são logados e não interrompem o agendamento
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Awaitable[object]]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha na tarefa periódica %s", self.name)
+            await asyncio.sleep(self.interval)
+
+
+_tasks: dict[str, PeriodicTask] = {}
+
+
+def start_periodic_task(name: str, interval: float, func: Callable[[], Awaitable[object]]) -> PeriodicTask:
+    """Registra e inicia uma tarefa periódica (idempotente por nome)"""
+    task = _tasks.get(name)
+    if task is None:
+        task = _tasks[name] = PeriodicTask(name, interval, func)
+    task.start()
+    return task
+
+
+def periodic_task_status() -> dict[str, bool]:
+    """Tarefas periódicas registradas e se estão rodando"""
+    return {name: task.running for name, task in _tasks.items()}
+
+
+async def stop_periodic_tasks() -> None:
+    """Para todas as tarefas periódicas (shutdown)"""
+    for task in list(_tasks.values()):
+        await task.stop()
+    _tasks.clear()
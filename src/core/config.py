@@ -22,6 +22,25 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
 
+    # Pool do engine assíncrono: perfil nomeado (default, small, large, pgbouncer; ver src/core/pool.py)
+    # e sobrescritas individuais (None = valor do perfil)
+    DATABASE_POOL_PROFILE: str = "default"
+    DATABASE_POOL_SIZE: int | None = None
+    DATABASE_POOL_MAX_OVERFLOW: int | None = None
+    DATABASE_POOL_RECYCLE_SECONDS: int | None = None
+    DATABASE_POOL_TIMEOUT_SECONDS: float | None = None
+    DATABASE_POOL_PRE_PING: str | None = None  # always | idle | never
+    DATABASE_POOL_PRE_PING_IDLE_SECONDS: float = 30.0
+    DATABASE_STATEMENT_CACHE_SIZE: int | None = None
+
+    # Réplicas de leitura (URLs postgresql+asyncpg://, JSON no .env); vazio = tudo no primário
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    REPLICA_MAX_LAG_SECONDS: float = 30.0
+    # Leituras do tenant ficam no primário por este tempo após uma escrita (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
     @property
     def DATABASE_URL_SYNC(self) -> str:
         """URL de conexão síncrona (para Alembic)"""
@@ -50,6 +69,71 @@ class Settings(BaseSettings):
     VERTEX_AI_LOCATION: str = "us-central1"
     GEMINI_MODEL: str = "gemini-2.0-flash-exp"
 
+    # Cache de catálogo (snapshot em memória por tenant/categoria)
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Orçamento: tolerância acima do teto da faixa (0.25 = até 25% acima, com penalidade)
+    BUDGET_TOLERANCE: float = 0.25
+
+    # Ranking materializado por arquétipo
+    RANKING_TOP_N: int = 20
+
+    # Rollup diário de analytics (job incremental em background)
+    ROLLUP_ENABLED: bool = True
+    ROLLUP_INTERVAL_SECONDS: float = 60.0
+    ROLLUP_SAFETY_LAG_SECONDS: float = 120.0
+    ROLLUP_BATCH_SIZE: int = 50_000
+
+    # Particionamento mensal de interaction_logs e retenção
+    INTERACTION_LOG_PARTITIONS_AHEAD: int = 3
+    INTERACTION_LOG_RETENTION_MONTHS: int = 13
+    INTERACTION_LOG_ARCHIVE_SCHEMA: str = "archive"
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+
+    # Exportação em streaming (linhas por transação / por lote do cursor server-side)
+    EXPORT_WINDOW_ROWS: int = 50_000
+    EXPORT_CHUNK_ROWS: int = 1_000
+
+    # Snapshots Parquet de analytics (extra "analytics")
+    ANALYTICS_SNAPSHOT_DIR: str = "data/snapshots"
+    # Consultas longas de analytics via DuckDB sobre os snapshots (extra "analytics")
+    ANALYTICS_OLAP_ENABLED: bool = False
+    ANALYTICS_OLAP_MIN_DAYS: int = 90
+
+    # Contadores ao vivo em memória (GET /analytics/live)
+    LIVE_COUNTERS_ENABLED: bool = True
+    LIVE_COUNTERS_WINDOW_SECONDS: int = 3600
+    LIVE_COUNTERS_BUCKET_SECONDS: int = 60
+    LIVE_COUNTERS_RECONCILE_SECONDS: float = 300.0
+
+    # Sketches HLL de contagem distinta: intervalo de gravação do buffer em memória
+    SKETCH_FLUSH_SECONDS: float = 10.0
+
+    # Ingestão de feedback em lote (POST /analytics/feedback/batch)
+    FEEDBACK_BATCH_MAX_EVENTS: int = 10_000
+
+    # Warm-up do worker na startup (/ready responde 503 até terminar)
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 30.0
+    WARMUP_POOL_CONNECTIONS: int = 5  # por engine, limitado ao pool_size do perfil
+    WARMUP_HOT_TENANTS: int = 10  # catálogos carregados: tenants com mais interações na janela
+    WARMUP_HOT_TENANTS_WINDOW_HOURS: int = 24
+    WARMUP_LLM_PING: bool = False  # chamada mínima ao LLM (credenciais/quota)
+
+    # Health checks (/health, /ready): resultados das sondagens reaproveitados por HEALTH_PROBE_TTL_SECONDS
+    HEALTH_PROBE_TTL_SECONDS: float = 5.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_POOL_SATURATION_MAX: float = 0.95  # /ready falha com o pool primário acima disso
+    HEALTH_LLM_PROBE_ENABLED: bool = False  # ping ativo ao LLM; senão, resultado das chamadas reais
+    HEALTH_LLM_PROBE_TTL_SECONDS: float = 300.0
+
+    # Invalidação de caches entre processos (LISTEN/NOTIFY; ver src/core/invalidation.py)
+    INVALIDATION_BUS_ENABLED: bool = True
+    INVALIDATION_BUS_URL: str | None = None  # conexão direta ao Postgres (LISTEN não funciona via PgBouncer em modo transação)
+    INVALIDATION_VERSION_CHECK_SECONDS: float = 30.0
+    INVALIDATION_RECONNECT_SECONDS: float = 5.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -2,34 +2,82 @@
 Database Configuration and SQLModel Setup
 Estratégia Multitenant: Isolamento via tenant_id em todas as tabelas de negócio
 """
-from typing import AsyncGenerator
+import asyncio
+import functools
+import itertools
+import logging
+import time
+from typing import Any, AsyncGenerator
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from sqlmodel import SQLModel, create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
 
 from src.core.config import settings
+from src.core.invalidation import InvalidationEvent, InvalidationKind, get_invalidation_bus, queue_invalidation
+from src.core.pool import create_pooled_engine
 
-# Engine síncrono para migrations (Alembic)
-sync_engine = create_engine(
-    settings.DATABASE_URL_SYNC,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-)
+logger = logging.getLogger(__name__)
+
+# Engines criados no primeiro uso: importar o módulo não carrega drivers (asyncpg/psycopg2)
+# nem abre pools, o que acelera o startup de workers e scripts que não usam o banco
+
+# Singleton do engine síncrono (init_db, seeders e Alembic)
+_sync_engine: Engine | None = None
+
+# Singleton do engine assíncrono (pool conforme DATABASE_POOL_PROFILE)
+_async_engine: AsyncEngine | None = None
+
+# Singleton dos engines das réplicas de leitura (mesmo perfil do primário)
+_replica_engines: list[AsyncEngine] | None = None
+
+
+def get_sync_engine() -> Engine:
+    """Retorna o engine síncrono (psycopg2)"""
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(
+            settings.DATABASE_URL_SYNC,
+            echo=settings.DEBUG,
+            pool_pre_ping=True,
+        )
+    return _sync_engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Retorna o engine assíncrono da aplicação (primário)"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_pooled_engine(settings.DATABASE_URL_ASYNC, "primary")
+    return _async_engine
+
+
+def get_replica_engines() -> list[AsyncEngine]:
+    """Retorna os engines das réplicas de leitura (vazio sem DATABASE_REPLICA_URLS)"""
+    global _replica_engines
+    if _replica_engines is None:
+        _replica_engines = [
+            create_pooled_engine(url, f"replica-{position}")
+            for position, url in enumerate(settings.DATABASE_REPLICA_URLS)
+        ]
+    return _replica_engines
+
+
+class _LazyBindSessionmaker(async_sessionmaker):
+    """async_sessionmaker que usa o engine primário (criado no primeiro uso) quando não recebe bind"""
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if local_kw.get("bind") is None:
+            local_kw["bind"] = get_async_engine()
+        return super().__call__(**local_kw)
 
-# Engine assíncrono para operações da aplicação
-async_engine = create_async_engine(
-    settings.DATABASE_URL_ASYNC,
-    echo=settings.DEBUG,
-    poolclass=NullPool if settings.TESTING else None,
-    pool_pre_ping=True,
-    future=True,
-)
 
 # Session factory assíncrona
-AsyncSessionLocal = async_sessionmaker(
-    async_engine,
+AsyncSessionLocal = _LazyBindSessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
@@ -39,7 +87,7 @@ AsyncSessionLocal = async_sessionmaker(
 
 def init_db() -> None:
     """Inicializa o banco de dados criando todas as tabelas"""
-    SQLModel.metadata.create_all(sync_engine)
+    SQLModel.metadata.create_all(get_sync_engine())
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -58,48 +106,267 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency para leituras: sessão numa réplica saudável (ver read_engine)
+    Transação READ ONLY, encerrada sem commit ao devolver a conexão
+    """
+    async with open_read_session() as session:
+        yield session
+
+
+async def get_autocommit_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency para leituras de um único statement: sem BEGIN/COMMIT (AUTOCOMMIT)
+    Cada statement vê seu próprio snapshot; para várias queries usar get_read_session
+    """
+    async with open_read_session(autocommit=True) as session:
+        yield session
+
+
+# ============================================================================
+# RÉPLICAS DE LEITURA
+# ============================================================================
+
+# Chave em Session.info das sessões de leitura
+READ_ONLY_INFO = "read_only"
+
+# Atraso de replicação em segundos (0 no primário ou com o WAL recebido todo aplicado)
+_REPLICA_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaPool:
+    """
+    Réplicas com seleção round-robin entre as saudáveis
+    Saúde atualizada por check() (tarefa periódica): conexão e atraso de replicação
+    """
+
+    def __init__(self, engines: list[AsyncEngine]):
+        self.engines = list(engines)
+        self.healthy = [True] * len(self.engines)
+        self._counter = itertools.count()
+
+    def choose(self) -> AsyncEngine | None:
+        """Próxima réplica saudável, ou None se não houver"""
+        for _ in range(len(self.engines)):
+            position = next(self._counter) % len(self.engines)
+            if self.healthy[position]:
+                return self.engines[position]
+        return None
+
+    async def replication_lag(self, engine: AsyncEngine) -> float:
+        async with engine.connect() as conn:
+            return float(await conn.scalar(_REPLICA_LAG))
+
+    async def check(self) -> None:
+        """Sonda todas as réplicas em paralelo; falha, timeout ou atraso alto = fora da rotação"""
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(self.replication_lag(engine), settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS)
+                for engine in self.engines
+            ),
+            return_exceptions=True,
+        )
+        for position, (engine, result) in enumerate(zip(self.engines, results)):
+            healthy = not isinstance(result, BaseException) and result <= settings.REPLICA_MAX_LAG_SECONDS
+            if healthy != self.healthy[position]:
+                logger.warning(
+                    "Réplica %s %s (%s)",
+                    engine.url.render_as_string(hide_password=True),
+                    "de volta à rotação" if healthy else "fora da rotação",
+                    result if isinstance(result, BaseException) else f"atraso {result:.1f}s",
+                )
+            self.healthy[position] = healthy
+
+
+# Singleton do pool de réplicas
+_replica_pool: ReplicaPool | None = None
+
+
+def get_replica_pool() -> ReplicaPool:
+    """Retorna o pool de réplicas (engines criados na primeira chamada)"""
+    global _replica_pool
+    if _replica_pool is None:
+        _replica_pool = ReplicaPool(get_replica_engines())
+    return _replica_pool
+
+# tenant_id -> time.monotonic() até quando as leituras ficam no primário
+_primary_pins: dict[int, float] = {}
+
+
+def pin_to_primary(tenant_id: int, seconds: float | None = None) -> None:
+    """Envia as leituras do tenant ao primário pelos próximos segundos (read-your-writes)"""
+    if seconds is None:
+        seconds = settings.READ_YOUR_WRITES_SECONDS
+    _primary_pins[tenant_id] = max(_primary_pins.get(tenant_id, 0.0), time.monotonic() + seconds)
+
+
+def is_pinned_to_primary(tenant_id: int | None) -> bool:
+    if tenant_id is None:
+        return False
+    until = _primary_pins.get(tenant_id)
+    if until is None:
+        return False
+    if until <= time.monotonic():
+        _primary_pins.pop(tenant_id, None)
+        return False
+    return True
+
+
+def read_engine() -> AsyncEngine:
+    """Engine para leituras: primário se o tenant ativo escreveu há pouco, senão réplica saudável"""
+    if is_pinned_to_primary(TenantScope.get_tenant()):
+        return get_async_engine()
+    return get_replica_pool().choose() or get_async_engine()
+
+
+# BEGIN READ ONLY no próprio BEGIN do asyncpg (sem statement extra); opções revertidas ao devolver a conexão ao pool
+_READ_ONLY_OPTIONS = {"postgresql_readonly": True}
+_AUTOCOMMIT_OPTIONS = {"isolation_level": "AUTOCOMMIT"}
+
+
+@functools.lru_cache(maxsize=None)
+def _read_variant(engine: AsyncEngine, autocommit: bool) -> AsyncEngine:
+    """Engine com as opções de leitura (mesmo pool do original)"""
+    return engine.execution_options(**(_AUTOCOMMIT_OPTIONS if autocommit else _READ_ONLY_OPTIONS))
+
+
+def open_read_session(autocommit: bool = False) -> AsyncSession:
+    """
+    Sessão de leitura (uso com async with) para código fora das dependencies
+    autocommit=True: sem transação (statement único; cursores server-side exigem transação)
+    """
+    return AsyncSessionLocal(bind=_read_variant(read_engine(), autocommit), info={READ_ONLY_INFO: True})
+
+
+async def run_replica_health_check() -> None:
+    """Sondagem das réplicas (tarefa periódica da aplicação)"""
+    await get_replica_pool().check()
+
+
+# Tabelas cujas escritas não fixam leituras no primário (append-only, não lidas de volta
+# na requisição; ex.: o log de cada /chat manteria os tenants ativos sempre no primário)
+PIN_EXEMPT_TABLES = frozenset({"interaction_logs"})
+
+_PIN_KEY = "pin_to_primary"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_write(session: Session, flush_context: Any) -> None:
+    """
+    Flush que alterou dados lidos de volta (fora de PIN_EXEMPT_TABLES), com tenant ativo:
+    marca o pin para o commit e publica READ_PIN aos demais processos (entregue no commit)
+    """
+    tenant_id = TenantScope.get_tenant()
+    if tenant_id is None or session.info.get(READ_ONLY_INFO) or _PIN_KEY in session.info:
+        return
+    changed = itertools.chain(
+        session.new,
+        session.deleted,
+        (obj for obj in session.dirty if session.is_modified(obj)),
+    )
+    if any(getattr(obj, "__tablename__", None) not in PIN_EXEMPT_TABLES for obj in changed):
+        session.info[_PIN_KEY] = tenant_id
+        queue_invalidation(session, InvalidationEvent(InvalidationKind.READ_PIN, tenant_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_after_write(session: Session) -> None:
+    """Commit de uma transação marcada por _track_write fixa as leituras do tenant no primário"""
+    tenant_id = session.info.pop(_PIN_KEY, None)
+    if tenant_id is not None:
+        pin_to_primary(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pin(session: Session) -> None:
+    session.info.pop(_PIN_KEY, None)
+
+
+def _apply_read_pin(invalidation: InvalidationEvent) -> None:
+    """Escrita do tenant em outro processo: leituras deste processo também vão ao primário"""
+    if invalidation.tenant_id is not None:
+        pin_to_primary(invalidation.tenant_id)
+
+
+get_invalidation_bus().subscribe(InvalidationKind.READ_PIN, _apply_read_pin)
+
+
+# ============================================================================
+# ESCOPO DE TENANT
+# ============================================================================
+
+# Por contexto de execução: cada requisição (task) e cada thread de to_thread
+# recebe uma cópia, então requisições concorrentes não sobrescrevem o escopo umas das outras
+_current_tenant_id: ContextVar[int | None] = ContextVar("current_tenant_id", default=None)
+
+# execution_options(all_tenants=True): desliga o filtro automático para uma query
+ALL_TENANTS_OPTION = "all_tenants"
+
+
 class TenantScope:
     """
-    Context Manager para escopo de tenant
-    Garante que todas as queries sejam filtradas pelo tenant_id ativo
+    Escopo de tenant da requisição (ContextVar)
+    Com um tenant ativo, SELECT/UPDATE/DELETE do ORM sobre modelos com tenant_id
+    recebem o filtro automaticamente (ver _apply_tenant_criteria)
     """
-    _current_tenant_id: int | None = None
 
-    @classmethod
-    def set_tenant(cls, tenant_id: int) -> None:
-        """Define o tenant ativo no contexto da requisição"""
-        cls._current_tenant_id = tenant_id
+    @staticmethod
+    def set_tenant(tenant_id: int) -> None:
+        """Define o tenant ativo no contexto atual"""
+        _current_tenant_id.set(tenant_id)
 
-    @classmethod
-    def get_tenant(cls) -> int | None:
+    @staticmethod
+    def get_tenant() -> int | None:
         """Retorna o tenant_id ativo"""
-        return cls._current_tenant_id
+        return _current_tenant_id.get()
 
-    @classmethod
-    def clear_tenant(cls) -> None:
+    @staticmethod
+    def clear_tenant() -> None:
         """Limpa o tenant ativo (útil para queries globais)"""
-        cls._current_tenant_id = None
+        _current_tenant_id.set(None)
 
-    @classmethod
+    @staticmethod
     @asynccontextmanager
-    async def scope(cls, tenant_id: int):
+    async def scope(tenant_id: int | None):
         """Context manager para executar código dentro de um escopo de tenant"""
-        previous_tenant = cls._current_tenant_id
-        cls.set_tenant(tenant_id)
+        token = _current_tenant_id.set(tenant_id)
         try:
             yield
         finally:
-            cls._current_tenant_id = previous_tenant
+            _current_tenant_id.reset(token)
 
 
-def apply_tenant_filter(query, model_class):
-    """
-    Aplica filtro de tenant automaticamente em queries
-    A ser usado via event listeners do SQLAlchemy
-    """
+def tenant_owned_models() -> list[type]:
+    """Modelos mapeados com coluna tenant_id"""
+    return [
+        mapper.class_
+        for mapper in SQLModel._sa_registry.mappers
+        if "tenant_id" in mapper.columns
+    ]
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _apply_tenant_criteria(orm_execute_state: ORMExecuteState) -> None:
+    """Injeta tenant_id = tenant ativo em todas as ocorrências de modelos com tenant_id"""
     tenant_id = TenantScope.get_tenant()
-    if tenant_id is not None and hasattr(model_class, "tenant_id"):
-        # Filtra automaticamente por tenant_id se o modelo tiver essa coluna
-        return query.filter(model_class.tenant_id == tenant_id)
-    return query
+    if tenant_id is None:
+        return
+    if not (orm_execute_state.is_select or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    # Cargas de coluna/relacionamento herdam o critério da query original
+    if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+        return
+    if orm_execute_state.execution_options.get(ALL_TENANTS_OPTION, False):
+        return
 
+    orm_execute_state.statement = orm_execute_state.statement.options(*(
+        with_loader_criteria(model, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+        for model in tenant_owned_models()
+    ))
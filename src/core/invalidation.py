@@ -0,0 +1,262 @@
+"""
+Invalidation Bus
+Invalidação dos caches em memória entre workers/pods via LISTEN/NOTIFY do Postgres
+
+- Publicação transacional: queue_invalidation(session, event) envia pg_notify na própria
+  transação da escrita (entregue só no commit; rollback descarta)
+- Cada evento recebe um número da sequência cache_invalidation_seq
+- Uma conexão asyncpg dedicada por processo escuta o canal e despacha para os handlers
+  registrados (subscribe); eventos do próprio processo são ignorados (já aplicados no commit)
+- Eventos perdidos (reconexão, conexão morta sem aviso): a verificação periódica compara o
+  último número recebido com a sequência; havendo lacuna, os caches fazem resync completo
+"""
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable
+
+from sqlalchemy import Sequence, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from src.core.config import settings
+from src.core.json_codec import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Criada pelo create_all (init_db) e pela migração 009
+INVALIDATION_SEQUENCE = Sequence("cache_invalidation_seq", metadata=SQLModel.metadata)
+
+_NOTIFY = text(
+    f"SELECT pg_notify(:channel, nextval('{INVALIDATION_SEQUENCE.name}')::text || ':' || :payload)"
+)
+_LAST_VALUE = f"SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {INVALIDATION_SEQUENCE.name}"
+
+_PENDING_KEY = "invalidation_pending"
+_CHECK_TIMEOUT_SECONDS = 5.0
+
+
+class InvalidationKind(str, Enum):
+    """
+    Tipos de evento de invalidação (um por estado em memória com handler registrado;
+    perfis e base científica não têm cache em processo e não publicam eventos)
+    """
+    CATALOG = "catalog"  # produtos/faixas de orçamento do tenant (tenant_id=None: todos)
+    READ_PIN = "read_pin"  # escrita do tenant: leituras no primário (read-your-writes)
+
+
+@dataclass(frozen=True, slots=True)
+class InvalidationEvent:
+    """Evento de invalidação publicado no canal"""
+    kind: InvalidationKind
+    tenant_id: int | None = None
+    key: str | None = None
+
+
+Handler = Callable[[InvalidationEvent], None]
+ResyncHandler = Callable[[], None]
+
+
+# ============================================================================
+# Publicação (na transação da escrita)
+# ============================================================================
+
+def queue_invalidation(session: Session, invalidation: InvalidationEvent) -> None:
+    """Agenda o evento para a transação corrente da sessão (sync ou AsyncSession.sync_session)"""
+    session.info.setdefault(_PENDING_KEY, {})[invalidation] = None
+
+
+def encode_payload(invalidation: InvalidationEvent, origin: str) -> str:
+    return json_dumps({
+        "kind": invalidation.kind.value,
+        "tenant_id": invalidation.tenant_id,
+        "key": invalidation.key,
+        "origin": origin,
+    })
+
+
+def decode_notification(payload: str) -> tuple[int, str, InvalidationEvent]:
+    """payload 'seq:json' -> (seq, origin, evento)"""
+    seq, _, body = payload.partition(":")
+    data = json_loads(body)
+    invalidation = InvalidationEvent(InvalidationKind(data["kind"]), data.get("tenant_id"), data.get("key"))
+    return int(seq), data["origin"], invalidation
+
+
+@event.listens_for(Session, "after_flush_postexec")
+@event.listens_for(Session, "before_commit")
+def _send_pending(session: Session, *args: Any) -> None:
+    """Envia os eventos agendados (após cada flush e antes do commit, para os agendados sem flush)"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return
+    origin = get_invalidation_bus().origin
+    for invalidation in pending:
+        connection.execute(_NOTIFY, {"channel": CHANNEL, "payload": encode_payload(invalidation, origin)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ============================================================================
+# Recepção (uma conexão dedicada por processo)
+# ============================================================================
+
+class InvalidationBus:
+    """Registro de handlers e listener do canal de invalidação"""
+
+    def __init__(self, channel: str = CHANNEL) -> None:
+        self.channel = channel
+        self.origin = uuid.uuid4().hex[:12]
+        self.last_seen = 0
+        self._handlers: dict[InvalidationKind, list[Handler]] = {}
+        self._resync_handlers: list[ResyncHandler] = []
+        self._suspect: int | None = None
+        self._connection: Any = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(self, kind: InvalidationKind, handler: Handler, resync: ResyncHandler | None = None) -> None:
+        """Registra handler para um tipo de evento e, opcionalmente, o resync completo do cache"""
+        self._handlers.setdefault(kind, []).append(handler)
+        if resync is not None:
+            self._resync_handlers.append(resync)
+
+    def dispatch(self, invalidation: InvalidationEvent) -> None:
+        for handler in self._handlers.get(invalidation.kind, []):
+            try:
+                handler(invalidation)
+            except Exception:
+                logger.exception("Falha no handler de invalidação %s", invalidation.kind.value)
+
+    def resync(self) -> None:
+        """Eventos possivelmente perdidos: todos os caches registrados recarregam"""
+        logger.warning("Invalidações possivelmente perdidas; resync dos caches")
+        for handler in self._resync_handlers:
+            try:
+                handler()
+            except Exception:
+                logger.exception("Falha no resync de cache")
+
+    def handle_notification(self, payload: str) -> None:
+        try:
+            seq, origin, invalidation = decode_notification(payload)
+        except (ValueError, KeyError):
+            # Número consumido mesmo assim (ex.: tipo desconhecido durante deploy): não é lacuna
+            logger.warning("Notificação de invalidação inválida: %r", payload)
+            seq = payload.partition(":")[0]
+            if seq.isdigit():
+                self.last_seen = max(self.last_seen, int(seq))
+            return
+        self.last_seen = max(self.last_seen, seq)
+        if origin != self.origin:
+            self.dispatch(invalidation)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.handle_notification(payload)
+
+    async def check_versions(self) -> None:
+        """
+        Verificação periódica: número da sequência já visto na verificação anterior e ainda
+        não recebido = evento perdido (a espera de um ciclo cobre transações ainda abertas)
+        Falha na consulta derruba a conexão, forçando reconexão
+        """
+        connection = self._connection
+        if connection is None:
+            return
+        try:
+            current = await asyncio.wait_for(connection.fetchval(_LAST_VALUE), _CHECK_TIMEOUT_SECONDS)
+        except Exception:
+            logger.warning("Conexão de invalidação sem resposta; reconectando")
+            connection.terminate()
+            return
+        suspect, self._suspect = self._suspect, current
+        if suspect is not None and self.last_seen < suspect:
+            self.resync()
+            self.last_seen = max(self.last_seen, suspect)
+
+    async def _on_connect(self, connection: Any, reconnect: bool) -> None:
+        """Na reconexão, qualquer evento publicado enquanto desconectado foi perdido"""
+        current = await connection.fetchval(_LAST_VALUE)
+        if reconnect and current > self.last_seen:
+            self.resync()
+        self.last_seen = max(self.last_seen, current)
+        self._suspect = None
+
+    async def _listen(self, dsn: str) -> None:
+        import asyncpg
+
+        reconnect = False
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except Exception:
+                logger.exception("Falha ao conectar o listener de invalidação")
+                await asyncio.sleep(settings.INVALIDATION_RECONNECT_SECONDS)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _, closed=closed: closed.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                await self._on_connect(connection, reconnect)
+                self._connection = connection
+                reconnect = True
+                await closed.wait()
+                logger.warning("Conexão de invalidação encerrada; reconectando")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha no listener de invalidação")
+            finally:
+                self._connection = None
+                if not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(settings.INVALIDATION_RECONNECT_SECONDS)
+
+    def start(self) -> None:
+        """Inicia o listener em background (idempotente)"""
+        if self._task is None or self._task.done():
+            url = make_url(settings.INVALIDATION_BUS_URL or settings.DATABASE_URL_ASYNC)
+            dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+            self._task = asyncio.create_task(self._listen(dsn), name="invalidation_listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Singleton do barramento de invalidação
+_invalidation_bus: InvalidationBus | None = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Retorna instância singleton do barramento de invalidação"""
+    global _invalidation_bus
+    if _invalidation_bus is None:
+        _invalidation_bus = InvalidationBus()
+    return _invalidation_bus
+
+
+async def run_invalidation_version_check() -> None:
+    """Verificação de eventos perdidos (tarefa periódica da aplicação)"""
+    await get_invalidation_bus().check_versions()
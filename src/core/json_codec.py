@@ -0,0 +1,73 @@
+"""
+JSON Codec
+Serialização das colunas JSON/JSONB nos engines assíncronos (nutritional_info, effects,
+biometrics, ranking_data...)
+
+- orjson quando instalado (extra "speedups"); senão o json da stdlib
+- Escrita: json_serializer do engine gera o texto dos parâmetros
+- Leitura: com orjson, codecs próprios de json/jsonb em cada conexão asyncpg decodificam
+  direto dos bytes do protocolo binário (sem o .decode() intermediário do dialeto)
+"""
+import importlib.util
+import json
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+JSON_BACKEND = "orjson" if importlib.util.find_spec("orjson") is not None else "json"
+
+if JSON_BACKEND == "orjson":
+    import orjson
+
+    def json_dumps(value: Any) -> str:
+        # Chaves não-str viram texto, como no json da stdlib
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    json_loads = orjson.loads
+
+else:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+
+def _encode_json(value: str) -> bytes:
+    return value.encode()
+
+
+def _encode_jsonb(value: str) -> bytes:
+    # \x01 = versão do formato binário do jsonb
+    return b"\x01" + value.encode()
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(memoryview(data)[1:])
+
+
+def engine_json_options() -> dict[str, Any]:
+    """Argumentos de create_async_engine para o codec JSON"""
+    return {"json_serializer": json_dumps, "json_deserializer": json_loads}
+
+
+async def set_json_codecs(connection: Any) -> None:
+    """Codecs json/jsonb com orjson numa conexão asyncpg"""
+    await connection.set_type_codec(
+        "json", encoder=_encode_json, decoder=orjson.loads, schema="pg_catalog", format="binary"
+    )
+    await connection.set_type_codec(
+        "jsonb", encoder=_encode_jsonb, decoder=_decode_jsonb, schema="pg_catalog", format="binary"
+    )
+
+
+def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+    dbapi_connection.run_async(set_json_codecs)
+
+
+def register_json_codecs(engine: AsyncEngine) -> None:
+    """
+    Substitui os codecs json/jsonb do dialeto nas conexões novas do engine
+    (listener de "connect" roda depois do on_connect do dialeto, que registra os padrão)
+    Sem orjson, os do dialeto (json.loads) já equivalem
+    """
+    if JSON_BACKEND == "orjson":
+        event.listen(engine.sync_engine, "connect", _on_connect)
@@ -0,0 +1,261 @@
+"""
+Connection Pool
+Perfis nomeados do pool do engine assíncrono e métricas ao vivo por pool
+
+- Perfil (DATABASE_POOL_PROFILE) + sobrescritas individuais DATABASE_POOL_* do Settings
+- Pre-ping: always (SELECT 1 a cada checkout), idle (só se a conexão ficou ociosa mais
+  que DATABASE_POOL_PRE_PING_IDLE_SECONDS) ou never (confia em pool_recycle)
+- Métricas: conexões em uso/overflow, histograma de espera no checkout e falhas,
+  no formato texto do Prometheus (GET /metrics)
+"""
+import bisect
+import dataclasses
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from src.core.config import settings
+from src.core.json_codec import engine_json_options, register_json_codecs
+
+
+class PrePing(str, Enum):
+    """Estratégia de verificação da conexão no checkout"""
+    ALWAYS = "always"
+    IDLE = "idle"
+    NEVER = "never"
+
+
+@dataclass(frozen=True, slots=True)
+class PoolProfile:
+    """Parâmetros do pool e do driver (asyncpg)"""
+    pool_size: int
+    max_overflow: int
+    pool_recycle: int
+    pool_timeout: float
+    pre_ping: PrePing
+    statement_cache_size: int
+
+
+POOL_PROFILES: dict[str, PoolProfile] = {
+    # Padrões do SQLAlchemy/asyncpg
+    "default": PoolProfile(5, 10, 1800, 30.0, PrePing.ALWAYS, 100),
+    # Muitos processos pequenos (workers, jobs): poucas conexões por processo
+    "small": PoolProfile(2, 3, 900, 10.0, PrePing.IDLE, 100),
+    # API com alta concorrência por processo
+    "large": PoolProfile(20, 20, 1800, 10.0, PrePing.IDLE, 500),
+    # PgBouncer em transaction pooling: sem prepared statements, sem overflow
+    "pgbouncer": PoolProfile(10, 0, 300, 10.0, PrePing.NEVER, 0),
+}
+
+
+def resolve_pool_profile() -> PoolProfile:
+    """Perfil configurado com as sobrescritas do Settings aplicadas"""
+    profile = POOL_PROFILES.get(settings.DATABASE_POOL_PROFILE)
+    if profile is None:
+        raise ValueError(
+            f"DATABASE_POOL_PROFILE inválido: {settings.DATABASE_POOL_PROFILE!r} "
+            f"(opções: {', '.join(POOL_PROFILES)})"
+        )
+    overrides = {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_POOL_MAX_OVERFLOW,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        "pre_ping": PrePing(settings.DATABASE_POOL_PRE_PING) if settings.DATABASE_POOL_PRE_PING else None,
+        "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    return dataclasses.replace(profile, **{name: value for name, value in overrides.items() if value is not None})
+
+
+# ============================================================================
+# MÉTRICAS
+# ============================================================================
+
+# Limites (segundos) do histograma de espera no checkout
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Contadores de checkout de um pool (atualizados pelo InstrumentedPoolMixin)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.failures: dict[str, int] = {"timeout": 0, "connect": 0}
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)  # último = +Inf
+        self.wait_sum = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_sum += seconds
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def observe_failure(self, reason: str) -> None:
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+
+
+class InstrumentedPoolMixin:
+    """Mede o tempo de obtenção de conexão (espera na fila + conexão nova) em _do_get"""
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_failure("timeout")
+            raise
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.observe_failure("connect")
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() troca o pool: as métricas continuam no novo
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """Pool padrão do engine assíncrono com métricas"""
+
+
+# Engines instrumentados (nome -> engine; o pool corrente é lido na renderização)
+_engines: dict[str, AsyncEngine] = {}
+
+
+def _instrumented_pools() -> list[tuple[str, Any]]:
+    """Pools correntes dos engines instrumentados (NullPool em TESTING fica de fora)"""
+    return [
+        (name, engine.sync_engine.pool)
+        for name, engine in _engines.items()
+        if getattr(engine.sync_engine.pool, "metrics", None) is not None
+    ]
+
+
+def pool_saturation() -> dict[str, dict[str, Any]]:
+    """
+    Uso de cada pool (sem I/O): conexões em uso sobre a capacidade (pool_size + max_overflow)
+    saturation 1.0 = próximos checkouts esperam até DATABASE_POOL_TIMEOUT_SECONDS
+    """
+    usage = {}
+    for name, pool in _instrumented_pools():
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        usage[name] = {
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        }
+    return usage
+
+
+def render_pool_metrics() -> str:
+    """Métricas de todos os pools no formato texto do Prometheus"""
+    pools = _instrumented_pools()
+    lines: list[str] = []
+
+    def family(metric: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+
+    gauges = [
+        ("smartsupp_db_pool_size", "Conexões permanentes configuradas", lambda pool: pool.size()),
+        ("smartsupp_db_pool_checked_out", "Conexões em uso", lambda pool: pool.checkedout()),
+        ("smartsupp_db_pool_checked_in", "Conexões ociosas no pool", lambda pool: pool.checkedin()),
+        ("smartsupp_db_pool_overflow", "Conexões abertas além de pool_size", lambda pool: max(pool.overflow(), 0)),
+    ]
+    for metric, help_text, value in gauges:
+        family(metric, "gauge", help_text)
+        lines.extend(f'{metric}{{pool="{name}"}} {value(pool)}' for name, pool in pools)
+
+    family("smartsupp_db_pool_checkout_failures_total", "counter", "Falhas ao obter conexão")
+    for name, pool in pools:
+        lines.extend(
+            f'smartsupp_db_pool_checkout_failures_total{{pool="{name}",reason="{reason}"}} {count}'
+            for reason, count in sorted(pool.metrics.failures.items())
+        )
+
+    metric = "smartsupp_db_pool_checkout_wait_seconds"
+    family(metric, "histogram", "Tempo para obter conexão do pool")
+    for name, pool in pools:
+        cumulative = 0
+        for bound, count in zip([*map(str, WAIT_BUCKETS), "+Inf"], pool.metrics.wait_buckets):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{pool="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{pool="{name}"}} {pool.metrics.wait_sum}')
+        lines.append(f'{metric}_count{{pool="{name}"}} {pool.metrics.checkouts}')
+
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# ENGINES
+# ============================================================================
+
+def _install_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """Pre-ping só para conexões ociosas há mais de idle_seconds (evita o SELECT 1 em rajadas)"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkin")
+    def _record_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as error:
+            # O pool descarta a conexão e tenta outra
+            raise exc.DisconnectionError() from error
+
+
+def create_pooled_engine(url: str, name: str, profile: PoolProfile | None = None) -> AsyncEngine:
+    """
+    Engine assíncrono com o perfil de pool (NullPool em TESTING), codec JSON
+    e métricas registradas como name
+    """
+    profile = profile or resolve_pool_profile()
+    # prepared_statement_cache_size: cache do adaptador do SQLAlchemy; statement_cache_size: do asyncpg
+    options = {
+        "echo": settings.DEBUG,
+        "connect_args": {
+            "statement_cache_size": profile.statement_cache_size,
+            "prepared_statement_cache_size": profile.statement_cache_size,
+        },
+        **engine_json_options(),
+    }
+    if settings.TESTING:
+        engine = create_async_engine(url, poolclass=NullPool, **options)
+        register_json_codecs(engine)
+        return engine
+
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_recycle=profile.pool_recycle,
+        pool_timeout=profile.pool_timeout,
+        pool_pre_ping=profile.pre_ping == PrePing.ALWAYS,
+        **options,
+    )
+    register_json_codecs(engine)
+    if profile.pre_ping == PrePing.IDLE:
+        _install_idle_pre_ping(engine, settings.DATABASE_POOL_PRE_PING_IDLE_SECONDS)
+    engine.sync_engine.pool.metrics = PoolMetrics(name)
+    _engines[name] = engine
+    return engine
@@ -0,0 +1,56 @@
+"""
+Budget Bands
+Mapeamento de BudgetRange para faixas de preço (configurável por tenant)
+"""
+from dataclasses import dataclass
+from typing import Any
+
+from src.domain.enums import BudgetRange
+
+
+@dataclass(frozen=True, slots=True)
+class BudgetBand:
+    """Faixa de preço (R$) de um BudgetRange - max_price None = sem teto"""
+    min_price: float
+    max_price: float | None
+
+    def ceiling(self, tolerance: float) -> float | None:
+        """Preço máximo aceito (teto + tolerância) - usado no filtro da query"""
+        if self.max_price is None:
+            return None
+        return self.max_price * (1 + tolerance)
+
+    def penalty(self, price: float) -> float:
+        """
+        Penalidade suave (pontos de score) para produtos acima do teto
+        Proporcional ao percentual excedido: 10% acima do teto = -10 pontos
+        """
+        if self.max_price is None or self.max_price <= 0 or price <= self.max_price:
+            return 0.0
+        return (price / self.max_price - 1) * 100
+
+
+DEFAULT_BUDGET_BANDS: dict[str, BudgetBand] = {
+    BudgetRange.LOW.value: BudgetBand(0.0, 50.0),
+    BudgetRange.MEDIUM.value: BudgetBand(50.0, 150.0),
+    BudgetRange.HIGH.value: BudgetBand(150.0, 300.0),
+    BudgetRange.PREMIUM.value: BudgetBand(300.0, None),
+}
+
+
+def resolve_budget_bands(overrides: dict[str, Any] | None) -> dict[str, BudgetBand]:
+    """
+    Aplica faixas customizadas do tenant sobre as faixas padrão
+    Formato: {"low": {"min": 0, "max": 80}, "premium": {"min": 250, "max": null}}
+    """
+    bands = dict(DEFAULT_BUDGET_BANDS)
+    for budget_range, band in (overrides or {}).items():
+        if budget_range not in bands or not isinstance(band, dict):
+            continue
+        default = bands[budget_range]
+        max_price = band.get("max", default.max_price)
+        bands[budget_range] = BudgetBand(
+            min_price=float(band.get("min", default.min_price)),
+            max_price=float(max_price) if max_price is not None else None,
+        )
+    return bands
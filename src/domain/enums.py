@@ -79,3 +79,9 @@ class SupplementCategory(str, Enum):
     CITRULLINE = "citrulline"
     GLUTAMINE = "glutamine"
 
+
+
+class ExportFormat(str, Enum):
+    """Formatos de exportação de interaction_logs"""
+    NDJSON = "ndjson"
+    CSV = "csv"
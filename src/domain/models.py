@@ -2,10 +2,11 @@
 Domain Models (SQLModel)
 Models de negócio com foco em comparação técnica de produtos
 """
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
-from sqlmodel import SQLModel, Field, Column, JSON, ARRAY, String, Text
-from sqlalchemy import Index
+from sqlmodel import SQLModel, Field, Column, JSON, ARRAY, Float, String, Text
+from sqlalchemy import Computed, Index, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
 
 from src.domain.enums import (
     TenantPlan,
@@ -29,6 +30,14 @@ class Tenant(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=255, index=True)
     plan: TenantPlan = Field(default=TenantPlan.FREE)
+
+    # Faixas de orçamento customizadas (JSONB)
+    budget_bands: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSONB),
+        description="Faixas de preço por BudgetRange: {budget_range: {min: float, max: float | null}}"
+    )
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": datetime.utcnow})
 
@@ -61,14 +70,14 @@ class ScientificData(SQLModel, table=True):
     # Efeitos e Benefícios (JSONB)
     effects: dict = Field(
         default_factory=dict,
-        sa_column=Column(JSON),
+        sa_column=Column(JSONB),
         description="Efeitos documentados: {effect: strength_level}"
     )
     
     # Dosagem recomendada (JSONB)
     dosage: dict = Field(
         default_factory=dict,
-        sa_column=Column(JSON),
+        sa_column=Column(JSONB),
         description="Dosagem: {min: float, max: float, unit: str, timing: str}"
     )
     
@@ -81,7 +90,7 @@ class ScientificData(SQLModel, table=True):
     
     interactions: dict = Field(
         default_factory=dict,
-        sa_column=Column(JSON),
+        sa_column=Column(JSONB),
         description="Interações com medicamentos/condições: {medication: description}"
     )
     
@@ -175,9 +184,27 @@ class Product(SQLModel, table=True):
     # Informações nutricionais (JSONB) - Crítico para comparação
     nutritional_info: dict = Field(
         default_factory=dict,
-        sa_column=Column(JSON),
+        sa_column=Column(JSONB),
         description="Tabela nutricional: {protein_g: float, carbs_g: float, fat_g: float, calories: int, ingredients: list, allergens: list, ...}"
     )
+
+    # Colunas geradas a partir de nutritional_info (somente leitura, calculadas pelo banco)
+    protein_g: Optional[float] = Field(
+        default=None,
+        sa_column=Column(Float, Computed("(nutritional_info->>'protein_g')::double precision", persisted=True)),
+    )
+    serving_size_g: Optional[float] = Field(
+        default=None,
+        sa_column=Column(Float, Computed("(nutritional_info->>'serving_size_g')::double precision", persisted=True)),
+    )
+    price_per_protein: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float,
+            Computed("price / NULLIF((nutritional_info->>'protein_g')::double precision, 0)", persisted=True),
+        ),
+        description="Preço (R$) por grama de proteína",
+    )
     
     # Certificações e Qualidade
     certifications: list[str] = Field(
@@ -206,6 +233,13 @@ class Product(SQLModel, table=True):
         Index("idx_product_tenant_category", "tenant_id", "category"),
         Index("idx_product_active", "is_active", "tenant_id"),
         Index("idx_product_price", "price"),
+        Index("idx_product_tenant_category_price", "tenant_id", "category", "price"),
+        Index(
+            "idx_product_nutritional_info",
+            "nutritional_info",
+            postgresql_using="gin",
+            postgresql_ops={"nutritional_info": "jsonb_path_ops"},
+        ),
     )
 
 
@@ -218,49 +252,161 @@ class InteractionLog(SQLModel, table=True):
     Log de interações para BI e Analytics
     Registra cada consulta/recomendação realizada
     tenant_id obrigatório - isolamento multitenant
+    Particionada por mês em created_at (ver src/infrastructure/partitioning.py):
+    a PK inclui a chave de partição
     """
     __tablename__ = "interaction_logs"
 
-    id: Optional[int] = Field(default=None, primary_key=True)
-    tenant_id: int = Field(foreign_key="tenants.id", index=True)
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    tenant_id: int = Field(foreign_key="tenants.id")
     user_profile_id: Optional[int] = Field(default=None, foreign_key="user_profiles.id", index=True)
     
     # Contexto da interação
-    session_id: str = Field(max_length=255, index=True)
+    session_id: str = Field(max_length=255)
     query_text: Optional[str] = Field(default=None, sa_column=Column(Text))
     
     # Recomendações geradas
     recommended_products: list[int] = Field(
         default_factory=list,
-        sa_column=Column(ARRAY(String)),
+        sa_column=Column(ARRAY(Integer)),
         description="IDs dos produtos recomendados"
     )
     
     # Ranking e Justificativas (JSONB)
     ranking_data: dict = Field(
         default_factory=dict,
-        sa_column=Column(JSON),
+        sa_column=Column(JSONB),
         description="Dados de ranking: {product_id: {score: float, reasons: list, match_score: float}}"
     )
     
     # Produto selecionado (se houver)
-    selected_product_id: Optional[int] = Field(default=None, foreign_key="products.id", index=True)
+    selected_product_id: Optional[int] = Field(default=None, foreign_key="products.id")
     
     # Feedback do usuário
     user_feedback: Optional[str] = Field(default=None, sa_column=Column(Text))
     satisfaction_score: Optional[int] = Field(default=None, description="Score de 1-5")
     
     # Metadata
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
     ip_address: Optional[str] = Field(default=None, max_length=45)
     user_agent: Optional[str] = Field(default=None, max_length=500)
 
-    # Índices para análises de BI
+    # Índices para análises de BI (criados em cada partição)
+    # Filtros por período usam partition pruning em vez de índice só em created_at
     __table_args__ = (
-        Index("idx_log_tenant", "tenant_id"),
-        Index("idx_log_created", "created_at"),
         Index("idx_log_tenant_created", "tenant_id", "created_at"),
         Index("idx_log_selected", "selected_product_id"),
         Index("idx_log_session", "session_id"),
+        Index("idx_log_recommended_products", "recommended_products", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
+
+class FeedbackEvent(SQLModel, table=True):
+    """
+    Evento de feedback já aplicado (POST /analytics/feedback/batch)
+    A PK (tenant_id, event_id) torna o reenvio de um evento idempotente
+    """
+    __tablename__ = "feedback_events"
+
+    tenant_id: int = Field(foreign_key="tenants.id", primary_key=True)
+    event_id: str = Field(max_length=100, primary_key=True)
+
+    # Interação atualizada (PK de interaction_logs)
+    log_id: int
+    log_created_at: datetime
+    product_id: int
+    satisfaction_score: Optional[int] = Field(default=None)
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+
+# ============================================================================
+# ROLLUPS DIÁRIOS (BI - Por Tenant)
+# ============================================================================
+
+class DailyProductStats(SQLModel, table=True):
+    """
+    Agregado diário por (tenant, dia, produto) dos interaction_logs
+    Mantido incrementalmente pelo job de rollup (ver RollupWatermark)
+    """
+    __tablename__ = "daily_product_stats"
+
+    tenant_id: int = Field(foreign_key="tenants.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    product_id: int = Field(primary_key=True)
+
+    recommendation_count: int = Field(default=0)
+    selection_count: int = Field(default=0)
+    satisfaction_sum: int = Field(default=0)
+    satisfaction_count: int = Field(default=0)
+
+
+class DailyTenantStats(SQLModel, table=True):
+    """Total diário de interações por tenant (mesmo job de rollup)"""
+    __tablename__ = "daily_tenant_stats"
+
+    tenant_id: int = Field(foreign_key="tenants.id", primary_key=True)
+    day: date = Field(primary_key=True)
+
+    interaction_count: int = Field(default=0)
+
+
+class DailyDistinctSketch(SQLModel, table=True):
+    """
+    Sketches HyperLogLog diários por (tenant, dia, produto) para contagens distintas
+    aproximadas; product_id = 0 agrega todas as interações do tenant
+    Gravados em lote a partir do buffer em memória dos workers (ver src/application/sketches.py)
+    """
+    __tablename__ = "daily_distinct_sketches"
+
+    tenant_id: int = Field(foreign_key="tenants.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    product_id: int = Field(primary_key=True)
+
+    sessions: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    profiles: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class RollupWatermark(SQLModel, table=True):
+    """
+    Último interaction_logs.id já agregado por cada rollup
+    Avançado na mesma transação do upsert: re-executar o job é idempotente
+    """
+    __tablename__ = "rollup_watermarks"
+
+    name: str = Field(max_length=100, primary_key=True)
+    last_log_id: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ============================================================================
+# SNAPSHOTS DE ANALYTICS (Parquet)
+# ============================================================================
+
+class SnapshotDirtyMonth(SQLModel, table=True):
+    """
+    Mês fechado com interações alteradas depois do snapshot (feedback tardio)
+    Marcado pela ingestão de feedback; a exportação regrava o mês e remove a marca
+    """
+    __tablename__ = "snapshot_dirty_months"
+
+    tenant_id: int = Field(foreign_key="tenants.id", primary_key=True)
+    month: date = Field(primary_key=True)
+    marked_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SnapshotJob(SQLModel, table=True):
+    """
+    Job de exportação Parquet disparado pela API (POST /analytics/snapshots)
+    Persistido para o status ser consultado em qualquer worker
+    """
+    __tablename__ = "snapshot_jobs"
+
+    id: str = Field(max_length=32, primary_key=True)
+    tenant_id: int = Field(foreign_key="tenants.id", index=True)
+    status: str = Field(default="pending", max_length=20)  # pending | running | completed | failed
+    files: list[str] = Field(default_factory=list, sa_column=Column(ARRAY(Text)))
+    error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = Field(default=None)
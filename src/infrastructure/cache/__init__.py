@@ -0,0 +1 @@
+"""Cache Infrastructure - Caches em memória por processo"""
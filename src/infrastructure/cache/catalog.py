@@ -0,0 +1,435 @@
+"""
+Catalog Snapshot Cache
+Snapshot em memória do catálogo ativo por (tenant, categoria)
+
+- Armazenamento compacto em arrays (ids, preços, proteína, flags nutricionais)
+- nutritional_info pré-parseado em bitmask na carga do snapshot
+- Versão de catálogo por tenant, incrementada em qualquer insert/update/delete de Product
+  (ou alteração do Tenant, que carrega as faixas de orçamento), também quando a escrita
+  acontece em outro processo (evento CATALOG do barramento de invalidação)
+- Refresh lazy com proteção contra stampede (um único loader por chave)
+- Recargas leem do primário: uma réplica atrasada gravaria linhas antigas sob a versão nova
+- Teto global de memória: tenants maiores são despejados primeiro
+"""
+import asyncio
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Awaitable, Callable, Iterable
+
+from sqlalchemy import Row, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlmodel import select
+
+from src.core.config import settings
+from src.core.database import READ_ONLY_INFO, AsyncSessionLocal
+from src.core.invalidation import (
+    InvalidationEvent,
+    InvalidationKind,
+    get_invalidation_bus,
+    queue_invalidation,
+)
+from src.domain.budget import DEFAULT_BUDGET_BANDS, BudgetBand, resolve_budget_bands
+from src.domain.enums import SupplementCategory
+from src.domain.models import Product, Tenant
+
+
+# ============================================================================
+# Flags nutricionais (nutritional_info pré-parseado)
+# ============================================================================
+
+FLAG_MALTODEXTRIN = 1 << 0
+FLAG_NO_LACTOSE = 1 << 1
+FLAG_VEGAN = 1 << 2
+FLAG_NO_GLUTEN = 1 << 3
+FLAG_ARTIFICIAL_SWEETENERS = 1 << 4
+
+NUTRITIONAL_FLAGS: dict[str, int] = {
+    "maltodextrin": FLAG_MALTODEXTRIN,
+    "no_lactose": FLAG_NO_LACTOSE,
+    "vegan": FLAG_VEGAN,
+    "no_gluten": FLAG_NO_GLUTEN,
+    "artificial_sweeteners": FLAG_ARTIFICIAL_SWEETENERS,
+}
+
+
+def parse_nutritional_flags(nutritional_info: dict[str, Any] | None) -> int:
+    """Converte as chaves booleanas de nutritional_info em bitmask"""
+    info = nutritional_info or {}
+    flags = 0
+    for key, flag in NUTRITIONAL_FLAGS.items():
+        if info.get(key, False):
+            flags |= flag
+    return flags
+
+
+# ============================================================================
+# Snapshot
+# ============================================================================
+
+@dataclass(slots=True)
+class CatalogSnapshot:
+    """
+    Catálogo ativo (is_active e em estoque) de um tenant/categoria
+    Colunas paralelas ordenadas por preço (menor primeiro), permitindo
+    recortar faixas de preço com busca binária
+    """
+    tenant_id: int
+    category: str
+    version: int
+    ids: array
+    prices: array
+    protein_g: array
+    flags: array
+    brand_names: tuple[str, ...]
+    product_names: tuple[str, ...]
+    certifications: tuple[tuple[str, ...], ...]
+    budget_bands: dict[str, BudgetBand]
+
+    @classmethod
+    def from_rows(
+        cls,
+        tenant_id: int,
+        category: str,
+        version: int,
+        rows: Iterable[Any],
+        budget_bands: dict[str, BudgetBand] | None = None,
+    ) -> "CatalogSnapshot":
+        """Constrói snapshot a partir de linhas com atributos de Product"""
+        ordered = sorted(rows, key=lambda row: (row.price, row.id))
+        return cls(
+            tenant_id=tenant_id,
+            category=category,
+            version=version,
+            ids=array("q", (row.id for row in ordered)),
+            prices=array("d", (float(row.price) for row in ordered)),
+            protein_g=array("d", (float(row.protein_g or 0.0) for row in ordered)),
+            flags=array("I", (parse_nutritional_flags(row.nutritional_info) for row in ordered)),
+            brand_names=tuple(sys.intern(row.brand_name) for row in ordered),
+            product_names=tuple(row.product_name for row in ordered),
+            certifications=tuple(
+                tuple(sys.intern(cert) for cert in (row.certifications or []))
+                for row in ordered
+            ),
+            budget_bands=budget_bands or DEFAULT_BUDGET_BANDS,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimativa de memória ocupada pelo snapshot (bytes)"""
+        size = sum(sys.getsizeof(col) for col in (self.ids, self.prices, self.protein_g, self.flags))
+        size += sys.getsizeof(self.brand_names) + sys.getsizeof(self.product_names)
+        size += sum(sys.getsizeof(name) for name in set(self.brand_names))
+        size += sum(sys.getsizeof(name) for name in self.product_names)
+        size += sys.getsizeof(self.certifications)
+        size += sum(sys.getsizeof(certs) for certs in self.certifications)
+        return size
+
+
+# ============================================================================
+# Versão de catálogo por tenant
+# ============================================================================
+
+class CatalogVersions:
+    """
+    Versões monotônicas de catálogo por tenant
+    bump_all() invalida todos os tenants (ex: UPDATE em massa sem tenant conhecido)
+    """
+
+    def __init__(self) -> None:
+        self._counter = 0
+        self._floor = 0
+        self._versions: dict[int, int] = {}
+
+    def get(self, tenant_id: int) -> int:
+        """Retorna versão atual do catálogo do tenant"""
+        return max(self._versions.get(tenant_id, 0), self._floor)
+
+    def bump(self, tenant_id: int) -> int:
+        """Incrementa versão do catálogo do tenant"""
+        self._counter += 1
+        self._versions[tenant_id] = self._counter
+        return self._counter
+
+    def bump_all(self) -> int:
+        """Incrementa versão de todos os tenants"""
+        self._counter += 1
+        self._floor = self._counter
+        return self._counter
+
+
+catalog_versions = CatalogVersions()
+
+_PENDING_TENANTS_KEY = "catalog_pending_tenants"
+_PENDING_ALL_KEY = "catalog_pending_all"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_product_changes(session: Session, flush_context: Any) -> None:
+    """
+    Registra tenants com produtos/configuração alterados no flush (aplicado no commit)
+    e publica a invalidação para os demais processos
+    """
+    pending: set[int] = session.info.setdefault(_PENDING_TENANTS_KEY, set())
+    changed: set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Product) and obj.tenant_id is not None:
+            changed.add(obj.tenant_id)
+        elif isinstance(obj, Tenant) and obj.id is not None:
+            changed.add(obj.id)
+    # Um evento por tenant na transação, mesmo com vários flushes
+    for tenant_id in changed - pending:
+        queue_invalidation(session, InvalidationEvent(InvalidationKind.CATALOG, tenant_id))
+    pending |= changed
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_product_changes(orm_execute_state: ORMExecuteState) -> None:
+    """INSERT/UPDATE/DELETE em massa sobre Product invalidam todos os tenants"""
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Product:
+        orm_execute_state.session.info[_PENDING_ALL_KEY] = True
+        queue_invalidation(orm_execute_state.session, InvalidationEvent(InvalidationKind.CATALOG))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_catalog_versions(session: Session) -> None:
+    """Após commit, incrementa versão dos catálogos alterados"""
+    if session.info.pop(_PENDING_ALL_KEY, False):
+        catalog_versions.bump_all()
+    for tenant_id in session.info.pop(_PENDING_TENANTS_KEY, set()):
+        catalog_versions.bump(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session: Session) -> None:
+    """Rollback descarta alterações pendentes (catálogo não mudou)"""
+    session.info.pop(_PENDING_ALL_KEY, None)
+    session.info.pop(_PENDING_TENANTS_KEY, None)
+
+
+def _apply_catalog_invalidation(invalidation: InvalidationEvent) -> None:
+    """Catálogo alterado em outro processo: mesma versão incrementada que no commit local"""
+    if invalidation.tenant_id is None:
+        catalog_versions.bump_all()
+    else:
+        catalog_versions.bump(invalidation.tenant_id)
+
+
+# Eventos perdidos: todos os snapshots recarregam no próximo acesso
+get_invalidation_bus().subscribe(
+    InvalidationKind.CATALOG, _apply_catalog_invalidation, resync=catalog_versions.bump_all
+)
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+CatalogLoader = Callable[[AsyncSession, int, str], Awaitable[Iterable[Any]]]
+EvictionListener = Callable[[int, str], None]
+
+# Colunas lidas por CatalogSnapshot.from_rows: a query devolve tuplas nomeadas,
+# sem instanciar Product (identity map, estado do ORM) por linha
+CATALOG_COLUMNS = (
+    Product.id,
+    Product.price,
+    Product.protein_g,
+    Product.nutritional_info,
+    Product.brand_name,
+    Product.product_name,
+    Product.certifications,
+)
+BudgetBandsLoader = Callable[[AsyncSession, int], Awaitable[dict[str, BudgetBand]]]
+
+
+async def load_active_products(
+    session: AsyncSession,
+    tenant_id: int,
+    category: str,
+    max_price: float | None = None,
+    required_flags: list[str] | None = None,
+    forbidden_flags: list[str] | None = None,
+) -> list[Row]:
+    """
+    Loader padrão: produtos ativos e em estoque do tenant/categoria (CATALOG_COLUMNS)
+    max_price restringe a faixa de preço na query (idx_product_tenant_category_price)
+    required_flags/forbidden_flags filtram nutritional_info por contenção JSONB (GIN)
+    """
+    stmt = (
+        select(*CATALOG_COLUMNS)
+        .where(Product.tenant_id == tenant_id)
+        .where(Product.category == SupplementCategory(category))
+        .where(Product.is_active == True)  # noqa: E712
+        .where(Product.stock_quantity > 0)
+    )
+    if max_price is not None:
+        stmt = stmt.where(Product.price <= max_price)
+    for flag in required_flags or []:
+        stmt = stmt.where(Product.nutritional_info.contains({flag: True}))
+    for flag in forbidden_flags or []:
+        stmt = stmt.where(~Product.nutritional_info.contains({flag: True}))
+    return list((await session.exec(stmt.order_by(Product.price, Product.id))).all())
+
+
+async def load_budget_bands(session: AsyncSession, tenant_id: int) -> dict[str, BudgetBand]:
+    """Faixas de orçamento do tenant (padrão + customizações)"""
+    stmt = select(Tenant.budget_bands).where(Tenant.id == tenant_id)
+    overrides = (await session.exec(stmt)).first()
+    return resolve_budget_bands(overrides)
+
+
+async def load_catalog_snapshot(
+    session: AsyncSession,
+    tenant_id: int,
+    category: str,
+    budget_range: str | None = None,
+    required_flags: list[str] | None = None,
+    forbidden_flags: list[str] | None = None,
+) -> CatalogSnapshot:
+    """
+    Snapshot sem cache, carregando apenas a faixa de preço do orçamento
+    e os produtos compatíveis com as restrições (filtros no servidor)
+    Usado quando CATALOG_CACHE_ENABLED=False
+    """
+    budget_bands = await load_budget_bands(session, tenant_id)
+    band = budget_bands.get(budget_range) if budget_range else None
+    max_price = band.ceiling(settings.BUDGET_TOLERANCE) if band else None
+    rows = await load_active_products(
+        session,
+        tenant_id,
+        category,
+        max_price=max_price,
+        required_flags=required_flags,
+        forbidden_flags=forbidden_flags,
+    )
+    return CatalogSnapshot.from_rows(
+        tenant_id, category, catalog_versions.get(tenant_id), rows, budget_bands
+    )
+
+
+class CatalogCache:
+    """Cache de snapshots de catálogo por (tenant_id, categoria)"""
+
+    def __init__(
+        self,
+        loader: CatalogLoader = load_active_products,
+        max_bytes: int = 64 * 1024 * 1024,
+        versions: CatalogVersions = catalog_versions,
+        budget_bands_loader: BudgetBandsLoader | None = load_budget_bands,
+    ) -> None:
+        self._loader = loader
+        self._budget_bands_loader = budget_bands_loader
+        self._max_bytes = max_bytes
+        self._versions = versions
+        self._snapshots: dict[tuple[int, str], CatalogSnapshot] = {}
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+        self._eviction_listeners: list[EvictionListener] = []
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, session: AsyncSession, tenant_id: int, category: str) -> CatalogSnapshot:
+        """
+        Retorna snapshot atual do catálogo
+        Se a versão mudou, apenas uma corrotina recarrega; as demais aguardam o resultado
+        Sessão de leitura (réplica): a recarga usa uma sessão própria no primário
+        """
+        key = (tenant_id, category)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.version == self._versions.get(tenant_id):
+            self.hits += 1
+            return snapshot
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Versão lida antes da carga: mudanças durante a carga forçam novo refresh
+            version = self._versions.get(tenant_id)
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot.version == version:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            if session is not None and session.info.get(READ_ONLY_INFO):
+                async with AsyncSessionLocal() as primary:
+                    rows, budget_bands = await self._load(primary, tenant_id, category)
+            else:
+                rows, budget_bands = await self._load(session, tenant_id, category)
+            snapshot = CatalogSnapshot.from_rows(tenant_id, category, version, rows, budget_bands)
+            if key in self._snapshots:
+                self._notify_eviction(key)
+            self._snapshots[key] = snapshot
+            self._enforce_memory_cap()
+            return snapshot
+
+    async def _load(
+        self, session: AsyncSession, tenant_id: int, category: str
+    ) -> tuple[Iterable[Any], dict[str, BudgetBand] | None]:
+        rows = await self._loader(session, tenant_id, category)
+        budget_bands = None
+        if self._budget_bands_loader is not None:
+            budget_bands = await self._budget_bands_loader(session, tenant_id)
+        return rows, budget_bands
+
+    def invalidate(self, tenant_id: int | None = None) -> None:
+        """Remove snapshots de um tenant (ou de todos)"""
+        for key in list(self._snapshots):
+            if tenant_id is None or key[0] == tenant_id:
+                del self._snapshots[key]
+                self._notify_eviction(key)
+
+    def add_eviction_listener(self, listener: EvictionListener) -> None:
+        """
+        Registra callback (tenant_id, categoria) chamado quando um snapshot é despejado ou
+        substituído, para estruturas derivadas (ex: RankingIndex) liberarem suas entradas
+        """
+        self._eviction_listeners.append(listener)
+
+    def _notify_eviction(self, key: tuple[int, str]) -> None:
+        for listener in self._eviction_listeners:
+            listener(*key)
+
+    def memory_usage(self) -> dict[int, int]:
+        """Memória estimada (bytes) por tenant"""
+        usage: dict[int, int] = {}
+        for (tenant_id, _), snapshot in self._snapshots.items():
+            usage[tenant_id] = usage.get(tenant_id, 0) + snapshot.nbytes
+        return usage
+
+    @property
+    def total_bytes(self) -> int:
+        """Memória estimada total (bytes)"""
+        return sum(self.memory_usage().values())
+
+    def _enforce_memory_cap(self) -> None:
+        """Despeja tenants maiores até respeitar o teto global de memória"""
+        usage = self.memory_usage()
+        total = sum(usage.values())
+        for tenant_id, size in sorted(usage.items(), key=lambda item: item[1], reverse=True):
+            if total <= self._max_bytes:
+                break
+            self.invalidate(tenant_id)
+            total -= size
+
+
+# Singleton do cache de catálogo
+_catalog_cache: CatalogCache | None = None
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Retorna instância singleton do cache de catálogo"""
+    global _catalog_cache
+    if _catalog_cache is None:
+        _catalog_cache = CatalogCache(max_bytes=settings.CATALOG_CACHE_MAX_BYTES)
+    return _catalog_cache
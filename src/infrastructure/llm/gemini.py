@@ -1,44 +1,84 @@
 """
 Google Gemini 2.5 Flash Integration
 Integração com Vertex AI ou Google AI Studio
+
+Os SDKs dos provedores são importados só quando selecionados (primeira chamada de
+get_llm), fora do caminho de import da API
 """
-from typing import Optional
-from langchain_google_vertexai import ChatVertexAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+from dataclasses import dataclass
+from datetime import datetime
+
 from langchain_core.language_models import BaseChatModel
 
 from src.core.config import settings
 
 
+def _vertex_llm() -> BaseChatModel:
+    """Vertex AI (produção)"""
+    from langchain_google_vertexai import ChatVertexAI
+
+    return ChatVertexAI(
+        model_name=settings.GEMINI_MODEL,
+        project=settings.GOOGLE_CLOUD_PROJECT,
+        location=settings.VERTEX_AI_LOCATION,
+        temperature=0.7,
+        max_output_tokens=2048,
+    )
+
+
+def _studio_llm(api_key: str) -> BaseChatModel:
+    """Google AI Studio (desenvolvimento/teste)"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=settings.GEMINI_MODEL,
+        google_api_key=api_key,
+        temperature=0.7,
+        max_output_tokens=2048,
+    )
+
+
+# Singleton do cliente LLM (construído uma vez por processo; ver warm-up)
+_llm: BaseChatModel | None = None
+
+
 def get_llm() -> BaseChatModel:
     """
     Retorna instância do LLM (Gemini 2.5 Flash)
     Prioriza Vertex AI, fallback para Google AI Studio
     """
+    global _llm
+    if _llm is not None:
+        return _llm
+
     if settings.GOOGLE_CLOUD_PROJECT and settings.GOOGLE_APPLICATION_CREDENTIALS:
-        # Vertex AI (produção)
-        return ChatVertexAI(
-            model_name=settings.GEMINI_MODEL,
-            project=settings.GOOGLE_CLOUD_PROJECT,
-            location=settings.VERTEX_AI_LOCATION,
-            temperature=0.7,
-            max_output_tokens=2048,
-        )
-    
-    # Google AI Studio (desenvolvimento/teste)
+        _llm = _vertex_llm()
+        return _llm
+
     # Requer GOOGLE_API_KEY no .env
     api_key = getattr(settings, "GOOGLE_API_KEY", None)
     if api_key:
-        return ChatGoogleGenerativeAI(
-            model=settings.GEMINI_MODEL,
-            google_api_key=api_key,
-            temperature=0.7,
-            max_output_tokens=2048,
-        )
-    
+        _llm = _studio_llm(api_key)
+        return _llm
+
     raise ValueError(
         "Configuração LLM inválida. "
         "Configure GOOGLE_CLOUD_PROJECT + GOOGLE_APPLICATION_CREDENTIALS "
         "ou GOOGLE_API_KEY no .env"
     )
 
+
+@dataclass(slots=True)
+class LLMCallStatus:
+    """Resultado da última chamada real ao LLM (health check passivo, sem custo de tokens)"""
+    ok: bool | None = None
+    error: str | None = None
+    at: datetime | None = None
+
+    def record(self, error: Exception | None = None) -> None:
+        self.ok = error is None
+        self.error = None if error is None else f"{type(error).__name__}: {error}"
+        self.at = datetime.utcnow()
+
+
+llm_status = LLMCallStatus()
@@ -0,0 +1,159 @@
+"""
+Particionamento de interaction_logs
+Partições mensais por RANGE (created_at), criadas com antecedência, e retenção
+por DETACH CONCURRENTLY + mover para o schema de arquivo (sem DELETE em massa)
+
+Não há partição DEFAULT: ela impediria o DETACH CONCURRENTLY. Por isso a
+manutenção mantém INTERACTION_LOG_PARTITIONS_AHEAD meses criados à frente.
+"""
+import re
+from datetime import date, datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.core.config import settings
+from src.core.database import get_async_engine
+from src.domain.models import InteractionLog
+
+PARTITIONED_TABLE = InteractionLog.__tablename__
+
+_PARTITION_NAME = re.compile(rf"^{PARTITIONED_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+# ============================================================================
+# NOMES E INTERVALOS
+# ============================================================================
+
+def month_floor(day: date) -> date:
+    """Primeiro dia do mês"""
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Soma meses a um primeiro-dia-do-mês"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """interaction_logs_pAAAAMM"""
+    return f"{PARTITIONED_TABLE}_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """Mês de uma partição pelo nome (None se não seguir o padrão)"""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def partition_ddl(month: date) -> str:
+    """CREATE TABLE da partição mensal (idempotente)"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def partition_months(today: date, months_back: int, months_ahead: int) -> list[date]:
+    """Meses de today - months_back até today + months_ahead"""
+    current = month_floor(today)
+    return [add_months(current, offset) for offset in range(-months_back, months_ahead + 1)]
+
+
+def expired_partitions(names: list[str], today: date, retention_months: int) -> list[str]:
+    """Partições inteiramente anteriores à janela de retenção"""
+    cutoff = add_months(month_floor(today), -retention_months)
+    return sorted(
+        name for name in names
+        if (month := partition_month(name)) is not None and add_months(month, 1) <= cutoff
+    )
+
+
+# ============================================================================
+# MANUTENÇÃO
+# ============================================================================
+
+async def list_partitions(conn: AsyncConnection) -> dict[str, bool]:
+    """Partições anexadas: {nome: detach pendente}"""
+    result = await conn.execute(text("""
+        SELECT c.relname, i.inhdetachpending
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": PARTITIONED_TABLE})
+    return {name: pending for name, pending in result.all()}
+
+
+async def ensure_partitions(conn: AsyncConnection, today: date, months_ahead: int) -> list[str]:
+    """Cria as partições do mês corrente até months_ahead à frente"""
+    existing = await list_partitions(conn)
+    created = []
+    for month in partition_months(today, 0, months_ahead):
+        name = partition_name(month)
+        if name not in existing:
+            await conn.execute(text(partition_ddl(month)))
+            created.append(name)
+    return created
+
+
+async def archive_expired_partitions(
+    conn: AsyncConnection,
+    today: date,
+    retention_months: int,
+    archive_schema: str,
+) -> list[str]:
+    """
+    DETACH CONCURRENTLY das partições fora da retenção e move para archive_schema
+    Exige conexão em AUTOCOMMIT (DETACH CONCURRENTLY não roda em transação)
+    """
+    partitions = await list_partitions(conn)
+    expired = expired_partitions(list(partitions), today, retention_months)
+    if not expired:
+        return []
+
+    await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+    for name in expired:
+        if partitions[name]:
+            # DETACH CONCURRENTLY interrompido anteriormente
+            await conn.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name} FINALIZE"))
+        else:
+            await conn.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name} CONCURRENTLY"))
+        await conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+    return expired
+
+
+async def run_partition_maintenance() -> tuple[list[str], list[str]]:
+    """Cria partições futuras e arquiva as expiradas (tarefa periódica da aplicação)"""
+    today = datetime.utcnow().date()
+    async with get_async_engine().connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        created = await ensure_partitions(conn, today, settings.INTERACTION_LOG_PARTITIONS_AHEAD)
+        archived = await archive_expired_partitions(
+            conn,
+            today,
+            settings.INTERACTION_LOG_RETENTION_MONTHS,
+            settings.INTERACTION_LOG_ARCHIVE_SCHEMA,
+        )
+    return created, archived
+
+
+@event.listens_for(InteractionLog.__table__, "after_create")
+def _create_initial_partitions(target, connection: Connection, **kw) -> None:
+    """
+    create_all (dev/testes): cria partições cobrindo a retenção e os meses à frente
+    Em produção as partições vêm da migration e da manutenção periódica
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    months = partition_months(
+        datetime.utcnow().date(),
+        settings.INTERACTION_LOG_RETENTION_MONTHS,
+        settings.INTERACTION_LOG_PARTITIONS_AHEAD,
+    )
+    for month in months:
+        connection.execute(text(partition_ddl(month)))
@@ -4,7 +4,10 @@ Classe base reutilizável para seeding de dados
 """
 from typing import Any
 from sqlmodel import Session
-from src.core.database import sync_engine
+from src.core.database import get_sync_engine
+
+# Listeners de versão do catálogo: produtos semeados invalidam o cache dos workers da API
+import src.infrastructure.cache.catalog  # noqa: F401,E402
 
 
 class BaseSeeder:
@@ -15,7 +18,7 @@ class BaseSeeder:
 
     def __enter__(self):
         """Context manager entry"""
-        self.session = Session(sync_engine)
+        self.session = Session(get_sync_engine())
         return self
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> bool:
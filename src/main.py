@@ -2,13 +2,23 @@
 FastAPI Main Application
 SmartSupp - SaaS Multitenant de Recomendação de Suplementos Esportivos
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from src.core.background import start_periodic_task, stop_periodic_tasks
 from src.core.config import settings
-from src.core.database import init_db, TenantScope
+from src.core.pool import render_pool_metrics
+from src.core.database import init_db, run_replica_health_check
+from src.core.invalidation import get_invalidation_bus, run_invalidation_version_check
 from src.core.security import TenantMiddleware
 from src.api.routes import chat, user_profile, analytics
+from src.application.analytics import run_daily_rollup
+from src.application.live_analytics import run_live_reconciliation
+from src.application.sketches import run_sketch_flush
+from src.application.health import liveness_report, readiness_report
+from src.application.warmup import start_warmup, stop_warmup
+from src.infrastructure.partitioning import run_partition_maintenance
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -27,13 +37,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware para limpar escopo de tenant após requisição
-@app.middleware("http")
-async def tenant_middleware(request, call_next):
-    response = await call_next(request)
-    TenantScope.clear_tenant()
-    return response
-
 # Registrar rotas
 app.include_router(chat.router)
 app.include_router(user_profile.router)
@@ -47,6 +50,53 @@ async def startup_event():
     if settings.DEBUG:
         init_db()
 
+    # Grafo, conexões e caches aquecidos em background; /ready fica 503 até terminar
+    start_warmup()
+
+    if settings.TESTING:
+        return
+
+    # Invalidações de cache publicadas por outros workers/pods (LISTEN/NOTIFY)
+    if settings.INVALIDATION_BUS_ENABLED:
+        get_invalidation_bus().start()
+        start_periodic_task(
+            "invalidation_version_check", settings.INVALIDATION_VERSION_CHECK_SECONDS, run_invalidation_version_check
+        )
+
+    # Saúde/atraso das réplicas de leitura (fora da rotação enquanto falham)
+    if settings.DATABASE_REPLICA_URLS:
+        start_periodic_task(
+            "replica_health", settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS, run_replica_health_check
+        )
+
+    # Partições futuras de interaction_logs e retenção das antigas
+    start_periodic_task(
+        "partition_maintenance", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, run_partition_maintenance
+    )
+
+    # Rollup diário de analytics (incremental a partir do watermark)
+    if settings.ROLLUP_ENABLED:
+        start_periodic_task("daily_rollup", settings.ROLLUP_INTERVAL_SECONDS, run_daily_rollup)
+
+    # Sketches de contagem distinta acumulados em memória pelo /chat
+    start_periodic_task("sketch_flush", settings.SKETCH_FLUSH_SECONDS, run_sketch_flush)
+
+    # Contadores ao vivo: reconstruídos a partir do banco na startup e periodicamente
+    if settings.LIVE_COUNTERS_ENABLED:
+        start_periodic_task(
+            "live_counters_reconcile", settings.LIVE_COUNTERS_RECONCILE_SECONDS, run_live_reconciliation
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Para tarefas em background"""
+    await stop_warmup()
+    await stop_periodic_tasks()
+    if not settings.TESTING:
+        await run_sketch_flush()
+    await get_invalidation_bus().stop()
+
 
 @app.get("/")
 async def root():
@@ -60,9 +110,23 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check detalhado"""
-    return {
-        "status": "healthy",
-        "database": "connected",  # TODO: Implementar verificação real
-    }
+    """Liveness: processo respondendo (não consulta dependências)"""
+    return liveness_report()
+
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness: 503 até o warm-up terminar, com banco fora ou pool primário saturado
+    Sondagens em cache (HEALTH_PROBE_TTL_SECONDS)
+    """
+    ready, report = await readiness_report()
+    if not ready:
+        response.status_code = 503
+    return report
+
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas dos pools de conexão (formato texto do Prometheus)"""
+    return PlainTextResponse(render_pool_metrics(), media_type="text/plain; version=0.0.4")
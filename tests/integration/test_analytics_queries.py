@@ -0,0 +1,170 @@
+"""
+Integration Tests - Analytics Queries
+"""
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlmodel import select
+
+from src.application.analytics import (
+    count_interactions,
+    fetch_brand_performance,
+    fetch_product_funnel,
+    refresh_daily_rollups,
+)
+from src.application.feedback import FeedbackInput, apply_feedback_batch
+from src.application.sketches import (
+    SketchBuffer,
+    fetch_distinct_counts,
+    flush_distinct_sketches,
+    rebuild_distinct_sketches,
+)
+from src.domain.models import DailyProductStats, InteractionLog
+
+
+@pytest.fixture
+async def sample_interactions(test_session, sample_tenant, sample_products) -> list[InteractionLog]:
+    """Três interações recomendando os dois produtos de teste"""
+    growth, integral = sample_products
+    logs = [
+        InteractionLog(
+            tenant_id=sample_tenant.id,
+            session_id=f"analytics-session-{i}",
+            recommended_products=[integral.id, growth.id],
+            ranking_data={},
+            selected_product_id=integral.id if i == 0 else None,
+            satisfaction_score=5 if i == 0 else None,
+        )
+        for i in range(3)
+    ]
+    for log in logs:
+        test_session.add(log)
+    await test_session.commit()
+    return logs
+
+
+@pytest.mark.asyncio
+async def test_fetch_brand_performance(test_session, sample_tenant, sample_products, sample_interactions):
+    """Testa agregação por produto feita no banco"""
+    period_end = datetime.utcnow() + timedelta(minutes=1)
+    period_start = period_end - timedelta(days=30)
+
+    performance = await fetch_brand_performance(test_session, sample_tenant.id, period_start, period_end)
+    by_brand = {stats.brand_name: stats for stats in performance}
+
+    assert by_brand["IntegralMedica"].recommendation_count == 3
+    assert by_brand["IntegralMedica"].selection_count == 1
+    assert by_brand["IntegralMedica"].avg_satisfaction == 5.0
+    assert by_brand["Growth"].selection_count == 0
+    assert await count_interactions(test_session, sample_tenant.id, period_start, period_end) == 3
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_rollups_is_idempotent(test_session, sample_tenant, sample_products):
+    """Testa rollup incremental: re-executar não duplica contagens"""
+    growth, integral = sample_products
+    two_days_ago = datetime.utcnow() - timedelta(days=2)
+    for i in range(2):
+        test_session.add(InteractionLog(
+            tenant_id=sample_tenant.id,
+            session_id=f"rollup-session-{i}",
+            recommended_products=[growth.id],
+            ranking_data={},
+            selected_product_id=growth.id,
+            satisfaction_score=4,
+            created_at=two_days_ago,
+        ))
+    await test_session.commit()
+
+    watermark = await refresh_daily_rollups(test_session, safety_lag=timedelta(0))
+    assert await refresh_daily_rollups(test_session, safety_lag=timedelta(0)) == watermark
+
+    stats = (await test_session.exec(
+        select(DailyProductStats)
+        .where(DailyProductStats.tenant_id == sample_tenant.id)
+        .where(DailyProductStats.product_id == growth.id)
+    )).one()
+    assert stats.day == two_days_ago.date()
+    assert stats.recommendation_count == 2
+    assert stats.selection_count == 2
+    assert stats.satisfaction_sum == 8
+
+    # Período com dias fechados (rollup) + hoje (logs crus) soma sem duplicar
+    period_end = datetime.utcnow()
+    period_start = datetime.combine((period_end - timedelta(days=7)).date(), time.min)
+    performance = await fetch_brand_performance(test_session, sample_tenant.id, period_start, period_end)
+    by_brand = {p.brand_name: p for p in performance}
+    assert by_brand["Growth"].recommendation_count == 2
+    assert by_brand["Growth"].avg_satisfaction == 4.0
+    assert await count_interactions(test_session, sample_tenant.id, period_start, period_end) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_product_funnel(test_session, sample_tenant, sample_products, sample_interactions):
+    """Testa funil de produto via recommended_products @> [id]"""
+    growth, integral = sample_products
+    period_end = datetime.utcnow() + timedelta(minutes=1)
+    period_start = period_end - timedelta(days=30)
+
+    funnel = await fetch_product_funnel(test_session, sample_tenant.id, integral.id, period_start, period_end)
+
+    assert funnel.recommendation_count == 3
+    assert funnel.selection_count == 1
+    assert funnel.rated_count == 1
+    assert funnel.avg_satisfaction == 5.0
+
+
+@pytest.mark.asyncio
+async def test_distinct_sketches_recorded_on_insert(test_session, sample_tenant, sample_products):
+    """Testa sketches gravados pelo flush do buffer e recalculados pelo backfill"""
+    growth, integral = sample_products
+    today = datetime.utcnow().date()
+    buffer = SketchBuffer()
+    for i in range(4):
+        session_id = f"hll-session-{i % 2}"
+        test_session.add(InteractionLog(
+            tenant_id=sample_tenant.id,
+            session_id=session_id,
+            recommended_products=[growth.id] if i < 3 else [integral.id],
+            ranking_data={},
+        ))
+        buffer.add(sample_tenant.id, today, session_id, None, [growth.id] if i < 3 else [integral.id])
+    await test_session.commit()
+    assert await flush_distinct_sketches(test_session, buffer) == 3
+    assert len(buffer) == 0
+
+    counts = await fetch_distinct_counts(test_session, sample_tenant.id, today, today)
+    assert counts.sessions == 2
+    assert counts.profiles == 0
+    assert (await fetch_distinct_counts(test_session, sample_tenant.id, today, today, integral.id)).sessions == 1
+
+    assert await rebuild_distinct_sketches(test_session, sample_tenant.id, today) == 3
+    assert (await fetch_distinct_counts(test_session, sample_tenant.id, today, today, growth.id)).sessions == 2
+
+
+@pytest.mark.asyncio
+async def test_apply_feedback_batch_is_idempotent(test_session, sample_tenant, sample_products, sample_interactions):
+    """Testa feedback em lote: aplica na interação da sessão, ignora reenvio e sessões desconhecidas"""
+    growth, integral = sample_products
+    events = [
+        FeedbackInput("order-1", "analytics-session-1", growth.id, satisfaction_score=4),
+        FeedbackInput("order-2", "analytics-session-unknown", growth.id),
+    ]
+
+    result = await apply_feedback_batch(test_session, sample_tenant.id, events)
+    assert result.applied == ["order-1"]
+    assert result.unmatched == ["order-2"]
+
+    again = await apply_feedback_batch(test_session, sample_tenant.id, events[:1])
+    assert again.applied == []
+    assert again.duplicates == ["order-1"]
+
+    log = sample_interactions[1]
+    await test_session.refresh(log)
+    assert log.selected_product_id == growth.id
+    assert log.satisfaction_score == 4
+
+    period_end = datetime.utcnow() + timedelta(minutes=1)
+    period_start = period_end - timedelta(days=30)
+    performance = await fetch_brand_performance(test_session, sample_tenant.id, period_start, period_end)
+    assert {p.brand_name: p for p in performance}["Growth"].selection_count == 1
@@ -132,6 +132,44 @@ async def test_analytics_brand_performance_custom_days(test_client: TestClient,
     data = response.json()
 
 
+@pytest.mark.asyncio
+async def test_analytics_product_funnel(test_client: TestClient, sample_tenant, sample_products):
+    """Testa endpoint GET /analytics/products/{product_id}/funnel"""
+    response = test_client.get(
+        f"/analytics/products/{sample_products[0].id}/funnel?days=30",
+        headers={"X-Tenant-ID": str(sample_tenant.id)},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["product_id"] == sample_products[0].id
+    assert data["recommendation_count"] == 0
+    assert data["conversion_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_analytics_export_ndjson(test_client: TestClient, sample_tenant):
+    """Testa endpoint GET /analytics/export (streaming NDJSON)"""
+    response = test_client.get(
+        "/analytics/export?format=ndjson",
+        headers={"X-Tenant-ID": str(sample_tenant.id)},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+
+@pytest.mark.asyncio
+async def test_analytics_export_requires_created_at_with_id(test_client: TestClient, sample_tenant):
+    """Testa validação de retomada (after_id sem after_created_at)"""
+    response = test_client.get(
+        "/analytics/export?after_id=10",
+        headers={"X-Tenant-ID": str(sample_tenant.id)},
+    )
+
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_get_user_profile_not_found(test_client: TestClient, sample_tenant):
     """Testa busca de perfil inexistente"""
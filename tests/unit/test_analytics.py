@@ -0,0 +1,24 @@
+"""
+Unit Tests - Consultas de analytics (rollup diário + logs crus)
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from src.application.analytics import _rollup_window
+
+
+class FakeSession:
+    """Sessão que devolve a marca d'água do rollup"""
+
+    async def exec(self, statement):
+        return SimpleNamespace(first=lambda: 500)
+
+
+async def test_rollup_window_keeps_partial_start_day_in_raw_logs():
+    """Testa que o dia parcial do início do período fica com os logs crus, sem arredondar"""
+    window = await _rollup_window(FakeSession(), datetime(2026, 1, 1, 15, 30), datetime(2026, 1, 10, 12, 0))
+
+    assert window.first_day == date(2026, 1, 2)
+    assert window.end_day == date(2026, 1, 10)
+    assert window.watermark == 500
+    assert "interaction_logs.created_at <" in str(window.raw_criteria())
@@ -0,0 +1,156 @@
+"""
+Unit Tests - Catalog Snapshot Cache
+"""
+import asyncio
+from types import SimpleNamespace
+
+from src.core.database import READ_ONLY_INFO
+from src.infrastructure.cache import catalog
+from src.infrastructure.cache.catalog import (
+    FLAG_MALTODEXTRIN,
+    FLAG_NO_LACTOSE,
+    CatalogCache,
+    CatalogSnapshot,
+    CatalogVersions,
+    parse_nutritional_flags,
+)
+
+
+def make_row(product_id: int, price: float, **nutritional_info) -> SimpleNamespace:
+    """Linha com os atributos de Product usados pelo snapshot"""
+    return SimpleNamespace(
+        id=product_id,
+        brand_name=f"Brand {product_id}",
+        product_name=f"Product {product_id}",
+        price=price,
+        nutritional_info=nutritional_info,
+        protein_g=nutritional_info.get("protein_g"),
+        certifications=["ANVISA"],
+    )
+
+
+def make_loader(rows_by_tenant: dict[int, list], calls: list):
+    """Loader fake que registra chamadas"""
+    async def loader(session, tenant_id, category):
+        calls.append((tenant_id, category))
+        await asyncio.sleep(0)
+        return rows_by_tenant.get(tenant_id, [])
+    return loader
+
+
+def test_parse_nutritional_flags():
+    """Testa conversão de nutritional_info em bitmask"""
+    flags = parse_nutritional_flags({"maltodextrin": True, "no_lactose": True, "vegan": False})
+    assert flags & FLAG_MALTODEXTRIN
+    assert flags & FLAG_NO_LACTOSE
+    assert parse_nutritional_flags(None) == 0
+
+
+def test_snapshot_from_rows_sorted_by_price():
+    """Testa snapshot ordenado por preço com colunas paralelas"""
+    rows = [make_row(1, 129.9, protein_g=25.0), make_row(2, 89.9, protein_g=24.0)]
+    snapshot = CatalogSnapshot.from_rows(1, "protein", 3, rows)
+
+    assert len(snapshot) == 2
+    assert list(snapshot.ids) == [2, 1]
+    assert list(snapshot.protein_g) == [24.0, 25.0]
+    assert snapshot.version == 3
+    assert snapshot.nbytes > 0
+
+
+def test_catalog_versions_bump_all():
+    """Testa versão global e por tenant"""
+    versions = CatalogVersions()
+    assert versions.get(1) == 0
+    versions.bump(1)
+    assert versions.get(1) > versions.get(2)
+    previous = versions.get(1)
+    versions.bump_all()
+    assert versions.get(1) > previous
+    assert versions.get(2) == versions.get(1)
+
+
+async def test_cache_hit_and_version_refresh():
+    """Testa hit em cache e refresh após mudança de versão"""
+    calls: list = []
+    versions = CatalogVersions()
+    cache = CatalogCache(
+        make_loader({1: [make_row(1, 50.0)]}, calls),
+        versions=versions,
+        budget_bands_loader=None,
+    )
+
+    await cache.get(None, 1, "protein")
+    await cache.get(None, 1, "protein")
+    assert len(calls) == 1
+
+    versions.bump(1)
+    await cache.get(None, 1, "protein")
+    assert len(calls) == 2
+
+
+async def test_cache_stampede_protection():
+    """Testa que requisições concorrentes disparam uma única carga"""
+    calls: list = []
+    cache = CatalogCache(
+        make_loader({1: [make_row(1, 50.0)]}, calls),
+        versions=CatalogVersions(),
+        budget_bands_loader=None,
+    )
+
+    snapshots = await asyncio.gather(*[cache.get(None, 1, "protein") for _ in range(20)])
+
+    assert len(calls) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+async def test_cache_evicts_largest_tenant_under_memory_cap():
+    """Testa despejo do maior tenant quando o teto de memória é excedido"""
+    rows_by_tenant = {
+        1: [make_row(i, float(i)) for i in range(1, 4)],
+        2: [make_row(i, float(i)) for i in range(1, 200)],
+    }
+    small = CatalogSnapshot.from_rows(1, "protein", 0, rows_by_tenant[1]).nbytes
+    cache = CatalogCache(
+        make_loader(rows_by_tenant, []),
+        max_bytes=small * 2,
+        versions=CatalogVersions(),
+        budget_bands_loader=None,
+    )
+
+    await cache.get(None, 1, "protein")
+    await cache.get(None, 2, "protein")
+
+    usage = cache.memory_usage()
+    assert 1 in usage
+    assert 2 not in usage
+    assert cache.total_bytes <= small * 2
+
+
+async def test_reload_from_read_session_uses_primary(monkeypatch):
+    """Testa recarga a partir de sessão de réplica feita numa sessão própria do primário"""
+    used = []
+
+    async def loader(session, tenant_id, category):
+        used.append(session)
+        return [make_row(1, 50.0)]
+
+    class PrimarySession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    primary = PrimarySession()
+    monkeypatch.setattr(catalog, "AsyncSessionLocal", lambda: primary)
+    cache = CatalogCache(loader, versions=CatalogVersions(), budget_bands_loader=None)
+
+    read_session = SimpleNamespace(info={READ_ONLY_INFO: True})
+    await cache.get(read_session, 1, "protein")
+    assert used == [primary]
+
+    cache.invalidate(1)
+    write_session = SimpleNamespace(info={})
+    await cache.get(write_session, 1, "protein")
+    assert used == [primary, write_session]
@@ -0,0 +1,80 @@
+"""
+Unit Tests - Exportação de interaction_logs
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.application import export
+from src.application.export import (
+    EXPORT_FIELDS,
+    ExportRange,
+    encode_csv,
+    encode_ndjson,
+    stream_export,
+)
+from src.domain.enums import ExportFormat
+
+CREATED_AT = datetime(2026, 10, 1, 12, 30)
+
+
+def make_row(log_id: int) -> tuple:
+    return (
+        log_id, CREATED_AT, "session-1", None, "quero ganhar massa",
+        [1, 2], 1, 5, None, {"1": {"score": 90.0, "reasons": ["Sem lactose"]}},
+    )
+
+
+def test_encode_ndjson_one_object_per_line():
+    """Testa NDJSON com datas ISO e JSONB preservado"""
+    lines = encode_ndjson([make_row(1), make_row(2)]).decode().splitlines()
+
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert list(record) == list(EXPORT_FIELDS)
+    assert record["created_at"] == CREATED_AT.isoformat()
+    assert record["recommended_products"] == [1, 2]
+    assert record["ranking_data"]["1"]["reasons"] == ["Sem lactose"]
+
+
+def test_encode_csv_serializes_nested_values():
+    """Testa CSV com listas/JSONB serializados como JSON"""
+    data = encode_csv([make_row(1)], header=True).decode()
+    header, row = list(csv.reader(io.StringIO(data)))
+
+    assert header == list(EXPORT_FIELDS)
+    assert json.loads(row[EXPORT_FIELDS.index("recommended_products")]) == [1, 2]
+    assert row[EXPORT_FIELDS.index("user_profile_id")] == ""
+
+
+def test_export_range_keyset_criteria():
+    """Testa retomada por (created_at, id) com filtro isolado em created_at"""
+    export_range = ExportRange(tenant_id=1).resume_after(CREATED_AT, 42)
+    sql = " AND ".join(
+        str(criterion.compile(dialect=postgresql.dialect())) for criterion in export_range.criteria()
+    )
+
+    assert "interaction_logs.created_at >=" in sql
+    assert "(interaction_logs.created_at, interaction_logs.id) >" in sql
+
+
+@pytest.mark.asyncio
+async def test_stream_export_gzip(monkeypatch):
+    """Testa stream comprimido com gzip incremental"""
+    async def fake_rows(export_range, window_size, chunk_size):
+        yield [make_row(1)]
+        yield [make_row(2)]
+
+    monkeypatch.setattr(export, "iter_export_rows", fake_rows)
+
+    body = b"".join([
+        chunk async for chunk in stream_export(ExportRange(tenant_id=1), ExportFormat.NDJSON, compress=True)
+    ])
+    lines = gzip.decompress(body).decode().splitlines()
+
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
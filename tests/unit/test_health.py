@@ -0,0 +1,111 @@
+"""
+Unit Tests - Sondagens em cache e endpoints /health e /ready
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import Response
+
+from src import main
+from src.application import health
+from src.application.health import CachedProbe, ProbeResult
+from src.application.warmup import WarmupState
+from src.infrastructure.llm.gemini import LLMCallStatus
+
+
+@pytest.mark.asyncio
+async def test_cached_probe_single_flight_and_stale_while_refresh():
+    """Testa cache por ttl, uma execução para chamadas concorrentes e resultado anterior durante o refresh"""
+    calls = 0
+
+    async def probe():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"call": calls}
+
+    cached = CachedProbe("database", probe, ttl=60, timeout=1)
+    first, second = await asyncio.gather(cached.get(), cached.get())
+    assert calls == 1 and first is second and first.ok
+    assert await cached.get() is first
+
+    cached.ttl = 0
+    stale, again = await asyncio.gather(cached.get(), cached.get())
+    assert stale is first and again is first  # refresh em background, sem esperar
+    refreshed = await cached._refresh
+    assert calls == 2  # um único refresh para as chamadas concorrentes
+
+    cached.ttl = 60
+    assert await cached.get() is refreshed and refreshed.detail == {"call": 2}
+
+
+@pytest.mark.asyncio
+async def test_cached_probe_failures_do_not_raise():
+    """Testa exceção e timeout convertidos em ok=False"""
+    async def failing():
+        raise ConnectionRefusedError("connection refused")
+
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    result = await CachedProbe("database", failing, ttl=5, timeout=1).get()
+    assert not result.ok and result.error.startswith("ConnectionRefusedError")
+    result = await CachedProbe("database", slow, ttl=5, timeout=0.01).get()
+    assert not result.ok and result.error.startswith("timeout")
+
+
+@pytest.mark.asyncio
+async def test_ready_gates_on_warmup_database_and_pool(monkeypatch):
+    """Testa /ready: 503 durante o warm-up, com banco fora ou pool saturado; LLM fora só degrada"""
+    state = WarmupState()
+    database = ProbeResult(True, 1.2, time.monotonic(), {"replicas": 0, "replicas_healthy": 0})
+    saturation = {"primary": {"checked_out": 2, "capacity": 10, "saturation": 0.2}}
+
+    class Probe:
+        async def get(self):
+            return database
+
+    monkeypatch.setattr(health, "get_warmup_state", lambda: state)
+    monkeypatch.setattr(health, "get_probes", lambda: {"database": Probe()})
+    monkeypatch.setattr(health, "pool_saturation", lambda: saturation)
+    monkeypatch.setattr(health.settings, "HEALTH_LLM_PROBE_ENABLED", False)
+
+    async def ready() -> tuple[int, dict]:
+        response = Response()
+        body = await main.readiness_check(response)
+        return response.status_code or 200, body
+
+    status, body = await ready()
+    assert status == 503 and body["status"] == "not_ready"
+
+    state.mark_ready()
+    status, body = await ready()
+    assert status == 200 and body["status"] == "ready"
+    assert body["database"]["latency_ms"] == 1.2
+    assert "snapshot_jobs_in_flight" in body["background"]
+
+    llm_status = LLMCallStatus()
+    llm_status.record(RuntimeError("429 quota exceeded"))
+    monkeypatch.setattr(health, "llm_status", llm_status)
+    status, body = await ready()
+    assert status == 200 and body["status"] == "degraded"
+    assert body["llm"]["error"] == "RuntimeError: 429 quota exceeded"
+
+    saturation["primary"]["saturation"] = 1.0
+    status, _ = await ready()
+    assert status == 503
+
+    saturation["primary"]["saturation"] = 0.2
+    database = ProbeResult(False, 2000.0, time.monotonic(), error="timeout (2.0s)")
+    status, body = await ready()
+    assert status == 503 and body["database"]["error"] == "timeout (2.0s)"
+
+
+@pytest.mark.asyncio
+async def test_health_is_liveness_only(monkeypatch):
+    """Testa /health sem sondar dependências"""
+    monkeypatch.setattr(health, "get_probes", lambda: pytest.fail("liveness não deve sondar"))
+    body = await main.health_check()
+    assert body["status"] == "alive"
@@ -0,0 +1,113 @@
+"""
+Unit Tests - Barramento de invalidação (LISTEN/NOTIFY)
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import invalidation
+from src.core.invalidation import (
+    InvalidationBus,
+    InvalidationEvent,
+    InvalidationKind,
+    encode_payload,
+    queue_invalidation,
+)
+from src.infrastructure.cache.catalog import catalog_versions
+
+
+class FakeListenConnection:
+    """Conexão do listener devolvendo valores da sequência em ordem"""
+
+    def __init__(self, *values: int):
+        self.values = list(values)
+        self.terminated = False
+
+    async def fetchval(self, query: str) -> int:
+        return self.values.pop(0)
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+
+def test_notifications_dispatch_to_handlers_except_own():
+    """Testa despacho, eventos do próprio processo ignorados e payload inválido ou tipo desconhecido descartados"""
+    bus = InvalidationBus()
+    received = []
+    bus.subscribe(InvalidationKind.CATALOG, received.append)
+    catalog = InvalidationEvent(InvalidationKind.CATALOG, tenant_id=3)
+
+    bus.handle_notification(f"7:{encode_payload(catalog, 'other-worker')}")
+    bus.handle_notification(f"8:{encode_payload(catalog, bus.origin)}")
+    bus.handle_notification("9:not-json")
+    bus.handle_notification('10:{"kind": "profile", "tenant_id": 3, "key": "42", "origin": "other-worker"}')
+
+    assert received == [catalog]
+    assert bus.last_seen == 10
+
+
+def test_pending_events_sent_with_sequence_on_postgres():
+    """Testa pg_notify na transação da escrita (um por evento, sem duplicatas) e nada em outros dialetos"""
+    executed = []
+    connection = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        execute=lambda stmt, params: executed.append((str(stmt), params)),
+    )
+    session = SimpleNamespace(info={}, connection=lambda: connection)
+    catalog = InvalidationEvent(InvalidationKind.CATALOG, tenant_id=1)
+    queue_invalidation(session, catalog)
+    queue_invalidation(session, catalog)
+
+    invalidation._send_pending(session)
+    invalidation._send_pending(session)
+
+    assert len(executed) == 1
+    sql, params = executed[0]
+    assert "pg_notify" in sql and "nextval('cache_invalidation_seq')" in sql
+    assert params["channel"] == invalidation.CHANNEL
+    assert invalidation.decode_notification(f"1:{params['payload']}")[2] == catalog
+
+    connection.dialect.name = "sqlite"
+    queue_invalidation(session, catalog)
+    invalidation._send_pending(session)
+    assert len(executed) == 1 and invalidation._PENDING_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_missed_events_trigger_resync():
+    """Testa resync na reconexão com eventos publicados e lacuna persistente entre verificações"""
+    bus = InvalidationBus()
+    resyncs = []
+    bus.subscribe(InvalidationKind.CATALOG, lambda event: None, resync=lambda: resyncs.append(True))
+
+    await bus._on_connect(FakeListenConnection(5), reconnect=False)
+    assert bus.last_seen == 5 and resyncs == []
+
+    # Número 6 visto na sequência: uma verificação de tolerância (transação ainda aberta)
+    bus._connection = FakeListenConnection(6, 6)
+    await bus.check_versions()
+    assert resyncs == []
+    bus.handle_notification(f"6:{encode_payload(InvalidationEvent(InvalidationKind.CATALOG, 1), 'w2')}")
+    await bus.check_versions()
+    assert resyncs == []
+
+    # Número 7 nunca chega
+    bus._connection = FakeListenConnection(7, 7)
+    await bus.check_versions()
+    await bus.check_versions()
+    assert resyncs == [True] and bus.last_seen == 7
+
+    await bus._on_connect(FakeListenConnection(9), reconnect=True)
+    assert resyncs == [True, True] and bus.last_seen == 9
+
+
+def test_catalog_subscribes_to_bus():
+    """Testa evento CATALOG de outro processo incrementando a versão do catálogo (tenant ou todos)"""
+    bus = invalidation.get_invalidation_bus()
+    before = catalog_versions.get(77)
+    bus.dispatch(InvalidationEvent(InvalidationKind.CATALOG, tenant_id=77))
+    assert catalog_versions.get(77) > before
+
+    other = catalog_versions.get(78)
+    bus.dispatch(InvalidationEvent(InvalidationKind.CATALOG))
+    assert catalog_versions.get(78) > other
@@ -0,0 +1,121 @@
+"""
+Unit Tests - Contadores ao vivo de analytics
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.application.live_analytics import LiveCounters, reconcile_live_counters
+
+TENANT_ID = 1
+
+
+def by_product(counters: LiveCounters, tenant_id: int = TENANT_ID) -> dict:
+    return {stats.product_id: stats for stats in counters.snapshot(tenant_id).products}
+
+
+def test_record_interaction_and_feedback():
+    """Testa incrementos de recomendação, seleção e satisfação"""
+    counters = LiveCounters(window_seconds=3600, bucket_seconds=60)
+    now = datetime.utcnow()
+
+    counters.record_interaction(TENANT_ID, now, [1, 2])
+    counters.record_interaction(TENANT_ID, now, [1])
+    counters.record_feedback(TENANT_ID, now, [1, 2], selected_product_id=1, satisfaction_score=4)
+
+    snapshot = counters.snapshot(TENANT_ID)
+    stats = by_product(counters)
+    assert snapshot.total_interactions == 2
+    assert [s.product_id for s in snapshot.products] == [1, 2]
+    assert stats[1].recommendation_count == 2
+    assert stats[1].selection_count == 1
+    assert stats[1].conversion_rate == 0.5
+    assert stats[2].selection_count == 0
+    assert stats[2].avg_satisfaction == 4
+    assert counters.snapshot(TENANT_ID + 1).total_interactions == 0
+
+
+def test_feedback_update_replaces_previous_values():
+    """Testa que feedback corrigido desconta os valores anteriores"""
+    counters = LiveCounters(window_seconds=3600, bucket_seconds=60)
+    now = datetime.utcnow()
+    counters.record_interaction(TENANT_ID, now, [1, 2])
+    counters.record_feedback(TENANT_ID, now, [1, 2], selected_product_id=1, satisfaction_score=2)
+
+    counters.record_feedback(
+        TENANT_ID, now, [1, 2],
+        selected_product_id=2,
+        satisfaction_score=5,
+        previous_selected_product_id=1,
+        previous_satisfaction_score=2,
+    )
+
+    stats = by_product(counters)
+    assert stats[1].selection_count == 0
+    assert stats[2].selection_count == 1
+    assert stats[1].satisfaction_sum == 5
+    assert stats[1].satisfaction_count == 1
+
+
+def test_window_expires_old_buckets():
+    """Testa que eventos fora da janela saem dos totais"""
+    counters = LiveCounters(window_seconds=600, bucket_seconds=60)
+    now = datetime.utcnow()
+
+    counters.record_interaction(TENANT_ID, now - timedelta(seconds=300), [1])
+    counters.record_interaction(TENANT_ID, now - timedelta(hours=1), [1])  # ignorado
+    counters.record_interaction(TENANT_ID, now, [1, 2])
+
+    assert counters.snapshot(TENANT_ID, now).total_interactions == 2
+    later = counters.snapshot(TENANT_ID, now + timedelta(seconds=420))
+    assert later.total_interactions == 1
+    assert [(s.product_id, s.recommendation_count) for s in later.products] == [(1, 1), (2, 1)]
+    assert counters.snapshot(TENANT_ID, now + timedelta(hours=1)).products == []
+
+
+def test_replace_reconciles_closed_buckets():
+    """Testa reconciliação: buckets fechados vêm do banco, o corrente mantém os incrementos locais"""
+    counters = LiveCounters(window_seconds=3600, bucket_seconds=60)
+    now = datetime.utcnow()
+    current = counters.bucket_index(now)
+    counters.record_interaction(TENANT_ID, now - timedelta(seconds=120), [1])  # contado só localmente
+    counters.record_interaction(TENANT_ID, now, [1])
+
+    counters.replace(
+        counters.first_live_bucket(now),
+        current,
+        interaction_rows=[(TENANT_ID, current - 2, 3), (TENANT_ID + 1, current - 1, 1)],
+        product_rows=[(TENANT_ID, current - 2, 1, 3, 1, 9, 2), (TENANT_ID + 1, current - 1, 5, 1, 0, 0, 0)],
+        reconciled_at=now,
+    )
+
+    snapshot = counters.snapshot(TENANT_ID)
+    stats = by_product(counters)
+    assert snapshot.reconciled_at == now
+    assert snapshot.total_interactions == 4
+    assert stats[1].recommendation_count == 4
+    assert stats[1].selection_count == 1
+    assert stats[1].avg_satisfaction == 4.5
+    assert by_product(counters, TENANT_ID + 1)[5].recommendation_count == 1
+
+
+async def test_reconcile_filters_by_tenant_and_window():
+    """Testa que a reconciliação filtra tenant_id + created_at (serve idx_log_tenant_created)"""
+    statements = []
+
+    class FakeSession:
+        async def exec(self, statement):
+            statements.append(statement)
+            rows = [1, 2] if len(statements) == 1 else []
+            return SimpleNamespace(all=lambda: rows)
+
+    counters = LiveCounters(window_seconds=3600, bucket_seconds=60)
+    await reconcile_live_counters(FakeSession(), counters)
+
+    assert len(statements) == 3
+    for statement in statements[1:]:
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "interaction_logs.tenant_id IN" in sql
+        assert "interaction_logs.created_at >=" in sql
+    assert counters.reconciled_at is not None
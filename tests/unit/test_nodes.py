@@ -146,6 +146,7 @@ async def test_science_retriever(test_session, sample_scientific_data):
     
     assert result["step"] == "science_retrieved"
     assert result["recommended_category"] == SupplementCategory.PROTEIN.value
+    assert SupplementCategory.CREATINE.value in result["recommended_categories"]
     assert result["scientific_data"] is not None
     assert len(result["scientific_data"]) > 0
     assert result["scientific_data"][0]["supplement_name"] == "Whey Protein"
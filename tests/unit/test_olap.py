@@ -0,0 +1,111 @@
+"""
+Unit Tests - Backend OLAP (DuckDB sobre snapshots Parquet)
+"""
+import os
+from datetime import date, datetime
+
+import pytest
+
+from src.application.olap import OlapBackend
+from src.application.snapshots import INTERACTIONS, PRODUCTS, snapshot_path, write_parquet
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+TENANT_ID = 7
+
+
+def interactions_table(*rows: tuple):
+    """rows: (id, created_at, session_id, selected_product_id, satisfaction_score, recommended_products)"""
+    columns = ["id", "created_at", "session_id", "selected_product_id", "satisfaction_score", "recommended_products"]
+    data = {name: [row[index] for row in rows] for index, name in enumerate(columns)}
+    return pa.table({
+        "id": pa.array(data["id"], pa.int64()),
+        "tenant_id": pa.array([TENANT_ID] * len(rows), pa.int32()),
+        "created_at": pa.array(data["created_at"], pa.timestamp("us")),
+        "session_id": pa.array(data["session_id"], pa.string()),
+        "user_profile_id": pa.array([None] * len(rows), pa.int64()),
+        "selected_product_id": pa.array(data["selected_product_id"], pa.int64()),
+        "satisfaction_score": pa.array(data["satisfaction_score"], pa.int16()),
+        "recommended_products": pa.array(data["recommended_products"], pa.list_(pa.int64())),
+    })
+
+
+def write_month(root, month: date, *rows: tuple, complete: bool = True):
+    path = snapshot_path(root, INTERACTIONS, TENANT_ID, month)
+    write_parquet(interactions_table(*rows), path)
+    # Arquivo gravado após o fim do mês = snapshot completo
+    written_at = datetime(2030, 1, 1) if complete else datetime.combine(month, datetime.min.time())
+    os.utime(path, (written_at.timestamp(), written_at.timestamp()))
+    return path
+
+
+@pytest.fixture
+def backend(tmp_path):
+    write_month(
+        tmp_path, date(2026, 1, 1),
+        (1, datetime(2026, 1, 10), "a", 1, 5, [1, 2]),
+        (2, datetime(2026, 1, 20), "a", None, None, [1, 3]),
+    )
+    write_month(
+        tmp_path, date(2026, 2, 1),
+        (3, datetime(2026, 2, 5), "b", 2, 3, [2, 1]),
+    )
+    write_month(tmp_path, date(2026, 3, 1))  # mês sem dados
+    write_parquet(
+        pa.table({
+            "id": pa.array([1, 2, 3], pa.int64()),
+            "brand_name": ["Max", "Growth", "Integral"],
+            "product_name": ["Whey", "Creatina", "BCAA"],
+        }),
+        snapshot_path(tmp_path, PRODUCTS, TENANT_ID),
+    )
+    return OlapBackend(tmp_path)
+
+
+def test_brand_performance(backend):
+    """Testa agregação por produto com join no snapshot de products"""
+    performance = backend.brand_performance(TENANT_ID, datetime(2026, 1, 1), datetime(2026, 3, 1))
+
+    by_id = {stats.product_id: stats for stats in performance}
+    assert [stats.product_id for stats in performance] == [1, 2, 3]
+    assert by_id[1].recommendation_count == 3
+    assert by_id[1].selection_count == 1
+    assert by_id[1].avg_satisfaction == 4
+    assert by_id[2].selection_count == 1
+    assert by_id[2].satisfaction_sum == 8
+    assert by_id[3].brand_name == "Integral"
+    assert by_id[3].avg_satisfaction is None
+
+
+def test_count_and_funnel_respect_period(backend):
+    """Testa filtro por created_at dentro dos arquivos mensais"""
+    start, end = datetime(2026, 1, 15), datetime(2026, 4, 1)
+
+    assert backend.count_interactions(TENANT_ID, start, end) == 2
+
+    funnel = backend.product_funnel(TENANT_ID, 2, start, end)
+    assert funnel.recommendation_count == 1
+    assert funnel.selection_count == 1
+    assert funnel.avg_satisfaction == 3
+
+
+def test_covered_until_stops_at_missing_or_partial_month(backend, tmp_path):
+    """Testa fronteira OLAP/Postgres pelos snapshots completos"""
+    start = datetime(2026, 1, 15)
+
+    assert backend.covered_until(TENANT_ID, start, date(2026, 10, 19)) == date(2026, 4, 1)
+    # Limite no mês corrente (nunca servido por snapshot)
+    assert backend.covered_until(TENANT_ID, start, date(2026, 2, 10)) == date(2026, 2, 1)
+    # Primeiro mês sem snapshot: tudo no Postgres
+    assert backend.covered_until(TENANT_ID, datetime(2025, 12, 1), date(2026, 10, 19)) is None
+
+    write_month(tmp_path, date(2026, 2, 1), complete=False)
+    assert backend.covered_until(TENANT_ID, start, date(2026, 10, 19)) == date(2026, 2, 1)
+
+
+def test_covered_until_stops_at_dirty_month(backend):
+    """Testa mês alterado após o snapshot (feedback tardio) servido pelo Postgres"""
+    start = datetime(2026, 1, 15)
+    dirty = {date(2026, 3, 1)}
+    assert backend.covered_until(TENANT_ID, start, date(2026, 10, 19), dirty) == date(2026, 3, 1)
@@ -0,0 +1,62 @@
+"""
+Unit Tests - Particionamento de interaction_logs
+"""
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from src.domain.models import InteractionLog
+from src.infrastructure.partitioning import (
+    add_months,
+    expired_partitions,
+    partition_ddl,
+    partition_month,
+    partition_months,
+    partition_name,
+)
+
+
+def test_add_months_crosses_year():
+    """Testa aritmética de meses na virada do ano"""
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_name_roundtrip():
+    """Testa nome da partição e leitura do mês a partir do nome"""
+    name = partition_name(date(2026, 3, 1))
+    assert name == "interaction_logs_p202603"
+    assert partition_month(name) == date(2026, 3, 1)
+    assert partition_month("interaction_logs_default") is None
+
+
+def test_partition_ddl_bounds():
+    """Testa limites do intervalo da partição (fim exclusivo no mês seguinte)"""
+    ddl = partition_ddl(date(2026, 12, 1))
+    assert "interaction_logs_p202612 PARTITION OF interaction_logs" in ddl
+    assert "FROM ('2026-12-01') TO ('2027-01-01')" in ddl
+
+
+def test_partition_months_window():
+    """Testa meses criados com antecedência"""
+    months = partition_months(date(2026, 10, 19), months_back=1, months_ahead=2)
+    assert months == [date(2026, 9, 1), date(2026, 10, 1), date(2026, 11, 1), date(2026, 12, 1)]
+
+
+def test_expired_partitions_respects_retention():
+    """Testa seleção de partições inteiramente fora da retenção"""
+    names = [
+        "interaction_logs_p202508",
+        "interaction_logs_p202509",
+        "interaction_logs_p202610",
+        "interaction_logs_default",
+    ]
+    # Retenção de 13 meses em 2026-10: mantém a partir de 2025-09
+    assert expired_partitions(names, date(2026, 10, 19), 13) == ["interaction_logs_p202508"]
+
+
+def test_create_all_ddl_is_partitioned():
+    """Testa DDL do create_all particionada por created_at (partições criadas no after_create)"""
+    ddl = str(CreateTable(InteractionLog.__table__).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (created_at)" in ddl
@@ -0,0 +1,100 @@
+"""
+Unit Tests - Perfis e métricas do pool de conexões
+"""
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from src.core import pool as pool_module
+from src.core.pool import (
+    POOL_PROFILES,
+    InstrumentedPoolMixin,
+    PoolMetrics,
+    PrePing,
+    pool_saturation,
+    render_pool_metrics,
+    resolve_pool_profile,
+)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """Mesma instrumentação do pool assíncrono sobre o QueuePool síncrono"""
+
+
+def test_resolve_profile_with_overrides(monkeypatch):
+    """Testa perfil nomeado + sobrescritas do Settings e perfil inválido"""
+    settings = pool_module.settings
+    monkeypatch.setattr(settings, "DATABASE_POOL_PROFILE", "pgbouncer")
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 25)
+    monkeypatch.setattr(settings, "DATABASE_POOL_PRE_PING", "idle")
+
+    profile = resolve_pool_profile()
+    assert profile.pool_size == 25
+    assert profile.pre_ping == PrePing.IDLE
+    assert profile.max_overflow == POOL_PROFILES["pgbouncer"].max_overflow
+    assert profile.statement_cache_size == 0
+
+    monkeypatch.setattr(settings, "DATABASE_POOL_PROFILE", "huge")
+    with pytest.raises(ValueError, match="DATABASE_POOL_PROFILE"):
+        resolve_pool_profile()
+
+
+def test_metrics_track_checkouts_and_timeouts(monkeypatch):
+    """Testa gauges, histograma de espera e falhas por timeout, renderizados para scraping"""
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=1, timeout=0.01)
+    pool.metrics = PoolMetrics("primary")
+    monkeypatch.setattr(pool_module, "_engines", {"primary": SimpleNamespace(sync_engine=SimpleNamespace(pool=pool))})
+
+    first, second = pool.connect(), pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    assert pool.metrics.checkouts == 2
+    assert pool.metrics.failures["timeout"] == 1
+    text = render_pool_metrics()
+    assert 'smartsupp_db_pool_checked_out{pool="primary"} 2' in text
+    assert 'smartsupp_db_pool_overflow{pool="primary"} 1' in text
+    assert 'smartsupp_db_pool_checkout_failures_total{pool="primary",reason="timeout"} 1' in text
+    assert 'smartsupp_db_pool_checkout_wait_seconds_bucket{pool="primary",le="+Inf"} 2' in text
+    assert 'smartsupp_db_pool_checkout_wait_seconds_count{pool="primary"} 2' in text
+    assert pool_saturation()["primary"] == {"checked_out": 2, "capacity": 2, "saturation": 1.0}
+
+    first.close()
+    second.close()
+    assert 'smartsupp_db_pool_checked_out{pool="primary"} 0' in render_pool_metrics()
+
+    recreated = pool.recreate()
+    assert recreated.metrics is pool.metrics
+
+
+def test_wait_histogram_buckets():
+    """Testa alocação nos buckets (limite superior inclusivo)"""
+    metrics = PoolMetrics("replica-0")
+    for seconds in (0.0005, 0.001, 0.2, 30.0):
+        metrics.observe_wait(seconds)
+    assert metrics.wait_buckets[0] == 2
+    assert metrics.wait_buckets[pool_module.WAIT_BUCKETS.index(0.25)] == 1
+    assert metrics.wait_buckets[-1] == 1
+
+
+def test_idle_pre_ping_replaces_dead_connection(monkeypatch):
+    """Testa pre-ping 'idle': conexão ociosa é verificada e trocada se o ping falhar"""
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    pool_module._install_idle_pre_ping(SimpleNamespace(sync_engine=engine), idle_seconds=0)
+
+    with engine.connect() as conn:
+        first = conn.connection.dbapi_connection
+    pings = []
+
+    def failing_ping(dbapi_connection):
+        pings.append(dbapi_connection)
+        raise sqlite3.OperationalError("server closed the connection")
+
+    monkeypatch.setattr(engine.dialect, "do_ping", failing_ping)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.connection.dbapi_connection is not first
+    assert pings == [first]
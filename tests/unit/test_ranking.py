@@ -0,0 +1,155 @@
+"""
+Unit Tests - Ranking Index
+"""
+from types import SimpleNamespace
+
+from src.application.ranking import (
+    RankingIndex,
+    is_eligible,
+    nutritional_filters,
+    restriction_mask,
+)
+from src.application.stack_optimizer import StackCandidate, solve_stack
+from src.domain.budget import DEFAULT_BUDGET_BANDS, BudgetBand, resolve_budget_bands
+from src.domain.enums import BudgetRange, DietaryRestriction, MedicalCondition
+from src.infrastructure.cache.catalog import CatalogSnapshot, parse_nutritional_flags
+
+
+def make_snapshot(version: int = 1) -> CatalogSnapshot:
+    """Snapshot com um whey comum e um whey zero lactose"""
+    rows = [
+        SimpleNamespace(
+            id=1,
+            brand_name="Growth",
+            product_name="Whey Protein",
+            price=89.90,
+            nutritional_info={"protein_g": 24.0, "artificial_sweeteners": True},
+            protein_g=24.0,
+            certifications=["ANVISA", "GMP"],
+        ),
+        SimpleNamespace(
+            id=2,
+            brand_name="IntegralMedica",
+            product_name="Whey Zero Lactose",
+            price=129.90,
+            nutritional_info={"protein_g": 25.0, "no_lactose": True},
+            protein_g=25.0,
+            certifications=["ANVISA", "GMP", "SEM LACTOSE"],
+        ),
+    ]
+    return CatalogSnapshot.from_rows(1, "protein", version, rows)
+
+
+def test_restriction_mask_ignores_irrelevant_values():
+    """Testa que apenas restrições relevantes entram na máscara"""
+    mask = restriction_mask(
+        [DietaryRestriction.LACTOSE_FREE.value, DietaryRestriction.PALEO.value],
+        [MedicalCondition.HYPERTENSION.value],
+    )
+    assert mask == restriction_mask([DietaryRestriction.LACTOSE_FREE.value], [])
+    assert restriction_mask(None, None) == 0
+
+
+def test_nutritional_filters():
+    """Testa conversão da máscara em filtros de contenção JSONB"""
+    mask = restriction_mask([DietaryRestriction.VEGAN.value], [MedicalCondition.DIABETES.value])
+    required, forbidden = nutritional_filters(mask)
+    assert required == ["vegan"]
+    assert forbidden == ["maltodextrin"]
+
+
+def test_is_eligible():
+    """Testa elegibilidade por flags nutricionais"""
+    mask = restriction_mask([DietaryRestriction.LACTOSE_FREE.value], [MedicalCondition.DIABETES.value])
+    assert is_eligible(parse_nutritional_flags({"no_lactose": True}), mask)
+    assert not is_eligible(parse_nutritional_flags({"no_lactose": True, "maltodextrin": True}), mask)
+    assert not is_eligible(parse_nutritional_flags({}), mask)
+
+
+def test_lookup_filters_and_ranks():
+    """Testa ranking do arquétipo sem lactose"""
+    index = RankingIndex(top_n=10)
+    mask = restriction_mask([DietaryRestriction.LACTOSE_FREE.value], [])
+
+    ranked = index.lookup(make_snapshot(), mask, "medium")
+
+    assert [p["brand_name"] for p in ranked.filtered_products] == ["IntegralMedica"]
+    assert ranked.recommended_product_ids == [2]
+    assert set(ranked.ranking_data) == {"2"}
+
+
+def test_lookup_is_memoized_per_catalog_version():
+    """Testa que o ranking é reutilizado até a versão do catálogo mudar"""
+    index = RankingIndex(top_n=10)
+
+    first = index.lookup(make_snapshot(version=1), 0, None)
+    assert index.lookup(make_snapshot(version=1), 0, None) is first
+
+    refreshed = index.lookup(make_snapshot(version=2), 0, None)
+    assert refreshed is not first
+    assert refreshed.version == 2
+    assert len(refreshed.ranked_products) == 2
+
+
+def test_stack_candidates_cover_eligible_products_beyond_top_n():
+    """Testa que o stack considera a fronteira preço × score de todos os elegíveis, não só o top-N"""
+    ranked = RankingIndex(top_n=1).lookup(make_snapshot(), 0, None)
+    assert ranked.recommended_product_ids == [2]
+    assert [p["id"] for p in ranked.stack_products] == [1, 2]
+
+    stack = solve_stack(
+        {"protein": [StackCandidate(p["id"], "protein", p["price"], p["score"]) for p in ranked.stack_products]},
+        budget=100.0,
+    )
+    assert [item.product_id for item in stack.items] == [1]
+
+
+def test_resolve_budget_bands_with_tenant_overrides():
+    """Testa faixas customizadas por tenant sobre as faixas padrão"""
+    bands = resolve_budget_bands({"low": {"max": 80}, "unknown": {"max": 1}})
+
+    assert bands[BudgetRange.LOW.value] == BudgetBand(0.0, 80.0)
+    assert bands[BudgetRange.PREMIUM.value].max_price is None
+    assert "unknown" not in bands
+
+
+def test_lookup_applies_budget_ceiling_and_penalty():
+    """Testa corte acima do teto + tolerância e penalidade suave dentro da tolerância"""
+    index = RankingIndex(top_n=10)
+    snapshot = make_snapshot()
+
+    low = index.lookup(snapshot, 0, BudgetRange.LOW.value)
+    assert low.ranked_products == []
+
+    medium = index.lookup(snapshot, 0, BudgetRange.MEDIUM.value)
+    assert [p["id"] for p in medium.ranked_products] == [2, 1]
+
+    bands = {**DEFAULT_BUDGET_BANDS, BudgetRange.MEDIUM.value: BudgetBand(50.0, 120.0)}
+    rows = [
+        SimpleNamespace(
+            id=3, brand_name="A", product_name="A", price=100.0,
+            nutritional_info={"protein_g": 25.0}, protein_g=25.0, certifications=[],
+        ),
+        SimpleNamespace(
+            id=4, brand_name="B", product_name="B", price=132.0,
+            nutritional_info={"protein_g": 25.0}, protein_g=25.0, certifications=[],
+        ),
+    ]
+    tight = CatalogSnapshot.from_rows(2, "protein", 1, rows, bands)
+    ranked = index.lookup(tight, 0, BudgetRange.MEDIUM.value)
+
+    over_budget = ranked.ranked_products[1]
+    assert over_budget["id"] == 4
+    assert any("Acima do orçamento" in reason for reason in over_budget["reasons"])
+    assert ranked.ranking_data["4"]["score"] < ranked.ranking_data["3"]["score"]
+
+
+def test_discard_releases_entries_of_evicted_catalog():
+    """Testa remoção das entradas do catálogo despejado, sem reter o snapshot"""
+    index = RankingIndex(top_n=10)
+    snapshot = make_snapshot()
+    index.lookup(snapshot, 0, None)
+    assert not hasattr(index._scored[(1, "protein")], "snapshot")
+
+    index.discard(1, "protein")
+    assert index._scored == {} and index._archetypes == {}
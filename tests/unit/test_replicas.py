@@ -0,0 +1,140 @@
+"""
+Unit Tests - Roteamento de leituras para réplicas
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from src.core import database, invalidation
+from src.core.database import READ_ONLY_INFO, ReplicaPool, TenantScope, open_read_session, pin_to_primary, read_engine
+from src.domain.models import InteractionLog, UserProfile
+
+
+def fake_engine(host: str):
+    return SimpleNamespace(url=make_url(f"postgresql+asyncpg://user:secret@{host}/smartsupp"))
+
+
+class FakeReplicaPool(ReplicaPool):
+    """Atrasos por host; None = réplica fora do ar"""
+
+    def __init__(self, engines, lags):
+        super().__init__(engines)
+        self.lags = lags
+
+    async def replication_lag(self, engine) -> float:
+        lag = self.lags[engine.url.host]
+        if lag is None:
+            raise ConnectionRefusedError(engine.url.host)
+        if lag == "hang":
+            await asyncio.sleep(60)
+        return lag
+
+
+def test_round_robin_skips_unhealthy():
+    """Testa alternância entre réplicas saudáveis e None sem nenhuma"""
+    engines = [fake_engine(host) for host in ("r1", "r2", "r3")]
+    pool = ReplicaPool(engines)
+    assert [pool.choose() for _ in range(4)] == [engines[0], engines[1], engines[2], engines[0]]
+
+    pool.healthy = [True, False, True]
+    assert [pool.choose().url.host for _ in range(4)] == ["r3", "r1", "r3", "r1"]
+
+    pool.healthy = [False, False, False]
+    assert pool.choose() is None
+    assert ReplicaPool([]).choose() is None
+
+
+@pytest.mark.asyncio
+async def test_health_check_removes_and_restores(monkeypatch):
+    """Testa réplicas fora da rotação por falha, timeout ou atraso, e a volta"""
+    monkeypatch.setattr(database.settings, "REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(database.settings, "REPLICA_MAX_LAG_SECONDS", 30.0)
+    engines = [fake_engine(host) for host in ("r1", "r2", "r3", "r4")]
+    pool = FakeReplicaPool(engines, {"r1": 0.0, "r2": None, "r3": "hang", "r4": 120.0})
+
+    await pool.check()
+    assert pool.healthy == [True, False, False, False]
+
+    pool.lags.update(r2=1.5, r3=0.0, r4=10.0)
+    await pool.check()
+    assert pool.healthy == [True, True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_read_engine_pins_tenant_after_write(monkeypatch):
+    """Testa read-your-writes: tenant que escreveu lê do primário até o pin expirar"""
+    replica = fake_engine("r1")
+    monkeypatch.setattr(database, "_replica_pool", ReplicaPool([replica]))
+    monkeypatch.setattr(database, "_primary_pins", {})
+
+    async with TenantScope.scope(7):
+        assert read_engine() is replica
+        pin_to_primary(7)
+        assert read_engine() is database.get_async_engine()
+
+    async with TenantScope.scope(8):
+        assert read_engine() is replica
+
+    async with TenantScope.scope(7):
+        pin_to_primary(7, seconds=-1)  # não encurta um pin já ativo
+        assert read_engine() is database.get_async_engine()
+        database._primary_pins[7] = 0.0
+        assert read_engine() is replica
+        assert 7 not in database._primary_pins
+
+    monkeypatch.setattr(database, "_replica_pool", ReplicaPool([]))
+    assert read_engine() is database.get_async_engine()
+
+
+def test_read_sessions_skip_transaction_writes(monkeypatch):
+    """Testa sessões de leitura: BEGIN READ ONLY ou AUTOCOMMIT, no mesmo pool do engine escolhido"""
+    monkeypatch.setattr(database, "_replica_pool", ReplicaPool([]))
+
+    session = open_read_session()
+    engine = session.bind.sync_engine
+    assert session.info[READ_ONLY_INFO]
+    assert engine.get_execution_options()["postgresql_readonly"] is True
+    assert engine.pool is database.get_async_engine().sync_engine.pool
+    assert open_read_session().bind is session.bind
+
+    autocommit = open_read_session(autocommit=True).bind.sync_engine
+    assert autocommit.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
+    assert autocommit.pool is database.get_async_engine().sync_engine.pool
+
+
+def test_only_commits_with_changed_data_pin(monkeypatch):
+    """Testa pin só após flush com alterações fora de PIN_EXEMPT_TABLES (log do /chat não fixa)"""
+    monkeypatch.setattr(database, "_primary_pins", {})
+    token = database._current_tenant_id.set(7)
+
+    def commit(*objects, dirty=()):
+        session = SimpleNamespace(
+            info={}, new=list(objects), deleted=[], dirty=list(dirty), is_modified=lambda obj: True,
+        )
+        database._track_write(session, None)
+        database._pin_after_write(session)
+        return session
+
+    try:
+        commit()  # get_session sem escritas
+        commit(InteractionLog(tenant_id=7, session_id="chat"))
+        assert not database.is_pinned_to_primary(7)
+
+        session = commit(dirty=[UserProfile(tenant_id=7)])
+        assert database.is_pinned_to_primary(7)
+        assert list(session.info[invalidation._PENDING_KEY]) == [
+            invalidation.InvalidationEvent(invalidation.InvalidationKind.READ_PIN, 7)
+        ]
+    finally:
+        database._current_tenant_id.reset(token)
+
+
+def test_read_pin_event_from_other_worker_pins(monkeypatch):
+    """Testa READ_PIN publicado por outro processo fixando o tenant neste"""
+    monkeypatch.setattr(database, "_primary_pins", {})
+    invalidation.get_invalidation_bus().dispatch(
+        invalidation.InvalidationEvent(invalidation.InvalidationKind.READ_PIN, 9)
+    )
+    assert database.is_pinned_to_primary(9)
@@ -0,0 +1,84 @@
+"""
+Unit Tests - Sketches HyperLogLog de contagem distinta
+"""
+from datetime import date
+
+from src.application.sketches import (
+    ALL_PRODUCTS,
+    HLL_PRECISION,
+    HLL_REGISTERS,
+    HLL_STANDARD_ERROR,
+    HyperLogLog,
+    SketchBuffer,
+    _merged,
+    hll_position,
+)
+
+
+def sketch_of(values) -> HyperLogLog:
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_hll_position_is_stable():
+    """Testa que o hash é determinístico (mesmo registrador em qualquer processo)"""
+    index, rank = hll_position("session-1")
+
+    assert (index, rank) == hll_position("session-1")
+    assert 0 <= index < HLL_REGISTERS
+    assert 1 <= rank <= 64 - HLL_PRECISION + 1
+
+
+def test_estimate_within_error_bound():
+    """Testa estimativas pequenas (linear counting) e grandes dentro de 3 erros padrão"""
+    assert HyperLogLog().estimate() == 0
+    assert round(sketch_of(["a", "b", "c", "a"]).estimate()) == 3
+
+    for cardinality in (1_000, 50_000):
+        estimate = sketch_of(f"session-{i}" for i in range(cardinality)).estimate()
+        assert abs(estimate - cardinality) / cardinality < 3 * HLL_STANDARD_ERROR
+
+
+def test_union_matches_sketch_of_all_values():
+    """Testa que a união por máximo equivale ao sketch do conjunto (com sobreposição)"""
+    first = sketch_of(f"user-{i}" for i in range(0, 6_000))
+    second = sketch_of(f"user-{i}" for i in range(4_000, 10_000))
+
+    union = HyperLogLog.union([first.to_bytes(), second.to_bytes()])
+
+    assert union.to_bytes() == sketch_of(f"user-{i}" for i in range(10_000)).to_bytes()
+    assert HyperLogLog.union([]).estimate() == 0
+
+
+def test_sketch_buffer_matches_full_sketch():
+    """Testa buffer esparso por (tenant, dia, produto) equivalente ao sketch completo após o merge"""
+    day = date(2026, 10, 19)
+    buffer = SketchBuffer()
+    for i in range(50):
+        buffer.add(1, day, f"session-{i}", i % 7, [10] if i % 2 else [10, 20])
+
+    pending = buffer.drain()
+    assert len(buffer) == 0
+    assert set(pending) == {(1, day, ALL_PRODUCTS), (1, day, 10), (1, day, 20)}
+
+    sessions, profiles = pending[(1, day, ALL_PRODUCTS)]
+    expected = sketch_of(f"session-{i}" for i in range(50)).to_bytes()
+    assert _merged(bytes(HLL_REGISTERS), sessions) == expected
+    assert _merged(expected, sessions) is None  # nada aumenta: sem update
+    assert round(HyperLogLog(_merged(bytes(HLL_REGISTERS), profiles)).estimate()) == 7
+
+
+def test_sketch_buffer_restore_keeps_maximum():
+    """Testa devolução de registradores após falha no flush, unindo aos novos"""
+    day = date(2026, 10, 19)
+    buffer = SketchBuffer()
+    buffer.add(1, day, "session-a", None, [])
+    failed = buffer.drain()
+    buffer.add(1, day, "session-b", None, [])
+    buffer.restore(failed)
+
+    sessions, profiles = buffer.drain()[(1, day, ALL_PRODUCTS)]
+    assert _merged(bytes(HLL_REGISTERS), sessions) == sketch_of(["session-a", "session-b"]).to_bytes()
+    assert profiles == {}
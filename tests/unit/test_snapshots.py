@@ -0,0 +1,130 @@
+"""
+Unit Tests - Snapshots Parquet de analytics
+"""
+import asyncio
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from src.application import snapshots
+from src.application.snapshots import (
+    INTERACTIONS,
+    PRODUCTS,
+    RANKINGS,
+    LIST_SEPARATOR,
+    SnapshotJobs,
+    read_copy_csv,
+    snapshot_path,
+    write_parquet,
+)
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def write_csv(tmp_path: Path, header: list[str], *rows: str) -> Path:
+    path = tmp_path / "copy.csv"
+    path.write_text(",".join(header) + "\n" + "".join(row + "\n" for row in rows))
+    return path
+
+
+def test_read_copy_csv_types_and_lists(tmp_path):
+    """Testa tipos explícitos, NULL x texto vazio e listas separadas"""
+    path = write_csv(
+        tmp_path,
+        list(INTERACTIONS.column_types),
+        f'1,7,2026-10-01 12:30:00.5,"s,1",,3,5,1{LIST_SEPARATOR}2',
+        '2,7,2026-10-02 00:00:00,"",,,,',
+    )
+
+    table = read_copy_csv(path, INTERACTIONS)
+
+    assert table.schema.field("created_at").type == pa.timestamp("us")
+    assert table.schema.field("recommended_products").type == pa.list_(pa.int64())
+    first, second = table.to_pylist()
+    assert first["session_id"] == "s,1"
+    assert first["recommended_products"] == [1, 2]
+    assert first["created_at"] == datetime(2026, 10, 1, 12, 30, 0, 500000)
+    assert second["session_id"] == ""
+    assert second["recommended_products"] is None
+    assert second["satisfaction_score"] is None
+
+
+def test_read_copy_csv_flattened_rankings(tmp_path):
+    """Testa ranking_data achatado com justificativas como lista"""
+    path = write_csv(
+        tmp_path,
+        list(RANKINGS.column_types),
+        f"1,7,2026-10-01 12:30:00,42,91.5,0.915,Sem lactose,Sem lactose{LIST_SEPARATOR}Certificação ANVISA",
+    )
+
+    row = read_copy_csv(path, RANKINGS).to_pylist()[0]
+
+    assert row["product_id"] == 42
+    assert row["score"] == 91.5
+    assert row["reason"] == "Sem lactose"
+    assert row["reasons"] == ["Sem lactose", "Certificação ANVISA"]
+
+
+def test_write_parquet_hive_layout(tmp_path):
+    """Testa caminho particionado por tenant/mês e escrita atômica"""
+    path = write_csv(
+        tmp_path,
+        list(PRODUCTS.column_types),
+        f"1,7,Growth,Whey,PROTEIN,89.9,BRL,24,30,3.74,10,t,ANVISA{LIST_SEPARATOR}GMP",
+    )
+    table = read_copy_csv(path, PRODUCTS)
+
+    monthly = snapshot_path(tmp_path, INTERACTIONS, 7, date(2026, 10, 1))
+    assert monthly == tmp_path / "interactions" / "tenant_id=7" / "month=2026-10" / "data.parquet"
+
+    target = snapshot_path(tmp_path, PRODUCTS, 7)
+    write_parquet(table, target)
+
+    assert target == tmp_path / "products" / "tenant_id=7" / "data.parquet"
+    assert not target.with_suffix(".parquet.tmp").exists()
+    assert pq.read_table(target).to_pylist()[0]["is_active"] is True
+
+
+@pytest.mark.asyncio
+async def test_snapshot_jobs_lifecycle(monkeypatch, tmp_path):
+    """Testa job assíncrono: estado gravado em cada transição (pending -> running -> completed)"""
+    async def fake_export(tenant_id, root, **kwargs):
+        return [Path(root) / "interactions" / f"tenant_id={tenant_id}" / "data.parquet"]
+
+    saved = []
+
+    async def fake_save(job, prune=False):
+        saved.append((job.status, prune))
+
+    monkeypatch.setattr(snapshots, "export_tenant_snapshot", fake_export)
+    monkeypatch.setattr(snapshots, "_save_job", fake_save)
+    jobs = SnapshotJobs()
+
+    job = await jobs.submit(7, tmp_path, since=None)
+    assert jobs.in_flight == 1
+    while len(saved) < 3:
+        await asyncio.sleep(0)
+
+    assert saved == [("pending", True), ("running", False), ("completed", False)]
+    assert jobs.in_flight == 0 and job.finished_at is not None
+    assert job.files == [str(tmp_path / "interactions" / "tenant_id=7" / "data.parquet")]
+
+
+@pytest.mark.asyncio
+async def test_mark_dirty_months_only_closed_months():
+    """Testa marca só para meses fechados, um registro por mês"""
+    executed = []
+
+    class Session:
+        async def execute(self, stmt):
+            executed.append(stmt.compile().params)
+
+    today = datetime.utcnow()
+    await snapshots.mark_dirty_months(Session(), 7, [today])
+    assert executed == []
+
+    await snapshots.mark_dirty_months(Session(), 7, [datetime(2026, 1, 3), datetime(2026, 1, 20), datetime(2025, 12, 31)])
+    months = sorted(value for key, value in executed[0].items() if key.startswith("month"))
+    assert months == [date(2025, 12, 1), date(2026, 1, 1)]
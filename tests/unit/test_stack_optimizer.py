@@ -0,0 +1,59 @@
+"""
+Unit Tests - Stack Optimizer
+"""
+from src.application.stack_optimizer import StackCandidate, pareto_front, solve_stack
+
+
+def candidate(product_id: int, category: str, price: float, score: float) -> StackCandidate:
+    return StackCandidate(product_id=product_id, category=category, price=price, score=score)
+
+
+def test_pareto_front_drops_dominated_products():
+    """Testa remoção de produtos mais caros e com score menor ou igual"""
+    front = pareto_front([
+        candidate(1, "protein", 100.0, 80.0),
+        candidate(2, "protein", 120.0, 70.0),  # dominado por 1
+        candidate(3, "protein", 60.0, 50.0),
+        candidate(4, "protein", 60.0, 55.0),  # mesmo preço que 3, score maior
+        candidate(5, "protein", 150.0, 90.0),
+    ])
+    assert [c.product_id for c in front] == [4, 1, 5]
+
+
+def test_solve_stack_respects_budget():
+    """Testa melhor combinação sob o orçamento (não a soma gulosa dos melhores)"""
+    candidates = {
+        "protein": [candidate(1, "protein", 130.0, 90.0), candidate(2, "protein", 90.0, 80.0)],
+        "creatine": [candidate(3, "creatine", 60.0, 85.0), candidate(4, "creatine", 40.0, 60.0)],
+    }
+
+    solution = solve_stack(candidates, budget=150.0)
+
+    assert {item.product_id for item in solution.items} == {2, 3}
+    assert solution.total_price <= 150.0
+    assert solution.total_score == 165.0
+
+
+def test_solve_stack_skips_unaffordable_category():
+    """Testa que categorias sem opção acessível ficam fora do stack"""
+    candidates = {
+        "protein": [candidate(1, "protein", 45.0, 70.0)],
+        "creatine": [candidate(2, "creatine", 80.0, 85.0)],
+    }
+
+    solution = solve_stack(candidates, budget=50.0)
+
+    assert [item.product_id for item in solution.items] == [1]
+
+
+def test_solve_stack_without_budget_picks_best_per_category():
+    """Testa orçamento sem teto (premium)"""
+    candidates = {
+        "protein": [candidate(1, "protein", 300.0, 95.0), candidate(2, "protein", 90.0, 80.0)],
+        "creatine": [candidate(3, "creatine", 60.0, 85.0)],
+        "caffeine": [],
+    }
+
+    solution = solve_stack(candidates, budget=None)
+
+    assert {item.product_id for item in solution.items} == {1, 3}
@@ -0,0 +1,100 @@
+"""
+Unit Tests - Escopo de tenant (ContextVar) e filtro automático do ORM
+Usa SQLite em arquivo temporário (daily_tenant_stats não tem tipos específicos do Postgres)
+"""
+import asyncio
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, update
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from src.core.database import ALL_TENANTS_OPTION, TenantScope
+from src.domain.models import DailyTenantStats
+
+TENANTS = range(1, 21)
+DAYS = 5
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'tenants.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    DailyTenantStats.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(
+            DailyTenantStats(tenant_id=tenant_id, day=date(2026, 1, day), interaction_count=tenant_id)
+            for tenant_id in TENANTS
+            for day in range(1, DAYS + 1)
+        )
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+def tenant_ids_seen(engine) -> set[int]:
+    with Session(engine) as session:
+        return set(session.execute(select(DailyTenantStats.tenant_id)).scalars())
+
+
+@pytest.mark.asyncio
+async def test_filter_applies_only_inside_scope(engine):
+    """Testa filtro automático em select, subquery e update, e a opção all_tenants"""
+    assert tenant_ids_seen(engine) == set(TENANTS)
+
+    async with TenantScope.scope(3):
+        assert tenant_ids_seen(engine) == {3}
+        with Session(engine) as session:
+            subquery = select(DailyTenantStats.interaction_count).subquery()
+            assert session.execute(select(func.sum(subquery.c.interaction_count))).scalar() == 3 * DAYS
+
+            session.execute(update(DailyTenantStats).values(interaction_count=0))
+            session.commit()
+
+            everything = session.execute(
+                select(func.count()).select_from(DailyTenantStats).execution_options(**{ALL_TENANTS_OPTION: True})
+            ).scalar()
+            assert everything == len(TENANTS) * DAYS
+
+    assert TenantScope.get_tenant() is None
+    with Session(engine) as session:
+        zeroed = session.execute(
+            select(DailyTenantStats.tenant_id).where(DailyTenantStats.interaction_count == 0).distinct()
+        ).scalars().all()
+    assert zeroed == [3]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_isolated(engine):
+    """
+    Stress: centenas de "requisições" concorrentes intercalando awaits e queries
+    (no event loop e em threads via to_thread) nunca enxergam dados de outro tenant
+    """
+    rng = random.Random(41)
+
+    async def request(tenant_id: int) -> None:
+        TenantScope.set_tenant(tenant_id)
+        for _ in range(5):
+            await asyncio.sleep(rng.random() / 1000)
+            assert TenantScope.get_tenant() == tenant_id
+            assert tenant_ids_seen(engine) == {tenant_id}
+            assert await asyncio.to_thread(tenant_ids_seen, engine) == {tenant_id}
+
+    # Cada task roda em uma cópia do contexto, como as requisições do servidor ASGI
+    await asyncio.gather(*(request(rng.choice(TENANTS)) for _ in range(300)))
+
+    assert TenantScope.get_tenant() is None
+
+
+@pytest.mark.asyncio
+async def test_nested_scope_restores_previous_tenant():
+    """Testa que scope() restaura o tenant anterior ao sair"""
+    async with TenantScope.scope(1):
+        async with TenantScope.scope(2):
+            assert TenantScope.get_tenant() == 2
+        assert TenantScope.get_tenant() == 1
+    assert TenantScope.get_tenant() is None
@@ -0,0 +1,47 @@
+"""
+Unit Tests - Warm-up do worker
+"""
+import asyncio
+
+import pytest
+
+from src.application import warmup
+from src.application.warmup import WarmupState, run_warmup
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_records_steps_and_marks_ready():
+    """Testa etapas executadas em ordem; erro e timeout não impedem as seguintes nem o ready"""
+    calls = []
+
+    async def ok():
+        calls.append("ok")
+
+    async def failing():
+        calls.append("failing")
+        raise ConnectionError("db down")
+
+    async def slow():
+        calls.append("slow")
+        await asyncio.sleep(1)
+
+    state = await run_warmup(
+        [("graph", ok), ("science", failing), ("catalogs", slow), ("llm_ping", ok)],
+        WarmupState(),
+        timeout=0.05,
+    )
+
+    assert calls == ["ok", "failing", "slow"]
+    assert state.ready and state.finished_at is not None
+    assert state.steps["graph"].endswith("ms")
+    assert state.steps["science"] == "error: ConnectionError"
+    assert state.steps["catalogs"] == "timeout"
+    assert state.steps["llm_ping"] == "skipped: timeout"
+
+
+def test_steps_follow_settings(monkeypatch):
+    """Testa etapas opcionais (catálogos, ping ao LLM) conforme as configurações"""
+    monkeypatch.setattr(warmup.settings, "CATALOG_CACHE_ENABLED", False)
+    monkeypatch.setattr(warmup.settings, "WARMUP_LLM_PING", True)
+    names = [name for name, _ in warmup.warmup_steps()]
+    assert names == ["graph", "pool_connections", "science", "llm_ping"]